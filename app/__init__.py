@@ -0,0 +1 @@
+"""Streamlit app: shared core plus one module per menu."""
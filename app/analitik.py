@@ -0,0 +1,92 @@
+"""Analitik Log: usage per item, petugas and month across the Log_YYYY_MM tabs."""
+from io import BytesIO
+
+import streamlit as st
+
+from inventaris import export
+from inventaris.analytics import LogAnalytics
+from inventaris.core import LOG_HEADERS, USED_LOCATION
+
+from . import core
+
+
+# Aggregates of every log month; closed months are frozen, see inventaris.analytics
+@st.cache_resource(show_spinner=False)
+def get_log_analytics():
+    path = st.secrets.get("analytics", {}).get("path", "log_analytics.sqlite3")
+    return LogAnalytics(path, store=core.get_local_store())
+
+
+def render(menu):
+    st.subheader("📈 Analitik Log")
+    analytics = get_log_analytics()
+
+    current_values = None
+    try:
+        # This month's tab comes from the shared snapshot of the local store,
+        # which the replicator keeps in step with rows added in Sheets;
+        # older months are only read the first time they are seen
+        current_values = core.get_snapshot_cache().get_values(core.get_log_ws())
+        analytics.sync(core.get_log_spreadsheet(), current_values)
+    except Exception as e:
+        # Reports below still work from what was synced before
+        st.error(f"Gagal menyinkronkan log: {e}")
+
+    years = analytics.years()
+    if not years:
+        st.warning("Belum ada data log.")
+        st.stop()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        tahun = st.selectbox("📅 Tahun", ["Semua"] + years)
+    with col2:
+        search_nama = st.text_input("🔍 Cari Nama Barang", "")
+    year = None if tahun == "Semua" else tahun
+
+    st.caption(
+        "Jumlah = total barang keluar (dipakai atau dikirim, tercatat di log dengan Tempat "
+        f"Penyimpanan \"{USED_LOCATION}\") untuk periode dan barang terpilih. Penambahan stok "
+        "dan pindah gudang tidak dihitung, begitu pula barang keluar yang tercatat sebagai "
+        "TRANSFER sebelum pencatatan ini berlaku."
+    )
+    per_bulan = analytics.by_month(year, search_nama)
+    if not per_bulan:
+        st.warning("Tidak ada catatan log yang cocok.")
+        st.stop()
+    st.write("**Per Bulan**")
+    st.bar_chart(per_bulan, x="Bulan", y="Jumlah")
+
+    col3, col4 = st.columns(2)
+    with col3:
+        st.write("**Per Barang**")
+        st.dataframe(analytics.by_item(year, search_nama), use_container_width=True, hide_index=True)
+    with col4:
+        st.write("**Per Petugas**")
+        st.dataframe(analytics.by_petugas(year, search_nama), use_container_width=True, hide_index=True)
+
+    # --- EXPORT: the reports above, or this month's raw log rows ---
+    with st.expander("⬇️ Ekspor"):
+        reports = {
+            "Per Bulan": lambda: analytics.by_month(year, search_nama),
+            "Per Barang": lambda: analytics.by_item(year, search_nama),
+            "Per Petugas": lambda: analytics.by_petugas(year, search_nama),
+        }
+        if current_values:
+            reports["Log bulan ini (mentah)"] = None
+        pilihan = st.selectbox("Data", list(reports))
+        export_format = st.radio("Format ekspor", export.available_formats(), horizontal=True)
+        if st.button("Ekspor"):
+            core.get_recorder().set_action(f"{menu} › Ekspor")
+            if reports[pilihan] is None:
+                headers, rows = LOG_HEADERS, current_values[1:]
+            else:
+                records = reports[pilihan]()
+                headers = list(records[0]) if records else []
+                rows = export.records_rows(records, headers)
+            out = BytesIO()
+            n_rows = export.write(export_format, rows, headers, out)
+            ext, mime = export.FORMATS[export_format]
+            name = pilihan.split(" (")[0].lower().replace(" ", "_")
+            st.download_button(f"⬇️ Unduh {n_rows} baris", out.getvalue(),
+                               file_name=f"log_{name}_{tahun.lower()}.{ext}", mime=mime)
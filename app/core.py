@@ -0,0 +1,247 @@
+"""Process-wide handles shared by every menu: clients, caches and helpers.
+
+Importing this module has no side effects and pulls in no pandas, Pillow or
+Cloudinary; every handle is built by a ``get_*`` accessor on first use and
+then kept by ``st.cache_resource`` for the life of the process.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import json
+
+import gspread
+import requests
+import streamlit as st
+from google.oauth2.service_account import Credentials
+
+from inventaris.cache import SnapshotCache
+from inventaris.compaction import CompactionScheduler, compact
+from inventaris.core import HEADERS, HEADERS_USED, LOG_HEADERS, Inventory, log_sheet_name
+from inventaris.metrics import Recorder
+from inventaris.outbox import Outbox
+from inventaris.quota import QuotaClient
+from inventaris.sequence import SequenceAllocator
+from inventaris.store import LocalStore, Replicator
+
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+    "https://www.googleapis.com/auth/drive.file",
+]
+
+FOLDER_ID = "1Nfz9wDdW6SjY_2eXY_crxWLZUTJFt_IX"
+LOG_SPREADSHEET_ID = "1jXn8ijgcqHyohvTOmwGVbZJjpeuGV5JDqz1igtd-CNo"
+
+# Map display names -> worksheet names
+FLOOR_TO_SHEET = {
+    "Penambahan Inventar BMKG Pusat" : "BMKG Pusat(1)" ,
+    "Penggunaan Inventaris BMKG Pusat" : "BMKG Pusat(2)",
+    "Penambahan Inventar Satklim Kalimantan Selatan" : "Satklim KalSel(1)" ,
+    "Penggunaan Inventaris Satklim Kalimantan Selatan" : "Satklim KalSel(2)",
+}
+
+SOURCE_FLOOR = "Data Inventaris Informasi Kualitas Udara BMKG PUSAT"
+DESTINATION_SHEET = "Data Barang yang Dikirim atau Digunakan"
+
+KONDISI_OPTIONS = ["Baik", "Rusak", "Perlu Perbaikan"]
+
+
+def spreadsheet_id():
+    # Replace with your spreadsheet ID
+    return st.secrets["gcp"]["spreadsheet_id_1"]
+
+
+# Process-wide event log of external calls and phases (see inventaris.metrics);
+# only usernames listed in [instrumentation] admins see the sidebar panel.
+@st.cache_resource(show_spinner=False)
+def get_recorder():
+    return Recorder()
+
+# Every Sheets call goes through one QuotaClient so all sessions share the
+# per-minute budget (see inventaris.quota); limits live in [quota] secrets.
+@st.cache_resource(show_spinner=False)
+def get_quota():
+    cfg = st.secrets.get("quota", {})
+    return QuotaClient(
+        reads_per_minute=int(cfg.get("reads_per_minute", 60)),
+        writes_per_minute=int(cfg.get("writes_per_minute", 60)),
+        recorder=get_recorder(),
+    )
+
+# Google clients
+# Built once per process and shared by every session/rerun. gspread's
+# AuthorizedSession refreshes the access token by itself when it expires,
+# so the cached handles stay valid without re-authorizing.
+@st.cache_resource(show_spinner=False)
+def get_google_clients():
+    """Return (creds, client, spreadsheet, log_spreadsheet), created once."""
+    quota = get_quota()
+    creds = Credentials.from_service_account_info(
+        st.secrets["gcp_service_account"],
+        scopes=SCOPES
+    )
+    client = gspread.authorize(creds)
+    spreadsheet = quota.wrap_spreadsheet(
+        quota.call("read", client.open_by_key, spreadsheet_id()))
+    log_spreadsheet = quota.wrap_spreadsheet(
+        quota.call("read", client.open_by_key, LOG_SPREADSHEET_ID))
+    return creds, client, spreadsheet, log_spreadsheet
+
+def get_spreadsheet():
+    return get_google_clients()[2]
+
+def get_log_spreadsheet():
+    return get_google_clients()[3]
+
+@st.cache_resource(show_spinner=False)
+def get_worksheet(sheet_name):
+    """Worksheet handle by tab name, looked up once per process."""
+    return get_spreadsheet().worksheet(sheet_name)
+
+# Local SQLite mirror: the system of record for every tab we touch.
+# Writes commit here first; the replicator pushes them to Google Sheets
+# and brings rows added there by hand back into the mirror.
+@st.cache_resource(show_spinner=False)
+def get_local_store():
+    path = st.secrets.get("store", {}).get("path", "inventaris.sqlite3")
+    return LocalStore(path)
+
+@st.cache_resource(show_spinner=False)
+def get_replicator():
+    by_id = {s.id: s for s in (get_spreadsheet(), get_log_spreadsheet())}
+    return Replicator(get_local_store(), by_id.__getitem__)
+
+# Shared read cache for sheet values. TTL (seconds) can be tuned with
+# [cache] snapshot_ttl in secrets; writers keep it current themselves.
+@st.cache_resource(show_spinner=False)
+def get_snapshot_cache():
+    ttl = st.secrets.get("cache", {}).get("snapshot_ttl", 60)
+    return SnapshotCache(ttl=int(ttl), store=get_local_store())
+
+def known_values(title):
+    """Values of a tab we already hold (snapshot or local store), else None."""
+    values = get_snapshot_cache().peek(title)
+    return values if values is not None else get_local_store().values(title)
+
+# Per-sheet "No" counters, shared so concurrent sessions never collide
+@st.cache_resource(show_spinner=False)
+def get_sequences():
+    return SequenceAllocator(ttl=300, peek=known_values)
+
+def get_ws(floor_display_name):
+    """Modified with safety check to catch naming errors."""
+    try:
+        # Get the internal sheet name from your dictionary
+        sheet_name = FLOOR_TO_SHEET[floor_display_name]
+        return get_worksheet(sheet_name)
+    except KeyError:
+        st.error(f"❌ Key '{floor_display_name}' tidak ada di FLOOR_TO_SHEET.")
+        st.stop()
+    except gspread.exceptions.WorksheetNotFound:
+        st.error(f"❌ Tab bernama '{sheet_name}' tidak ditemukan di Google Sheets Anda.")
+        st.info("Pastikan nama tab di Google Sheets sama persis dengan yang ada di FLOOR_TO_SHEET.")
+        st.stop()
+
+@st.cache_resource(show_spinner=False)
+def _get_log_ws_cached(sheet_name):
+    log_spreadsheet = get_log_spreadsheet()
+    try:
+        ws = log_spreadsheet.worksheet(sheet_name)
+    except gspread.exceptions.WorksheetNotFound:
+        # Ensure cols=10 to match your 10-column HEADERS
+        ws = log_spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=10)
+        # Fix the range to A1:J1 (10 columns)
+        ws.update("A1:J1", [LOG_HEADERS])
+    return ws
+
+def get_log_ws():
+    """Return a worksheet for current month (create if not exists)."""
+    # Cached per month name, so a new month gets its own tab automatically
+    return _get_log_ws_cached(log_sheet_name())
+
+GAS_URL = "https://script.google.com/macros/s/AKfycbwUL8BrggWowmOOAO20xV0TEYqwXhucSdYwxAU8ppZifj20uxJL83p1JXMk-bztVm-WeQ/exec"
+
+def send_gas_batch(payloads):
+    """POST outbox payloads to the Apps Script; raises so the outbox retries.
+
+    With [gas] batch_size > 1 in secrets, several events are sent together as
+    {"events": [...]}; the Apps Script doPost must handle that shape first.
+    """
+    gas_cfg = st.secrets.get("gas", {})
+    url = gas_cfg.get("url", GAS_URL)
+    if len(payloads) == 1:
+        body = payloads[0]
+    else:
+        body = {"events": payloads}
+    data = json.dumps(body)
+    with get_recorder().span("gas", "post", size=len(data)):
+        response = requests.post(url, data=data, timeout=15)
+        response.raise_for_status()
+
+@st.cache_resource(show_spinner=False)
+def get_gas_outbox():
+    gas_cfg = st.secrets.get("gas", {})
+    return Outbox(
+        gas_cfg.get("outbox_path", "gas_outbox.sqlite3"),
+        send_gas_batch,
+        batch_size=int(gas_cfg.get("batch_size", 1)),
+    )
+
+# Stock/log operations live in inventaris.core so they can also run
+# offline against fakes (see benchmarks/)
+@st.cache_resource(show_spinner=False)
+def get_inventory():
+    return Inventory(
+        get_snapshot_cache(), get_sequences(), FLOOR_TO_SHEET,
+        worksheet=get_worksheet,
+        log_worksheet=_get_log_ws_cached,
+        notify=get_gas_outbox().put,
+        recorder=get_recorder(),
+    )
+
+def compact_stock_tabs():
+    """Remove tombstones from every stock tab; returns {tab: rows removed}."""
+    snapshots = get_snapshot_cache()
+    return {
+        sheet_name: compact(get_worksheet(sheet_name), snapshots)
+        for display_name, sheet_name in FLOOR_TO_SHEET.items()
+        if display_name.startswith("Penambahan")
+    }
+
+# Nightly tombstone cleanup; the hour (local time) is [compaction] hour
+@st.cache_resource(show_spinner=False)
+def get_compactor():
+    hour = int(st.secrets.get("compaction", {}).get("hour", 2))
+    return CompactionScheduler(compact_stock_tabs, hour=hour)
+
+def start():
+    """Build the handles every rerun needs (cheap after the first call).
+
+    Also starts the replicator and the compaction schedule, so pending
+    writes reach Google Sheets even before anyone opens a menu that writes.
+    """
+    get_replicator()
+    get_gas_outbox()
+    get_compactor()
+    return get_inventory()
+
+# Worker pool for uploads and sheet writes that can run side by side
+@st.cache_resource(show_spinner=False)
+def get_media_pool():
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="media")
+
+def load_all_tabs():
+    """Snapshots of every FLOOR_TO_SHEET tab, stale ones fetched in one batchGet.
+
+    Returns (stock_tabs, usage_tabs) as lists of (sheet name, values, headers).
+    """
+    snapshots = get_snapshot_cache()
+    snapshots.prefetch(get_spreadsheet(), list(FLOOR_TO_SHEET.values()), worksheet=get_worksheet)
+    stock_tabs, usage_tabs = [], []
+    for display_name, sheet_name in FLOOR_TO_SHEET.items():
+        values = snapshots.peek(sheet_name)
+        if values is None:
+            values = snapshots.get_values(get_worksheet(sheet_name))
+        if "Penggunaan Inventaris" in display_name:
+            usage_tabs.append((sheet_name, values, HEADERS_USED))
+        else:
+            stock_tabs.append((sheet_name, values, HEADERS))
+    return stock_tabs, usage_tabs
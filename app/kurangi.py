@@ -0,0 +1,126 @@
+"""Menggunakan atau Mengirimkan barang: stock-out, single item or cart."""
+import streamlit as st
+
+from inventaris.search import NameIndexCache
+
+from . import core
+
+KONDISI_DEFAULT = ["Baik", "Rusak"]
+
+
+# Autocomplete indexes, rebuilt only when a tab's values change
+@st.cache_resource(show_spinner=False)
+def get_name_index_cache():
+    return NameIndexCache()
+
+
+def _stock_label(index, nama):
+    stock = index.stock_of(nama)
+    detail = ", ".join(f"{k or '-'}: {q}" for k, q in stock.items() if q > 0)
+    return f"{nama} ({detail})" if detail else nama
+
+
+def render(menu):
+    inventory = core.get_inventory()
+    st.subheader("➖ Kurangi Barang")
+    
+    # 1. Define all necessary inputs for this specific menu
+    gudang = [name for name in core.FLOOR_TO_SHEET if name.startswith("Penambahan")]
+    tempat_display = st.selectbox("Gudang Asal", gudang)
+    ws = core.get_ws(tempat_display)
+    index = get_name_index_cache().get(ws.title, *core.get_snapshot_cache().versioned(ws))
+
+    # Autocomplete: prefix matches first, then close spellings
+    query = st.text_input("🔍 Cari Nama Barang", placeholder="Ketik sebagian nama...")
+    matches = index.search(query) if query else []
+    if matches:
+        nama = st.selectbox(
+            "Nama Barang yang Diambil", matches,
+            format_func=lambda n: _stock_label(index, n),
+        )
+    else:
+        if query:
+            st.caption("Tidak ada nama yang cocok; nama diketik manual.")
+        nama = query.strip()
+    in_stock = [k for k, q in index.stock_of(nama).items() if k and q > 0] if nama else []
+    kondisi = st.selectbox("Kondisi Barang", in_stock or KONDISI_DEFAULT)
+    jumlah = st.number_input("Jumlah", min_value=1)
+    
+    # ADDED: Manual Keterangan for this menu
+    keterangan_pakai = st.text_area("Keterangan / Alasan (Manual)", "Untuk keperluan...")
+    
+    petugas = st.text_input("Petugas yang Mengambil")
+
+    if st.button("Kurangi"):
+        core.get_recorder().set_action(f"{menu} › Kurangi")
+        # 2. Pass the manual keterangan into the transfer function
+        try:
+            inventory.transfer_item(
+                source_floor=tempat_display,
+                target_sheet_name="Data Barang yang Dikirim atau Digunakan",
+                item_name=nama,
+                kondisi=kondisi,
+                jumlah=jumlah,
+                petugas=petugas,
+                keterangan=keterangan_pakai # This ensures it's not missing!
+            )
+            st.success("✅ Log penggunaan berhasil dicatat.")
+        except Exception as e:
+            st.error(f"Error: {e}")
+
+    # --- CART: stage several items, send them in one go ---
+    st.write("---")
+    cart = st.session_state.setdefault("transfer_cart", [])
+
+    # A cart is taken out of one warehouse: the one its first line came from
+    cart_source = cart[0]["source_floor"] if cart else None
+
+    if st.button("🛒 Tambah ke Keranjang"):
+        if not nama:
+            st.error("Nama Barang wajib diisi.")
+        elif cart_source is not None and cart_source != tempat_display:
+            st.error(f"Keranjang berisi barang dari {cart_source}. "
+                     "Kirim atau kosongkan keranjang sebelum memilih gudang lain.")
+        else:
+            cart_source = tempat_display
+            cart.append({
+                "source_floor": tempat_display,
+                "item_name": nama.strip(),
+                "kondisi": kondisi,
+                "jumlah": int(jumlah),
+                "keterangan": keterangan_pakai,
+            })
+
+    if cart:
+        st.write(f"🛒 Keranjang ({len(cart)} item dari {cart_source}):")
+        st.dataframe(
+            [{
+                "Nama Barang": line["item_name"], "Kondisi": line["kondisi"],
+                "Jumlah": line["jumlah"], "Keterangan": line["keterangan"],
+            } for line in cart],
+            use_container_width=True,
+        )
+        cart_col1, cart_col2 = st.columns(2)
+        with cart_col1:
+            kirim_semua = st.button("Kurangi Semua")
+        with cart_col2:
+            if st.button("Kosongkan Keranjang"):
+                cart.clear()
+                st.rerun()
+
+        if kirim_semua:
+            core.get_recorder().set_action(f"{menu} › Kurangi Semua")
+            if not petugas:
+                st.error("Petugas wajib diisi.")
+            else:
+                try:
+                    inventory.transfer_items(
+                        source_floor=cart_source,
+                        target_sheet_name="Data Barang yang Dikirim atau Digunakan",
+                        lines=list(cart),
+                        petugas=petugas,
+                    )
+                    cart.clear()
+                    st.success("✅ Semua item di keranjang berhasil dicatat.")
+                except Exception as e:
+                    st.error(f"Error: {e}")
@@ -0,0 +1,197 @@
+"""Lihat Data: paged browsing, full-tab search and QR labels of one warehouse."""
+from io import BytesIO
+
+import pandas as pd
+import streamlit as st
+
+from inventaris import export, labels
+from inventaris.core import HEADERS, HEADERS_USED
+from inventaris.frames import (FrameCache, HELPER_COLUMNS, NAMA_NORM, PETUGAS_NORM,
+                               frame_from_values, name_column)
+from inventaris.index import drop_tombstones
+from inventaris.paging import PageReader, highlight_kondisi, page_count
+
+from . import core
+
+PAGE_SIZES = [50, 100, 250, 500]
+
+
+# Lihat Data frames, rebuilt only when the underlying snapshot changes
+@st.cache_resource(show_spinner=False)
+def get_frame_cache():
+    return FrameCache()
+
+# Paged reads for browsing; dropped whenever a sheet is written
+@st.cache_resource(show_spinner=False)
+def get_page_reader():
+    snapshots = core.get_snapshot_cache()
+    reader = PageReader(ttl=snapshots.ttl, peek=snapshots.peek, store=snapshots.store)
+    snapshots.add_listener(reader.invalidate)
+    return reader
+
+
+def render(menu):
+    snapshots = core.get_snapshot_cache()
+    st.subheader("📊 Data Gudang")
+    
+    tempat_display = st.selectbox("Pilih Gudang", list(core.FLOOR_TO_SHEET.keys()))
+    
+    # 1. Get the worksheet
+    ws = core.get_ws(tempat_display)
+    
+    if "Penggunaan Inventaris" in tempat_display or "Dikirim" in tempat_display:
+        active_headers = HEADERS_USED # Ensure this is your 9-column list
+    else:
+        active_headers = HEADERS      # Your standard 10-column list
+    # 2. Browse page by page by default; searching needs the whole tab
+    cari = st.checkbox("🔍 Cari / Filter (memuat seluruh data gudang)")
+    pager_col1, pager_col2 = st.columns(2)
+    with pager_col1:
+        page_size = st.selectbox("Baris per halaman", PAGE_SIZES, index=1)
+
+    if cari:
+        # Get data SAFELY to avoid GSpreadException
+        try:
+            # Raw values come from the shared snapshot (1 API call per TTL)
+            raw_values = snapshots.get_values(ws)
+            
+            # Built in one go from the 2-D values (padded/cut to active_headers),
+            # with categoricals and normalized search columns precomputed
+            df = get_frame_cache().get(ws.title, raw_values, active_headers)
+
+        except Exception as e:
+            st.error(f"Gagal mengambil data: {e}")
+            df = pd.DataFrame(columns=active_headers)
+
+        if df.empty:
+            st.warning("Gudang ini masih kosong atau data tidak valid.")
+            st.stop()
+
+        # --- SEARCH UI ---
+        st.write("---")
+        # Creating three columns for better layout
+        row1_col1, row1_col2 = st.columns(2)
+        row2_col1, row2_col2, row2_col3 = st.columns(3)
+
+        with row1_col1:
+            search_nama = st.text_input("🔍 Cari Nama Barang", "")
+        with row1_col2:
+            date_col = next((c for c in active_headers if c.startswith("Tanggal")), "Tanggal Masuk")
+            search_date = st.text_input(f"📅 Cari {date_col} (YYYY-MM-DD)", "")
+
+        with row2_col1:
+            # Dropdown for Tahun Pembuatan (categories are already the unique values)
+            years = ["Semua"] + sorted(df["Tahun Pembuatan"].cat.categories.tolist())
+            filter_year = st.selectbox("📅 Tahun Pembuatan", years)
+
+        with row2_col2:
+            # Dropdown for Kondisi
+            conditions = ["Semua"] + sorted(df["Kondisi"].cat.categories.tolist())
+            filter_kondisi = st.selectbox("🛠️ Kondisi", conditions)
+
+        with row2_col3:
+            # Normalize each distinct name: strip spaces, Title Case, drop empty
+            raw_staff = df["Petugas"].cat.categories.astype(str)
+            normalized_staff = sorted({name.strip().title() for name in raw_staff if name.strip()})
+            
+            # Create the dropdown
+            staff_options = ["Semua"] + normalized_staff
+            filter_petugas = st.selectbox("👤 Petugas", staff_options)
+
+        # Filtering: combine every condition into one mask, select once
+        mask = pd.Series(True, index=df.index)
+
+        # Text filters
+        if search_nama:
+            mask &= df[NAMA_NORM].str.contains(search_nama.lower(), regex=False)
+        
+        if search_date:
+            mask &= df[date_col].astype(str).str.contains(search_date, regex=False)
+
+        # --- DROPDOWN FILTERS ---
+        if filter_year != "Semua":
+            mask &= df["Tahun Pembuatan"] == str(filter_year)
+
+        if filter_kondisi != "Semua":
+            mask &= df["Kondisi"] == filter_kondisi
+
+        if filter_petugas != "Semua":
+            # Compare lowercase of both sides to catch every variation
+            mask &= df[PETUGAS_NORM] == filter_petugas.lower()
+
+        filtered_df = df.loc[mask, [c for c in df.columns if c not in HELPER_COLUMNS]]
+        total = len(filtered_df)
+    else:
+        try:
+            total = get_page_reader().row_count(ws)
+        except Exception as e:
+            st.error(f"Gagal mengambil data: {e}")
+            st.stop()
+        if total == 0:
+            st.warning("Gudang ini masih kosong atau data tidak valid.")
+            st.stop()
+
+    # 3. Pager: only the current page is read, styled and sent to the browser
+    n_pages = page_count(total, page_size)
+    with pager_col2:
+        page = st.number_input(f"Halaman (dari {n_pages})", min_value=1, max_value=n_pages, value=1, step=1)
+
+    if cari:
+        page_df = filtered_df.iloc[(page - 1) * page_size: page * page_size]
+    else:
+        try:
+            rows = get_page_reader().read_page(ws, page, page_size, len(active_headers))
+        except Exception as e:
+            st.error(f"Gagal mengambil data: {e}")
+            st.stop()
+        # Pages are cut by sheet position, so tombstones stay in (and in the count)
+        page_df = frame_from_values([active_headers] + rows, active_headers,
+                                    tombstones=True).drop(columns=HELPER_COLUMNS)
+        page_df.index = range((page - 1) * page_size, (page - 1) * page_size + len(page_df))
+
+    # --- HIGHLIGHTING (whole page at once) ---
+    styled_df = page_df.style.apply(highlight_kondisi, axis=None)
+    if cari:
+        st.write(f"Menampilkan {len(page_df)} dari {total} data (halaman {page}/{n_pages}):")
+    else:
+        st.write(f"Menampilkan {len(page_df)} dari {total} baris sheet, termasuk stok HABIS "
+                 f"(halaman {page}/{n_pages}):")
+    st.dataframe(styled_df, use_container_width=True)
+
+    # --- QR LABELS for the whole filtered selection (not just this page) ---
+    if cari:
+        with st.expander(f"🏷️ Cetak Label QR ({total} item)"):
+            label_format = st.radio("Format", ["PDF", "PNG (zip)"], horizontal=True)
+            if st.button("Buat Label"):
+                core.get_recorder().set_action(f"{menu} › Buat Label")
+                rows = zip(filtered_df["Kode Inventaris"], filtered_df[name_column(active_headers)])
+                out = BytesIO()
+                with st.spinner("Membuat label..."):
+                    if label_format == "PDF":
+                        n_sheets = labels.write_pdf(rows, out)
+                        file_name, mime = f"label_{ws.title}.pdf", "application/pdf"
+                    else:
+                        n_sheets = labels.write_png_zip(rows, out)
+                        file_name, mime = f"label_{ws.title}.zip", "application/zip"
+                if n_sheets:
+                    st.download_button(f"⬇️ Unduh {n_sheets} halaman", out.getvalue(),
+                                       file_name=file_name, mime=mime)
+                else:
+                    st.warning("Tidak ada baris untuk dibuatkan label.")
+
+    # --- EXPORT: filtered rows (or the whole tab), typed per active_headers ---
+    with st.expander("⬇️ Ekspor Data" + (f" ({total} baris terfilter)" if cari else "")):
+        export_format = st.radio("Format ekspor", export.available_formats(), horizontal=True)
+        if st.button("Ekspor"):
+            core.get_recorder().set_action(f"{menu} › Ekspor")
+            if cari:
+                # filtered_df already has exactly active_headers; no styled copy
+                rows = filtered_df.itertuples(index=False, name=None)
+            else:
+                rows = drop_tombstones(snapshots.get_values(ws))[1:]
+            out = BytesIO()
+            with st.spinner("Mengekspor..."):
+                n_rows = export.write(export_format, rows, active_headers, out)
+            ext, mime = export.FORMATS[export_format]
+            st.download_button(f"⬇️ Unduh {n_rows} baris", out.getvalue(),
+                               file_name=f"{ws.title}.{ext}", mime=mime)
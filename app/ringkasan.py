@@ -0,0 +1,37 @@
+"""Ringkasan Stok: stock per item across every warehouse tab."""
+import streamlit as st
+
+from inventaris.summary import SummaryCache, TOTAL_STOCK
+
+from . import core
+
+
+# Cross-warehouse summary, recomputed only when a tab snapshot changes
+@st.cache_resource(show_spinner=False)
+def get_summary_cache():
+    return SummaryCache()
+
+
+def render(menu):
+    st.subheader("📦 Ringkasan Stok Semua Gudang")
+
+    try:
+        summary = get_summary_cache().get(*core.load_all_tabs())
+    except Exception as e:
+        st.error(f"Gagal mengambil data: {e}")
+        st.stop()
+
+    sum_col1, sum_col2 = st.columns(2)
+    with sum_col1:
+        search_nama = st.text_input("🔍 Cari Nama Barang", "")
+    with sum_col2:
+        hanya_ada = st.checkbox("Hanya barang yang masih ada stok", value=True)
+
+    view = summary
+    if search_nama:
+        view = view[view["Nama Barang"].str.lower().str.contains(search_nama.lower(), regex=False)]
+    if hanya_ada:
+        view = view[view[TOTAL_STOCK] > 0]
+
+    st.write(f"Menampilkan {len(view)} barang:")
+    st.dataframe(view, use_container_width=True, hide_index=True)
@@ -0,0 +1,300 @@
+"""Tambahkan Inventori: single items with photo/QR upload, and bulk import.
+
+Cloudinary, Pillow (via inventaris.media) and pandas are only imported once
+this menu is first opened.
+"""
+from concurrent.futures import as_completed
+from datetime import datetime
+from io import BytesIO
+
+import cloudinary
+import cloudinary.uploader
+import pandas as pd
+import streamlit as st
+
+from inventaris import bulk, media, media_cache
+from inventaris.batch import SheetBatch
+from inventaris.cache import record_at
+from inventaris.core import HEADERS
+from inventaris.index import item_key, restore_note
+from inventaris.sequence import make_kode
+
+from . import core
+
+
+@st.cache_resource(show_spinner=False)
+def configure_cloudinary():
+    cloudinary.config(
+        cloud_name=st.secrets["cloudinary"]["cloud_name"],
+        api_key=st.secrets["cloudinary"]["api_key"],
+        api_secret=st.secrets["cloudinary"]["api_secret"]
+    )
+
+# Remembers earlier Cloudinary URLs by content hash (see inventaris.media_cache)
+@st.cache_resource(show_spinner=False)
+def get_media_cache():
+    path = st.secrets.get("media", {}).get("cache_path", "media_cache.sqlite3")
+    return media_cache.MediaCache(path)
+
+IMPORT_CHUNK = 500  # sheet operations per batchUpdate call
+
+def bulk_import(ws, items, tempat_penyimpanan, progress=None):
+    """Merge validated import items into ``ws`` using batched writes.
+
+    Existing (Nama Barang, Tanggal Masuk, Kondisi) rows get their Jumlah
+    increased; new keys are appended with fresh No/Kode Inventaris. Every
+    item is also logged. ``progress(done, total)`` is called per chunk.
+    Returns (rows_updated, rows_added).
+    """
+    inventory = core.get_inventory()
+    snapshots = inventory.snapshots
+    inventory.ensure_header(ws)
+
+    state = {}
+    def lookup(nama, tanggal, kondisi):
+        state["values"], row = snapshots.find_row(ws, nama, tanggal, kondisi)
+        return row
+    def current_qty(row):
+        return int(record_at(state["values"], row, HEADERS)["Jumlah"] or 0)
+
+    updates, appends = bulk.merge(items, lookup, current_qty)
+
+    # Build every operation first, then send them in chunks
+    ops = []
+    for row, (new_qty, item) in updates.items():
+        existing = record_at(state["values"], row, HEADERS)
+        ops.append(("update", row, new_qty, item, existing))
+    numbers = inventory.sequences.allocate(ws, len(appends)) if appends else []
+    for no, item in zip(numbers, appends):
+        new_row = [
+            no,
+            make_kode(item["Tanggal Masuk"], no),
+            item["Nama Barang"],
+            item["Tanggal Masuk"],
+            item.get("Tahun Pembuatan", ""),
+            item.get("Tempat Penyimpanan") or tempat_penyimpanan,
+            item["Jumlah"],
+            item["Kondisi"],
+            item["Petugas"],
+            item.get("keterangan", ""),
+        ]
+        ops.append(("append", new_row, item))
+
+    total = len(ops)
+    for start in range(0, total, IMPORT_CHUNK):
+        batch = SheetBatch(cache=snapshots)
+        new_rows = []
+        for op in ops[start:start + IMPORT_CHUNK]:
+            if op[0] == "update":
+                _, row, new_qty, item, existing = op
+                added_qty = new_qty - int(existing["Jumlah"] or 0)
+                # Relative, so a concurrent transfer out of the row is kept
+                key = item_key(existing)
+                batch.adjust(ws, row, 7, added_qty, existing["Jumlah"] or 0, key=key)
+                note = restore_note(existing["keterangan"])
+                if item.get("keterangan") or note != existing["keterangan"]:
+                    # A restocked tombstone drops its "depleted" mark, keeping the note
+                    batch.update_cell(ws, row, 10, item.get("keterangan") or note, key=key)
+                log_data = existing
+            else:
+                _, new_row, item = op
+                new_rows.append(new_row)
+                log_data = dict(zip(HEADERS, new_row))
+                added_qty = item["Jumlah"]
+            inventory.write_log(log_data, "TAMBAH", added_qty, item["Petugas"],
+                      item.get("keterangan") or "Impor massal", batch=batch)
+        # All new rows of the chunk go out as a single appendCells
+        batch.append_rows(ws, new_rows)
+        batch.commit()
+        if progress:
+            progress(min(start + IMPORT_CHUNK, total), total)
+    return len(updates), len(appends)
+
+
+def render(menu):
+    configure_cloudinary()
+    mode = st.radio("Mode", ["Satu Barang", "Impor Massal (CSV/Excel)"], horizontal=True)
+    if mode == "Impor Massal (CSV/Excel)":
+        render_import(menu)
+    else:
+        render_single(menu)
+
+
+def render_import(menu):
+    st.subheader("📥 Impor Massal Inventori")
+    st.caption(
+        "Kolom wajib: " + ", ".join(bulk.REQUIRED_COLUMNS)
+        + ". Kolom lain yang dikenali: Tahun Pembuatan, Tempat Penyimpanan, keterangan."
+    )
+    gudang_options = [k for k in core.FLOOR_TO_SHEET if k.startswith("Penambahan")]
+    tempat_display = st.selectbox("Gudang Tujuan", gudang_options)
+    # .xlsx only: pandas reads it with openpyxl, while .xls would need xlrd
+    berkas = st.file_uploader("📄 Upload CSV / Excel (.xlsx)", type=["csv", "xlsx"])
+
+    if berkas is not None:
+        try:
+            if berkas.name.lower().endswith(".csv"):
+                df_import = pd.read_csv(berkas, dtype=str, keep_default_na=False)
+            else:
+                df_import = pd.read_excel(berkas)
+        except Exception as e:
+            st.error(f"Gagal membaca berkas: {e}")
+            st.stop()
+
+        items, errors = bulk.validate(df_import.to_dict("records"), HEADERS, core.KONDISI_OPTIONS)
+        st.write(f"{len(items)} baris valid, {len(errors)} baris bermasalah.")
+        if errors:
+            st.dataframe(
+                pd.DataFrame(errors, columns=["Baris", "Masalah"]),
+                use_container_width=True,
+            )
+
+        if items and st.button("Impor"):
+            core.get_recorder().set_action(f"{menu} › Impor")
+            bar = st.progress(0.0, text="Menyimpan...")
+            try:
+                updated, added = bulk_import(
+                    core.get_ws(tempat_display), items, tempat_display,
+                    progress=lambda done, total: bar.progress(done / total, text=f"{done}/{total}"),
+                )
+                bar.progress(1.0, text="Selesai")
+                st.success(f"✅ {added} barang baru ditambahkan, {updated} barang diperbarui.")
+            except Exception as e:
+                st.error(f"Error: {e}")
+
+
+def render_single(menu):
+    recorder = core.get_recorder()
+    inventory = core.get_inventory()
+    st.subheader("➕ Tambah Barang + 📤 Upload Gambar")
+    nama = st.text_input("Nama Barang")
+    jumlah = st.number_input("Jumlah", min_value=1, step=1)
+    
+    # NEW: Manual Date Input
+    tanggal_input = st.date_input("Tanggal Masuk", datetime.now())
+    # Convert date to string format YYYY-MM-DD
+    tanggal_str = tanggal_input.strftime("%Y-%m-%d")
+
+    # Update Kondisi and Keterangan (Based on your new 10-column system)
+    kondisi = st.selectbox("Kondisi", core.KONDISI_OPTIONS)
+    keterangan = st.text_area("Keterangan", "Stok baru")
+    petugas = st.text_input("Nama Petugas")
+    
+    # Hidden Tahun Pembuatan (Optional: you can make this a text input too)
+    tahun_pembuatan = st.text_input("Tahun Pembuatan", "2024")
+    
+    gudang_options = [k for k in core.FLOOR_TO_SHEET if k.startswith("Penambahan")]
+    tempat_display = st.selectbox("Gudang Tujuan", gudang_options)
+    gambar = st.file_uploader("📷 Upload Gambar Barang", type=["jpg", "jpeg", "png"])
+
+    if st.button("Simpan"):
+        recorder.set_action(f"{menu} › Simpan")
+        if not nama or not petugas:
+            st.error("Nama Barang dan Petugas wajib diisi.")
+        elif not gambar:
+            st.error("Wajib upload gambar barang.")
+        else:
+            # Resolve the tab first: a bad choice stops here, before any media work
+            ws = core.get_ws(tempat_display)
+
+            # 1. Prepare media locally. A photo we have uploaded before is
+            # recognised by its hash and reuses the earlier URLs. Otherwise
+            # shrink it, fix its public_id so the final URL is known now,
+            # and render the QR for that URL.
+            now = datetime.now()
+            uploaded = get_media_cache()
+            raw_image = gambar.getvalue()
+            image_cache_key = media_cache.image_key(raw_image)
+            image_url = uploaded.get(image_cache_key)
+            image_cached = image_url is not None
+            if not image_cached:
+                with recorder.span("phase", "downscale_image", size=len(raw_image)):
+                    image_bytes, image_ext = media.downscale_image(raw_image)
+                image_id = media.public_id("inventory_items", nama, now)
+                image_url = cloudinary.CloudinaryImage(image_id).build_url(secure=True, format=image_ext)
+
+            qr_cache_key = media_cache.qr_key(image_url)
+            qr_url = uploaded.get(qr_cache_key)
+            if qr_url is None:
+                qr_bytes = media.make_qr_png(image_url)
+
+            def simpan_ke_sheet():
+                # Sheet + log writes for this save go out as one batch per spreadsheet
+                batch = SheetBatch(cache=inventory.snapshots)
+                
+                # --- CALL UPSERT WITH MANUAL DATE ---
+                inventory.upsert_item(
+                    ws=ws,
+                    nama_barang=nama,
+                    tanggal_masuk=tanggal_str, # Use manual date
+                    tahun_pembuatan=tahun_pembuatan,
+                    tempat_penyimpanan=tempat_display,
+                    jumlah=jumlah,
+                    kondisi=kondisi,
+                    petugas=petugas,
+                    keterangan=keterangan,
+                    batch=batch
+                )
+               
+                # PREPARE THE DATA FOR LOG
+                item_data_for_log = {
+                    "Kode Inventaris": "AUTO",  # Or your logic for generated code
+                    "Nama Barang": nama,
+                    "Tahun Pembuatan": tahun_pembuatan,
+                    "Tempat Penyimpanan": tempat_display,
+                    "Kondisi": kondisi
+                }
+
+                # Write to Log Sheet & Trigger GAS
+                inventory.write_log(
+                    item_data=item_data_for_log, 
+                    action="TAMBAH", 
+                    qty_used=jumlah, 
+                    petugas=petugas, 
+                    keterangan=keterangan,
+                    batch=batch
+                )
+                batch.commit()
+
+            # 2. Image upload, QR upload and sheet write run side by side;
+            # uploads are skipped when the cache already has the URL
+            def upload_image():
+                with recorder.span("cloudinary", "upload", size=len(image_bytes)):
+                    cloudinary.uploader.upload(BytesIO(image_bytes), public_id=image_id)
+                uploaded.put(image_cache_key, image_url)
+                return image_url
+
+            def upload_qr():
+                with recorder.span("cloudinary", "upload", size=len(qr_bytes)):
+                    uploader_result = cloudinary.uploader.upload(
+                        BytesIO(qr_bytes),
+                        public_id=media.public_id("qr_codes", f"qr_{nama}", now)
+                    )
+                uploaded.put(qr_cache_key, uploader_result["secure_url"])
+                return uploader_result["secure_url"]
+
+            pool = core.get_media_pool()
+            futures = {pool.submit(recorder.bind(simpan_ke_sheet)): "sheet"}
+            if not image_cached:
+                futures[pool.submit(recorder.bind(upload_image))] = "gambar"
+            else:
+                st.image(image_url, caption="📷 Gambar Barang", width=200)
+            if qr_url is None:
+                futures[pool.submit(recorder.bind(upload_qr))] = "qr"
+            else:
+                st.image(qr_url, caption="📱 QR Code Barang", width=200)
+
+            # 3. UI Feedback, shown as each job finishes
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    st.error(f"Gagal ({job}): {e}")
+                    continue
+                if job == "sheet":
+                    st.success("✅ Data berhasil disimpan dan dicatat di Log.")
+                elif job == "gambar":
+                    st.image(result, caption="📷 Gambar Barang", width=200)
+                else:
+                    st.image(result, caption="📱 QR Code Barang", width=200)
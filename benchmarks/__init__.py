@@ -0,0 +1 @@
+"""Offline benchmarks: inventory operations against in-memory fakes."""
@@ -0,0 +1,231 @@
+"""In-memory stand-ins for the gspread and Cloudinary calls the app makes.
+
+Only the surface used by ``inventaris`` is implemented. Every call that
+would be a network request is counted on a shared ``FakeAPI`` and can be
+slowed down by a fixed ``latency`` (seconds) to mimic a real round trip.
+Values are kept as strings, the way the Sheets API returns them.
+"""
+import re
+import threading
+import time
+from collections import Counter
+
+_RANGE = re.compile(r"^([A-Z]+)(\d+)(?::([A-Z]+)(\d*))?$")
+
+
+def _col_number(letters):
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - 64
+    return n
+
+
+def _plain(cell):
+    value = cell.get("userEnteredValue", {})
+    if "numberValue" in value:
+        number = value["numberValue"]
+        return str(int(number)) if float(number).is_integer() else str(number)
+    if "boolValue" in value:
+        return "TRUE" if value["boolValue"] else "FALSE"
+    return value.get("stringValue", "")
+
+
+def _trim(row):
+    row = list(row)
+    while row and row[-1] == "":
+        row.pop()
+    return row
+
+
+class FakeAPIError(Exception):
+    """Shaped like gspread's APIError: the status is on ``response``."""
+
+    def __init__(self, status, message=""):
+        super().__init__(f"{status}: {message}")
+        self.response = type("Response", (), {"status_code": status})()
+
+
+class FakeAPI:
+    """Call counter (and optional delay) shared by every fake handle."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def hit(self, name, latency=None):
+        with self._lock:
+            self.calls[name] += 1
+        delay = self.latency if latency is None else latency
+        if delay:
+            time.sleep(delay)
+
+    @property
+    def total(self):
+        return sum(self.calls.values())
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, sheet_id, rows=None, grid_rows=1000):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self.rows = [[str(c) for c in r] for r in rows or []]
+        # Grid size like the real sheet: updateCells may not go past it
+        self.grid_rows = max(grid_rows, len(self.rows))
+
+    def _padded(self, rows):
+        width = max((len(r) for r in self.rows), default=0)
+        return [r + [""] * (width - len(r)) for r in rows]
+
+    def get_all_values(self):
+        self.spreadsheet.api.hit("get_all_values")
+        return self._padded(self.rows)
+
+    def get(self, range_name):
+        self.spreadsheet.api.hit("get")
+        m = _RANGE.match(range_name)
+        first_col, start = _col_number(m.group(1)), int(m.group(2))
+        last_col = _col_number(m.group(3)) if m.group(3) else first_col
+        end = int(m.group(4)) if m.group(4) else len(self.rows)
+        return [_trim(r[first_col - 1:last_col]) for r in self.rows[start - 1:end]]
+
+    def col_values(self, col):
+        self.spreadsheet.api.hit("col_values")
+        values = [r[col - 1] if len(r) >= col else "" for r in self.rows]
+        return _trim(values)
+
+    def row_values(self, row):
+        self.spreadsheet.api.hit("row_values")
+        return _trim(self.rows[row - 1]) if row <= len(self.rows) else []
+
+    def update(self, range_name, values):
+        self.spreadsheet.api.hit("update")
+        m = _RANGE.match(range_name)
+        col, row = _col_number(m.group(1)), int(m.group(2))
+        for r_offset, new in enumerate(values):
+            self._set(row + r_offset, col, [str(v) for v in new])
+
+    def _set(self, row, col, cells):
+        while len(self.rows) < row:
+            self.rows.append([])
+        target = self.rows[row - 1]
+        if len(target) < col - 1 + len(cells):
+            target.extend([""] * (col - 1 + len(cells) - len(target)))
+        target[col - 1:col - 1 + len(cells)] = cells
+
+
+class FakeSpreadsheet:
+    def __init__(self, api, spreadsheet_id):
+        self.api = api
+        self.id = spreadsheet_id
+        self._sheets = {}
+
+    def _sheet_by_id(self, sheet_id):
+        return next(ws for ws in self._sheets.values() if ws.id == sheet_id)
+
+    def add_worksheet(self, title, rows=1000, cols=10, values=None):
+        self.api.hit("add_worksheet")
+        ws = FakeWorksheet(self, title, len(self._sheets) + 1, values, grid_rows=rows)
+        self._sheets[title] = ws
+        return ws
+
+    def worksheet(self, title):
+        self.api.hit("worksheet")
+        return self._sheets[title]
+
+    def worksheets(self):
+        self.api.hit("worksheets")
+        return list(self._sheets.values())
+
+    def worksheet_or_create(self, title, header=None):
+        """Like the app's monthly log lookup: open the tab, adding it if new."""
+        if title in self._sheets:
+            return self.worksheet(title)
+        return self.add_worksheet(title, values=[header] if header else None)
+
+    def values_batch_get(self, ranges):
+        """Whole tabs ("'Title'") or A1 ranges of them ("'Title'!A5:J")."""
+        self.api.hit("values_batch_get")
+        out = []
+        for name in ranges:
+            title, _, cells = name.rpartition("!") if "!" in name else (name, "", "")
+            ws = self._sheets.get(title.strip("'").replace("''", "'"))
+            if ws is None:
+                raise FakeAPIError(400, f"Unable to parse range: {name}")
+            rows = ws.rows
+            if cells:
+                m = _RANGE.match(cells)
+                first_col, start = _col_number(m.group(1)), int(m.group(2))
+                last_col = _col_number(m.group(3)) if m.group(3) else first_col
+                end = int(m.group(4)) if m.group(4) else len(ws.rows)
+                rows = [r[first_col - 1:last_col] for r in ws.rows[start - 1:end]]
+            rows = [_trim(r) for r in rows]
+            while rows and not rows[-1]:
+                rows.pop()  # like the API: no trailing empty rows
+            out.append({"values": rows})
+        return {"valueRanges": out}
+
+    def fetch_sheet_metadata(self):
+        self.api.hit("fetch_sheet_metadata")
+        return {"sheets": [
+            {"properties": {"sheetId": ws.id, "title": ws.title,
+                            "gridProperties": {"rowCount": ws.grid_rows}}}
+            for ws in self._sheets.values()
+        ]}
+
+    def batch_update(self, body):
+        """Apply every request, or none if one is invalid (like the real API)."""
+        self.api.hit("batch_update")
+        grid = {ws.id: ws.grid_rows for ws in self._sheets.values()}
+        for request in body["requests"]:
+            if "appendDimension" in request:
+                spec = request["appendDimension"]
+                if spec["sheetId"] not in grid:
+                    raise FakeAPIError(400, f"No grid with id: {spec['sheetId']}")
+                grid[spec["sheetId"]] += spec["length"]
+            elif "updateCells" in request:
+                rng = request["updateCells"]["range"]
+                if rng["sheetId"] not in grid:
+                    raise FakeAPIError(400, f"No grid with id: {rng['sheetId']}")
+                if rng["endRowIndex"] > grid[rng["sheetId"]]:
+                    raise FakeAPIError(400, "Range exceeds grid limits")
+        for request in body["requests"]:
+            if "appendDimension" in request:
+                spec = request["appendDimension"]
+                self._sheet_by_id(spec["sheetId"]).grid_rows += spec["length"]
+            elif "updateCells" in request:
+                spec = request["updateCells"]
+                rng = spec["range"]
+                ws = self._sheet_by_id(rng["sheetId"])
+                for offset, row in enumerate(spec["rows"]):
+                    ws._set(rng["startRowIndex"] + 1 + offset, rng["startColumnIndex"] + 1,
+                            [_plain(c) for c in row["values"]])
+            elif "appendCells" in request:
+                spec = request["appendCells"]
+                ws = self._sheet_by_id(spec["sheetId"])
+                ws.rows.extend([_plain(c) for c in row["values"]] for row in spec["rows"])
+                ws.grid_rows = max(ws.grid_rows, len(ws.rows))
+            elif "deleteDimension" in request:
+                rng = request["deleteDimension"]["range"]
+                ws = self._sheet_by_id(rng["sheetId"])
+                del ws.rows[rng["startIndex"]:rng["endIndex"]]
+                ws.grid_rows -= rng["endIndex"] - rng["startIndex"]
+        return {}
+
+
+class FakeUploader:
+    """``cloudinary.uploader`` stand-in: reads the file, returns a URL."""
+
+    def __init__(self, api, latency=None):
+        self.api = api
+        self.latency = latency
+
+    def upload(self, file, public_id=None, **options):
+        data = file.read() if hasattr(file, "read") else file
+        self.api.hit("cloudinary.upload", self.latency)
+        return {
+            "public_id": public_id,
+            "bytes": len(data),
+            "secure_url": f"https://res.cloudinary.com/fake/image/upload/{public_id}",
+        }
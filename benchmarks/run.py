@@ -0,0 +1,201 @@
+"""Benchmark the inventory hot paths offline.
+
+    python -m benchmarks.run                       # 1k, 10k, 100k rows
+    python -m benchmarks.run --rows 10000 --latency 0.05 --store
+    python -m benchmarks.run --only upsert_item,write_log --json out.jsonl
+
+Each scenario runs ``--ops`` times against a fresh fixture of ``rows`` stock
+rows and reports operations per second, Sheets/Cloudinary calls per
+operation (counted by the fakes) and peak traced memory. ``--store`` puts
+the LocalStore in front like the app does; calls then only happen on cold
+loads, since replication is not started here.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+from inventaris.batch import SheetBatch
+from inventaris.cache import SnapshotCache
+from inventaris.core import HEADERS, HEADERS_USED, LOG_HEADERS, USED_SHEET, Inventory
+from inventaris.sequence import SequenceAllocator, make_kode
+from inventaris.store import LocalStore
+
+from .fakes import FakeAPI, FakeSpreadsheet, FakeUploader
+
+SOURCE_FLOOR = "Penambahan Inventar BMKG Pusat"
+SOURCE_SHEET = "BMKG Pusat(1)"
+KONDISI = ["Baik", "Rusak", "Perlu Perbaikan"]
+
+
+def stock_rows(count):
+    rows = [HEADERS]
+    for no in range(1, count + 1):
+        tanggal = f"2024-{no % 12 + 1:02d}-{no % 28 + 1:02d}"
+        rows.append([
+            no, make_kode(tanggal, no), f"Barang {no}", tanggal, "2023",
+            SOURCE_FLOOR, 10 ** 6, KONDISI[no % 3], f"Petugas {no % 40}", "",
+        ])
+    return rows
+
+
+class Fixture:
+    def __init__(self, rows, latency=0.0, store_dir=None):
+        self.api = FakeAPI(latency)
+        self.spreadsheet = FakeSpreadsheet(self.api, "stock")
+        self.log_spreadsheet = FakeSpreadsheet(self.api, "log")
+        self.spreadsheet.add_worksheet(SOURCE_SHEET, values=stock_rows(rows))
+        self.spreadsheet.add_worksheet(USED_SHEET, values=[HEADERS_USED])
+        self.uploader = FakeUploader(self.api)
+        self.notified = []
+
+        store = LocalStore(os.path.join(store_dir, "bench.sqlite3")) if store_dir else None
+        self.snapshots = SnapshotCache(ttl=3600, store=store)
+        self.sequences = SequenceAllocator(ttl=3600, peek=self.snapshots.peek)
+        # Handles are looked up once, as the app's st.cache_resource does
+        worksheet = lru_cache(maxsize=None)(self.spreadsheet.worksheet)
+        log_worksheet = lru_cache(maxsize=None)(
+            lambda name: self.log_spreadsheet.worksheet_or_create(name, LOG_HEADERS))
+        self.inventory = Inventory(
+            self.snapshots, self.sequences, {SOURCE_FLOOR: SOURCE_SHEET},
+            worksheet=worksheet,
+            log_worksheet=log_worksheet,
+            notify=self.notified.append,
+        )
+        self.source = worksheet(SOURCE_SHEET)
+        self.rows = rows
+
+    def warm(self):
+        """Load the source snapshot so scenarios measure the warm path."""
+        self.inventory.ensure_header(self.source)
+        self.inventory.write_log({"Nama Barang": "warmup"}, "TAMBAH", 0, "bench")
+
+
+# --- scenarios: fn(fixture, i) performs operation number i -------------
+
+def op_upsert_item(fx, i):
+    # Alternate between topping up an existing row and adding a new one
+    if i % 2:
+        no = i % fx.rows + 1
+        nama, tanggal, kondisi = f"Barang {no}", f"2024-{no % 12 + 1:02d}-{no % 28 + 1:02d}", KONDISI[no % 3]
+    else:
+        nama, tanggal, kondisi = f"Baru {i}", "2025-01-01", "Baik"
+    fx.inventory.upsert_item(fx.source, nama, tanggal, "2024", SOURCE_FLOOR, 1, kondisi, "bench", "")
+
+
+def op_transfer_item(fx, i):
+    no = i % fx.rows + 1
+    fx.inventory.transfer_item(SOURCE_FLOOR, USED_SHEET, f"Barang {no}", KONDISI[no % 3], 1, "bench")
+
+
+def op_write_log(fx, i):
+    fx.inventory.write_log({"Nama Barang": f"Barang {i}", "Kondisi": "Baik"}, "TAMBAH", 1, "bench")
+
+
+def op_simpan(fx, i, pool):
+    # The "Simpan" button: sheet+log batch alongside image and QR uploads
+    def sheet():
+        batch = SheetBatch(cache=fx.snapshots)
+        fx.inventory.upsert_item(fx.source, f"Simpan {i}", "2025-01-01", "2024",
+                                 SOURCE_FLOOR, 1, "Baik", "bench", "", batch=batch)
+        fx.inventory.write_log({"Nama Barang": f"Simpan {i}"}, "TAMBAH", 1, "bench", batch=batch)
+        batch.commit()
+    jobs = [
+        pool.submit(sheet),
+        pool.submit(fx.uploader.upload, BytesIO(b"\0" * 200_000), public_id=f"inventory_items/{i}"),
+        pool.submit(fx.uploader.upload, BytesIO(b"\0" * 2_000), public_id=f"qr_codes/{i}"),
+    ]
+    for job in jobs:
+        job.result()
+
+
+def op_lihat_data(fx, i):
+    from inventaris.frames import NAMA_NORM, frame_from_values
+
+    values = fx.snapshots.get_values(fx.source)
+    df = frame_from_values(values, HEADERS)
+    df[df[NAMA_NORM].str.contains(f"barang {i % 10}", regex=False)]
+
+
+SCENARIOS = {
+    "upsert_item": op_upsert_item,
+    "transfer_item": op_transfer_item,
+    "write_log": op_write_log,
+    "simpan": op_simpan,
+    "lihat_data": op_lihat_data,
+}
+HEAVY = {"lihat_data"}  # rebuilds a whole frame per op
+
+
+def _loop(fn, fx, ops, pool):
+    extra = (pool,) if fn is op_simpan else ()
+    for i in range(ops):
+        fn(fx, i, *extra)
+
+
+def run_scenario(name, rows, ops, latency, use_store, memory_ops):
+    fn = SCENARIOS[name]
+    ops = max(1, ops // 20) if name in HEAVY else ops
+    with tempfile.TemporaryDirectory() as tmp, ThreadPoolExecutor(max_workers=8) as pool:
+        fx = Fixture(rows, latency, tmp if use_store else None)
+        fx.warm()
+        before = fx.api.total
+        started = time.perf_counter()
+        _loop(fn, fx, ops, pool)
+        elapsed = time.perf_counter() - started
+        calls = fx.api.total - before
+
+        # Separate, shorter pass for memory: tracing slows everything down
+        tracemalloc.start()
+        _loop(fn, fx, min(ops, memory_ops), pool)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "scenario": name,
+        "rows": rows,
+        "ops": ops,
+        "store": use_store,
+        "latency": latency,
+        "ops_per_sec": round(ops / elapsed, 1),
+        "calls_per_op": round(calls / ops, 2),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="1000,10000,100000",
+                        help="comma-separated fixture sizes")
+    parser.add_argument("--ops", type=int, default=200, help="operations per scenario")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds added to every fake API call")
+    parser.add_argument("--store", action="store_true", help="use a LocalStore like the app")
+    parser.add_argument("--only", help="comma-separated scenarios: " + ", ".join(SCENARIOS))
+    parser.add_argument("--memory-ops", type=int, default=20,
+                        help="operations traced for peak memory")
+    parser.add_argument("--json", help="append results as JSON lines to this file")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(SCENARIOS)
+    results = []
+    print(f"{'scenario':<14}{'rows':>8}{'ops/s':>12}{'calls/op':>10}{'peak KiB':>12}")
+    for rows in (int(r) for r in args.rows.split(",")):
+        for name in names:
+            result = run_scenario(name, rows, args.ops, args.latency, args.store, args.memory_ops)
+            results.append(result)
+            print(f"{name:<14}{rows:>8}{result['ops_per_sec']:>12}"
+                  f"{result['calls_per_op']:>10}{result['peak_kib']:>12}")
+    if args.json:
+        with open(args.json, "a", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+    return results
+
+
+if __name__ == "__main__":
+    main()
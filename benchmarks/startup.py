@@ -0,0 +1,64 @@
+"""Import-time budgets for the login screen, the core and each menu.
+
+    python -m benchmarks.startup            # exits 1 if a budget is exceeded
+
+Each stage is imported in a fresh interpreter under ``-X importtime``,
+after the stages it builds on, so a menu is charged only for what it adds
+on top of the core. Importing ``app.*`` has no side effects, so no secrets
+or network are needed; the app's dependencies must be installed.
+"""
+import argparse
+import subprocess
+import sys
+
+# (stage, modules imported for it, modules already loaded before it, budget ms)
+STAGES = [
+    ("login", ["streamlit", "streamlit_authenticator"], [], 1500),
+    ("core", ["app.core"], ["streamlit", "streamlit_authenticator"], 600),
+    ("Tambahkan Inventori", ["app.tambah"], ["app.core"], 900),
+    ("Menggunakan atau Mengirimkan barang", ["app.kurangi"], ["app.core"], 50),
+    ("Lihat Data", ["app.lihat"], ["app.core"], 700),
+    ("Ringkasan Stok", ["app.ringkasan"], ["app.core"], 700),
+    ("Analitik Log", ["app.analitik"], ["app.core"], 50),
+]
+
+
+def import_ms(modules, preloaded=()):
+    """Cumulative import time (ms) of ``modules`` on top of ``preloaded``."""
+    code = "".join(f"import {m}\n" for m in preloaded)
+    code += "import sys; sys.stderr.write('--- measure ---\\n')\n"
+    code += "".join(f"import {m}\n" for m in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True,
+    )
+    lines = result.stderr.split("--- measure ---\n", 1)[1].splitlines()
+    total_us = 0
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented under their parent; the top-level
+        # entry's cumulative time already covers them
+        if name[1:] in modules:
+            total_us += int(cumulative)
+    return total_us / 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="take the best of N runs")
+    args = parser.parse_args(argv)
+
+    failed = False
+    print(f"{'stage':<38}{'ms':>9}{'budget':>9}")
+    for stage, modules, preloaded, budget in STAGES:
+        ms = min(import_ms(modules, preloaded) for _ in range(args.runs))
+        over = ms > budget
+        failed |= over
+        print(f"{stage:<38}{ms:>9.1f}{budget:>9}{'  OVER' if over else ''}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
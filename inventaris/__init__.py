@@ -0,0 +1 @@
+"""Helper modules for the inventory dashboard (tes3push.py)."""
@@ -0,0 +1,232 @@
+"""Cross-month usage analytics over the monthly ``Log_YYYY_MM`` tabs.
+
+Usage is kept as a small cube in SQLite: one row per (month, item,
+petugas) with the summed Jumlah and the number of log entries. Only
+stock-outs count as usage: log rows whose Tempat Penyimpanan is
+``USED_LOCATION`` (action "USE"); additions and moves between warehouses
+are left out. Per-item,
+per-petugas and per-month reports are plain GROUP BYs over that cube, so
+a yearly report never touches Google Sheets.
+
+* Closed months never change: each is read once, aggregated and frozen.
+  A month the local store holds is read from it, so rows still waiting to
+  replicate at month rollover are counted; the others are fetched from
+  Sheets in a single batchGet.
+* The current month is fed from the shared snapshot of its log tab, which
+  is already refreshed incrementally; only rows past the stored row count
+  are added to the cube, unless the tab shrank (then the month is rebuilt).
+"""
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from inventaris.core import USED_LOCATION
+
+LOG_TITLE = re.compile(r"^Log_(\d{4})_(\d{2})$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS log_months (
+    month TEXT PRIMARY KEY,
+    frozen INTEGER NOT NULL DEFAULT 0,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS log_usage (
+    month TEXT NOT NULL,
+    nama_key TEXT NOT NULL,
+    nama TEXT NOT NULL,
+    petugas TEXT NOT NULL,
+    jumlah INTEGER NOT NULL,
+    entries INTEGER NOT NULL,
+    PRIMARY KEY (month, nama_key, petugas)
+);
+"""
+
+# Bumped whenever usage_cells changes what it counts; an older cube is
+# dropped and rebuilt (closed months are fetched again, once)
+CUBE_VERSION = 2
+
+
+def month_of(title):
+    """"Log_2025_03" -> "2025_03"; None for other tabs."""
+    m = LOG_TITLE.match(title)
+    return f"{m.group(1)}_{m.group(2)}" if m else None
+
+
+def _column(header, name, default):
+    try:
+        return header.index(name)
+    except ValueError:
+        return default
+
+
+def _as_int(value):
+    try:
+        return int(float(str(value).replace(",", ".")))
+    except ValueError:
+        return 0
+
+
+def usage_cells(values):
+    """(nama_key, nama, petugas, jumlah) for every stock-out row of a log tab."""
+    if not values:
+        return []
+    header = [str(h).strip() for h in values[0]]
+    i_nama = _column(header, "Nama Barang", 2)
+    i_tempat = _column(header, "Tempat Penyimpanan", 5)
+    i_jumlah = _column(header, "Jumlah", 6)
+    i_petugas = _column(header, "Petugas", 8)
+    cells = []
+    for row in values[1:]:
+        tempat = str(row[i_tempat]).strip() if len(row) > i_tempat else ""
+        if tempat != USED_LOCATION:
+            continue
+        nama = str(row[i_nama]).strip() if len(row) > i_nama else ""
+        if not nama:
+            continue
+        petugas = str(row[i_petugas]).strip().title() if len(row) > i_petugas else ""
+        jumlah = _as_int(row[i_jumlah]) if len(row) > i_jumlah else 0
+        cells.append((nama.lower(), nama, petugas, jumlah))
+    return cells
+
+
+class LogAnalytics:
+    def __init__(self, path, list_ttl=3600, store=None):
+        self.path = path
+        self.list_ttl = list_ttl
+        self.store = store
+        self._months = None
+        self._listed_at = 0.0
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+            if db.execute("PRAGMA user_version").fetchone()[0] < CUBE_VERSION:
+                db.execute("DELETE FROM log_usage")
+                db.execute("DELETE FROM log_months")
+                db.execute(f"PRAGMA user_version = {CUBE_VERSION}")
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    # --- loading ------------------------------------------------------------
+    def _add(self, db, month, cells):
+        db.executemany(
+            """
+            INSERT INTO log_usage (month, nama_key, nama, petugas, jumlah, entries)
+            VALUES (?, ?, ?, ?, ?, 1)
+            ON CONFLICT (month, nama_key, petugas)
+            DO UPDATE SET jumlah = jumlah + excluded.jumlah, entries = entries + 1
+            """,
+            [(month, key, nama, petugas, jumlah) for key, nama, petugas, jumlah in cells],
+        )
+
+    def _replace(self, db, month, values, frozen):
+        db.execute("DELETE FROM log_usage WHERE month = ?", (month,))
+        self._add(db, month, usage_cells(values))
+        db.execute(
+            "INSERT OR REPLACE INTO log_months (month, frozen, row_count, synced_at) "
+            "VALUES (?, ?, ?, ?)",
+            (month, int(frozen), len(values), time.time()),
+        )
+
+    def freeze(self, month, values):
+        """Store a closed month once; it is never re-read afterwards."""
+        with self._connect() as db:
+            self._replace(db, month, values, frozen=True)
+
+    def sync_current(self, month, values):
+        """Bring the open month up to date from its latest snapshot."""
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT row_count FROM log_months WHERE month = ?", (month,)
+            ).fetchone()
+            known = row[0] if row else 0
+            if len(values) == known:
+                return
+            if len(values) < known or known == 0:
+                self._replace(db, month, values, frozen=False)
+                return
+            # Append-only log: aggregate just the new rows
+            self._add(db, month, usage_cells([values[0]] + list(values[known:])))
+            db.execute(
+                "UPDATE log_months SET row_count = ?, synced_at = ? WHERE month = ?",
+                (len(values), time.time(), month),
+            )
+
+    def frozen_months(self):
+        with self._connect() as db:
+            return {m for (m,) in db.execute("SELECT month FROM log_months WHERE frozen = 1")}
+
+    def _log_titles(self, spreadsheet):
+        # Tab list changes once a month; one metadata read per list_ttl
+        with self._lock:
+            if self._months is None or time.time() - self._listed_at > self.list_ttl:
+                self._months = [ws.title for ws in spreadsheet.worksheets()
+                                if month_of(ws.title)]
+                self._listed_at = time.time()
+            return list(self._months)
+
+    def sync(self, spreadsheet, current_values, now=None):
+        """Freeze any closed month not seen yet, then update the open month.
+
+        ``current_values`` are the (snapshot) values of this month's log tab.
+        """
+        current = (now or datetime.now()).strftime("%Y_%m")
+        frozen = self.frozen_months()
+        closed = [t for t in self._log_titles(spreadsheet)
+                  if month_of(t) < current and month_of(t) not in frozen]
+        local = {t: self.store.values(t) for t in closed} if self.store is not None else {}
+        for title, values in local.items():
+            if values is not None:
+                self.freeze(month_of(title), values)
+        remote = [t for t in closed if local.get(t) is None]
+        if remote:
+            ranges = ["'" + t.replace("'", "''") + "'" for t in remote]
+            response = spreadsheet.values_batch_get(ranges)
+            for title, value_range in zip(remote, response.get("valueRanges", [])):
+                self.freeze(month_of(title), value_range.get("values", []))
+        self.sync_current(current, current_values)
+
+    # --- reports ------------------------------------------------------------
+    def _query(self, sql, params):
+        with self._connect() as db:
+            db.row_factory = sqlite3.Row
+            return [dict(r) for r in db.execute(sql, params)]
+
+    @staticmethod
+    def _where(year=None, nama=None):
+        clauses, params = [], []
+        if year:
+            clauses.append("month LIKE ?")
+            params.append(f"{year}_%")
+        if nama:
+            clauses.append("nama_key LIKE ?")
+            params.append(f"%{nama.strip().lower()}%")
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def years(self):
+        with self._connect() as db:
+            rows = db.execute("SELECT DISTINCT substr(month, 1, 4) FROM log_months ORDER BY 1 DESC")
+            return [y for (y,) in rows]
+
+    def by_month(self, year=None, nama=None):
+        where, params = self._where(year, nama)
+        return self._query(
+            f"SELECT month AS Bulan, SUM(jumlah) AS Jumlah, SUM(entries) AS Entri "
+            f"FROM log_usage {where} GROUP BY month ORDER BY month", params)
+
+    def by_item(self, year=None, nama=None):
+        where, params = self._where(year, nama)
+        return self._query(
+            f"SELECT MIN(nama) AS \"Nama Barang\", SUM(jumlah) AS Jumlah, SUM(entries) AS Entri "
+            f"FROM log_usage {where} GROUP BY nama_key ORDER BY Jumlah DESC", params)
+
+    def by_petugas(self, year=None, nama=None):
+        where, params = self._where(year, nama)
+        return self._query(
+            f"SELECT petugas AS Petugas, SUM(jumlah) AS Jumlah, SUM(entries) AS Entri "
+            f"FROM log_usage {where} GROUP BY petugas ORDER BY Jumlah DESC", params)
@@ -0,0 +1,185 @@
+"""Collects the sheet writes of one user action into batched API calls.
+
+Each spreadsheet touched by the action receives a single
+``spreadsheets.batchUpdate`` holding all of its cell updates, row appends
+and row deletes, applied in the order they were queued.
+"""
+import numbers
+
+from inventaris.index import tombstone_note
+
+
+def _cell(value):
+    if value is None:
+        return {}  # with fields=userEnteredValue this clears the cell
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, numbers.Real):
+        return {"userEnteredValue": {"numberValue": value}}
+    return {"userEnteredValue": {"stringValue": str(value)}}
+
+
+def _row_data(cells):
+    return {"values": [_cell(v) for v in cells]}
+
+
+def update_cells_request(sheet_id, row, col, rows):
+    """updateCells writing ``rows`` (lists of values) from (row, col), 1-based.
+
+    The target range is absolute, so sending it twice has the same effect
+    as sending it once.
+    """
+    return {"updateCells": {
+        "range": {
+            "sheetId": sheet_id,
+            "startRowIndex": row - 1, "endRowIndex": row - 1 + len(rows),
+            "startColumnIndex": col - 1,
+            "endColumnIndex": col - 1 + max((len(r) for r in rows), default=0),
+        },
+        "rows": [_row_data(r) for r in rows],
+        "fields": "userEnteredValue",
+    }}
+
+
+class SheetBatch:
+    """Mutation builder: queue writes, then ``commit()`` once.
+
+    Row and column numbers are 1-based like gspread's ``update_cell``.
+    ``cache`` is an optional SnapshotCache patched after a successful commit.
+    When a LocalStore is given (or attached to the cache as ``cache.store``)
+    the commit goes to the store in one local transaction and the requests
+    are replicated to Google Sheets in the background. The store then builds
+    the requests itself, at the row positions it assigned, so a replayed
+    batch writes the same cells again instead of appending twice.
+    """
+
+    def __init__(self, cache=None, store=None):
+        self.cache = cache
+        self.store = store if store is not None else getattr(cache, "store", None)
+        self._groups = {}
+        self._sheets = {}  # title -> worksheet handle, for seeding the store
+        self._results = {}  # (title, row) -> cells of rows the store adjusted
+        self._after_commit = []
+
+    def _add(self, ws, request, patch, op):
+        self._sheets.setdefault(ws.title, ws)
+        spreadsheet = ws.spreadsheet
+        group = self._groups.setdefault(spreadsheet.id, (spreadsheet, [], [], []))
+        group[1].append(request)
+        group[2].append(patch)
+        group[3].append(op)
+
+    def __len__(self):
+        return sum(len(g[1]) for g in self._groups.values())
+
+    def update_cells(self, ws, row, col, cells, key=None):
+        """Overwrite ``cells`` starting at (row, col), left to right.
+
+        ``key`` is the item (Nama Barang, Tanggal Masuk, Kondisi) the caller
+        expects at ``row``; a store refuses the commit if the row now holds
+        another one.
+        """
+        cells = list(cells)
+        request = update_cells_request(ws.id, row, col, [cells])
+
+        def patch(cache):
+            for offset, value in enumerate(cells):
+                cache.update_cell(ws.title, row, col + offset, value)
+        self._add(ws, request, patch, ("update", ws.title, row, col, cells, key))
+
+    def update_cell(self, ws, row, col, value, key=None):
+        self.update_cells(ws, row, col, [value], key=key)
+
+    def adjust(self, ws, row, col, delta, current, note_col=None, note="", key=None):
+        """Add ``delta`` to the number at (row, col); ValueError below zero.
+
+        A row taken down to 0 becomes a tombstone: ``note_col`` gets the
+        marker in front of its note. With a store, the store's own copy of
+        the row is read and written inside the commit transaction, so
+        concurrent sessions cannot lose an update, and ``key`` (as for
+        update_cells) is checked against that row. Without one, ``current``
+        and ``note`` (from the caller's snapshot) are used.
+        """
+        if self.store is not None:
+            def patch(cache):
+                cache.set_row(ws.title, row, self._results[(ws.title, row)])
+            self._add(ws, None, patch, ("adjust", ws.title, row, col, delta, note_col, key))
+            return
+        new_qty = int(current) + int(delta)
+        if new_qty < 0:
+            raise ValueError(f"Stok tidak cukup. Sisa: {current}, diminta: {-delta}")
+        self.update_cell(ws, row, col, new_qty)
+        if note_col and delta < 0 and new_qty == 0:
+            self.update_cell(ws, row, note_col, tombstone_note(note))
+
+    def append_rows(self, ws, rows):
+        rows = [list(r) for r in rows]
+        if not rows:
+            return
+        request = {"appendCells": {
+            "sheetId": ws.id,
+            "rows": [_row_data(r) for r in rows],
+            "fields": "userEnteredValue",
+        }}
+        self._add(ws, request, lambda cache: cache.append_rows(ws.title, rows),
+                  ("append", ws.title, rows))
+
+    def append_row(self, ws, row):
+        self.append_rows(ws, [row])
+
+    def delete_row(self, ws, row):
+        request = {"deleteDimension": {"range": {
+            "sheetId": ws.id, "dimension": "ROWS",
+            "startIndex": row - 1, "endIndex": row,
+        }}}
+        self._add(ws, request, lambda cache: cache.delete_row(ws.title, row),
+                  ("delete", ws.title, row))
+
+    def after_commit(self, fn):
+        """Run ``fn()`` once every queued write has been sent."""
+        self._after_commit.append(fn)
+
+    def commit(self):
+        """Send one batchUpdate per spreadsheet; returns the number of API calls.
+
+        With a store, everything is committed locally instead and 0 is
+        returned; the Replicator sends the requests later.
+        """
+        calls = 0
+        groups, self._groups = list(self._groups.values()), {}
+        sheets, self._sheets = list(self._sheets.values()), {}
+        if self.store is not None:
+            # Local positions must line up with the sheet, so a tab is seeded
+            # from Sheets before its first local write (appends included)
+            for ws in sheets:
+                if self.store.has(ws.title):
+                    continue
+                if self.cache is not None:
+                    self.cache.get_values(ws)
+                else:
+                    self.store.seed(ws, ws.get_all_values())
+            try:
+                self._results = self.store.commit([
+                    (spreadsheet.id, ops) for spreadsheet, requests, patches, ops in groups
+                ])
+            except ValueError:
+                # Another session changed these rows since our snapshot
+                if self.cache is not None:
+                    for ws in sheets:
+                        self.cache.invalidate(ws.title)
+                raise
+            if self.cache is not None:
+                for _, _, patches, _ in groups:
+                    for patch in patches:
+                        patch(self.cache)
+        else:
+            for spreadsheet, requests, patches, _ in groups:
+                spreadsheet.batch_update({"requests": requests})
+                calls += 1
+                if self.cache is not None:
+                    for patch in patches:
+                        patch(self.cache)
+        callbacks, self._after_commit = self._after_commit, []
+        for fn in callbacks:
+            fn()
+        return calls
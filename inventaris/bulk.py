@@ -0,0 +1,123 @@
+"""Validation and in-memory merge for bulk inventory imports.
+
+An uploaded CSV/Excel sheet is checked row by row against the inventory
+HEADERS, then merged against the existing (Nama Barang, Tanggal Masuk,
+Kondisi) keys so the whole file can be written with a handful of batched
+calls instead of one upsert per item.
+"""
+from datetime import date, datetime
+
+REQUIRED_COLUMNS = ["Nama Barang", "Tanggal Masuk", "Jumlah", "Kondisi", "Petugas"]
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d"]
+
+
+def map_columns(columns, headers):
+    """Map file columns to HEADERS names, ignoring case and spaces.
+
+    Returns {header: file_column}; unknown file columns are ignored.
+    """
+    wanted = {h.strip().lower(): h for h in headers}
+    mapping = {}
+    for col in columns:
+        header = wanted.get(str(col).strip().lower())
+        if header and header not in mapping:
+            mapping[header] = col
+    return mapping
+
+
+def _blank(value):
+    return value is None or str(value).strip() == "" or str(value).lower() == "nan"
+
+
+def _parse_date(value):
+    if isinstance(value, (datetime, date)) or hasattr(value, "strftime"):
+        return value.strftime("%Y-%m-%d")
+    text = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ValueError(f"format tanggal tidak dikenali: '{text}'")
+
+
+def _parse_jumlah(value):
+    qty = float(str(value).strip())
+    if qty != int(qty) or qty < 1:
+        raise ValueError(f"Jumlah harus bilangan bulat >= 1: '{value}'")
+    return int(qty)
+
+
+def validate(records, headers, kondisi_options, first_line=2):
+    """Check raw file rows; returns (items, errors).
+
+    ``records`` are dicts keyed by file column. Each item is a dict keyed by
+    HEADERS (minus No/Kode Inventaris) plus ``line``, the row number in the
+    uploaded file. ``errors`` is a list of (line, message).
+    """
+    items, errors = [], []
+    if not records:
+        return items, errors
+    mapping = map_columns(records[0].keys(), headers)
+    missing = [c for c in REQUIRED_COLUMNS if c not in mapping]
+    if missing:
+        return items, [(0, f"Kolom wajib tidak ada: {', '.join(missing)}")]
+
+    kondisi_lookup = {k.lower(): k for k in kondisi_options}
+    for line, record in enumerate(records, start=first_line):
+        raw = {h: record.get(col) for h, col in mapping.items()}
+        problems = []
+        for col in REQUIRED_COLUMNS:
+            if _blank(raw.get(col)):
+                problems.append(f"{col} kosong")
+        if problems:
+            errors.append((line, "; ".join(problems)))
+            continue
+        try:
+            item = {
+                "Nama Barang": str(raw["Nama Barang"]).strip(),
+                "Tanggal Masuk": _parse_date(raw["Tanggal Masuk"]),
+                "Jumlah": _parse_jumlah(raw["Jumlah"]),
+                "Petugas": str(raw["Petugas"]).strip(),
+            }
+        except ValueError as e:
+            errors.append((line, str(e)))
+            continue
+        kondisi = kondisi_lookup.get(str(raw["Kondisi"]).strip().lower())
+        if kondisi is None:
+            errors.append((line, f"Kondisi tidak valid: '{raw['Kondisi']}'"))
+            continue
+        item["Kondisi"] = kondisi
+        for col in headers:
+            if col not in item and col not in ("No", "Kode Inventaris"):
+                value = raw.get(col)
+                item[col] = "" if _blank(value) else str(value).strip()
+        item["line"] = line
+        items.append(item)
+    return items, errors
+
+
+def merge(items, lookup, current_qty):
+    """Fold items into existing rows and into each other.
+
+    ``lookup(nama, tanggal, kondisi)`` returns the sheet row of an existing
+    key or None; ``current_qty(row)`` returns that row's Jumlah. Returns
+    (updates, appends): ``updates`` maps row -> (new_qty, item) and
+    ``appends`` is a list of new items with summed quantities, in file order.
+    """
+    updates = {}
+    appends = {}
+    for item in items:
+        key = (item["Nama Barang"].lower(), item["Tanggal Masuk"], item["Kondisi"])
+        if key in appends:
+            appends[key]["Jumlah"] += item["Jumlah"]
+            continue
+        row = lookup(*key)
+        if row is None:
+            appends[key] = dict(item)
+        elif row in updates:
+            qty, _ = updates[row]
+            updates[row] = (qty + item["Jumlah"], item)
+        else:
+            updates[row] = (current_qty(row) + item["Jumlah"], item)
+    return updates, list(appends.values())
@@ -0,0 +1,315 @@
+"""Process-wide snapshot cache for worksheet values.
+
+Every session reads a worksheet through the same cached copy of
+``get_all_values()``. Writers patch the copy right after they write so the
+next reader sees their change without another full download.
+"""
+import threading
+import time
+
+from inventaris.index import RowIndex
+from inventaris.sync import cursor, fetch_delta
+
+
+def _as_record(row, headers):
+    width = len(headers)
+    padded = list(row[:width]) + [""] * (width - len(row))
+    return dict(zip(headers, padded))
+
+
+def records_from_values(values, headers=None):
+    """Turn raw ``get_all_values()`` rows into list[dict].
+
+    Uses the sheet's own first row when ``headers`` is not given. Short rows
+    are padded with "" so every dict has every header.
+    """
+    if not values:
+        return []
+    headers = list(headers or values[0])
+    return [_as_record(row, headers) for row in values[1:]]
+
+
+def record_at(values, row_number, headers=None):
+    """Single row (1-based, row 1 = header) as a dict, like records_from_values."""
+    return _as_record(values[row_number - 1], list(headers or values[0]))
+
+
+class _Entry:
+    __slots__ = ("values", "fetched_at", "loaded_at", "index")
+
+    def __init__(self, values, fetched_at):
+        self.values = values
+        self.fetched_at = fetched_at
+        self.loaded_at = fetched_at
+        self.index = None
+
+
+class SnapshotCache:
+    """Worksheet values keyed by worksheet title, expiring after ``ttl`` seconds.
+
+    Values are kept as strings, the same way ``get_all_values()`` returns
+    them, so cached and freshly fetched snapshots look identical.
+
+    A stale snapshot is first refreshed incrementally (see inventaris.sync):
+    only rows appended since the last read are fetched. A full reload still
+    happens when the tail no longer matches, and at least every
+    ``full_every`` seconds to pick up edits above the tail.
+
+    With a LocalStore as ``store``, snapshots are loaded from the local
+    mirror instead; Sheets is read only to seed a tab the store has never
+    seen. The delta refresh then happens once, in the Replicator: it reads
+    each tab's tail the same way and merges rows added in Sheets into the
+    store, where the next reload here picks them up.
+    """
+
+    def __init__(self, ttl=60, full_every=900, store=None):
+        self.ttl = ttl
+        self.full_every = full_every
+        self.store = store
+        self._entries = {}
+        self._versions = {}  # title -> change counter, see versioned()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._listeners = []
+
+    def add_listener(self, fn):
+        """Call ``fn(title)`` whenever a sheet is written or invalidated.
+
+        Lets other caches derived from the same sheets (e.g. paged reads)
+        drop their copies; ``title`` is None when everything is invalidated.
+        """
+        self._listeners.append(fn)
+
+    def _notify(self, key):
+        for fn in self._listeners:
+            fn(key)
+
+    def _fresh(self, entry):
+        return entry is not None and time.monotonic() - entry.fetched_at < self.ttl
+
+    def _load_lock(self, key):
+        with self._lock:
+            return self._load_locks.setdefault(key, threading.Lock())
+
+    def get_values(self, ws):
+        """Return the cached rows of ``ws``, fetching them once if stale.
+
+        Concurrent readers of the same stale sheet wait for one fetch instead
+        of each downloading the tab.
+        """
+        key = ws.title
+        entry = self._entries.get(key)
+        if self._fresh(entry):
+            return entry.values
+        with self._load_lock(key):
+            entry = self._entries.get(key)
+            if self._fresh(entry):
+                return entry.values
+            if self.store is not None:
+                return self._load_from_store(ws)
+            if entry is not None and time.monotonic() - entry.loaded_at < self.full_every:
+                values = self._sync(ws, entry)
+                if values is not None:
+                    return values
+            values = ws.get_all_values()
+            self.put(key, values)
+            return values
+
+    def _load_from_store(self, ws):
+        values = self.store.values(ws.title)
+        if values is None:
+            values = ws.get_all_values()
+            if not self.store.seed(ws, values):
+                # Seeded meanwhile by someone else; theirs may hold newer rows
+                values = self.store.values(ws.title)
+        self.put(ws.title, values)
+        return self._entries[ws.title].values
+
+    def _sync(self, ws, entry):
+        """Delta refresh of ``entry``; returns the new values or None."""
+        new_rows = fetch_delta(ws, entry.values)
+        if new_rows is None:
+            return None
+        if new_rows:
+            self.append_rows(ws.title, new_rows)
+        with self._lock:
+            current = self._entries.get(ws.title)
+            if current is None:
+                return None
+            current.fetched_at = time.monotonic()
+            return current.values
+
+    def prefetch(self, spreadsheet, titles, worksheet=None):
+        """Load every stale tab in ``titles`` with one values.batchGet.
+
+        With a store, tabs it already mirrors are loaded locally and only
+        the rest are fetched (and seeded; ``worksheet(title)`` must then
+        return the tab's handle). Returns the number of API calls made.
+        """
+        stale = [t for t in titles if not self._fresh(self._entries.get(t))]
+        if self.store is not None:
+            missing = []
+            for title in stale:
+                values = self.store.values(title)
+                if values is None:
+                    missing.append(title)
+                else:
+                    self.put(title, values)
+            stale = missing
+        if not stale:
+            return 0
+        ranges = ["'" + t.replace("'", "''") + "'" for t in stale]
+        response = spreadsheet.values_batch_get(ranges)
+        for title, value_range in zip(stale, response.get("valueRanges", [])):
+            rows = value_range.get("values", [])
+            # Pad like get_all_values() so both kinds of snapshot look the same
+            width = max((len(r) for r in rows), default=0)
+            rows = [r + [""] * (width - len(r)) for r in rows]
+            if self.store is not None and not self.store.seed(worksheet(title), rows):
+                rows = self.store.values(title)
+            self.put(title, rows)
+        return 1
+
+    def cursor(self, key):
+        """(row count, tail checksum) of the cached copy, or None."""
+        entry = self._entries.get(key)
+        return cursor(entry.values) if entry is not None else None
+
+    def peek(self, key):
+        """Cached values for ``key`` if still fresh, without fetching."""
+        entry = self._entries.get(key)
+        return entry.values if self._fresh(entry) else None
+
+    def get_records(self, ws, headers=None):
+        return records_from_values(self.get_values(ws), headers)
+
+    def lookup(self, ws, finder):
+        """Run ``finder(index)`` against one consistent snapshot of ``ws``.
+
+        Returns (values, result); ``values`` is the snapshot the index
+        describes, so several lookups can be validated together.
+        """
+        self.get_values(ws)
+        with self._lock:
+            entry = self._entries.get(ws.title)
+            if entry is None:
+                # Invalidated between the two steps; fall back to a fresh load
+                values = ws.get_all_values()
+                return values, finder(RowIndex(values))
+            if entry.index is None:
+                entry.index = RowIndex(entry.values)
+            return entry.values, finder(entry.index)
+
+    def versioned(self, ws):
+        """(values, version) of ``ws`` from one consistent snapshot.
+
+        The version moves on every local write and on reloads that bring
+        different values, never on a reload of identical ones, so caches
+        derived from a tab can key on it instead of on the list's identity.
+        It is None when the snapshot was dropped meanwhile.
+        """
+        values = self.get_values(ws)
+        with self._lock:
+            entry = self._entries.get(ws.title)
+            if entry is None:
+                return values, None
+            return entry.values, self._versions[ws.title]
+
+    def find_row(self, ws, nama, tanggal, kondisi):
+        """Return (values, row) for an exact item key; row is None if absent."""
+        return self.lookup(ws, lambda index: index.find(nama, tanggal, kondisi))
+
+    def find_first_row(self, ws, nama, kondisi):
+        """Return (values, row) for the first ``nama``/``kondisi`` row."""
+        return self.lookup(ws, lambda index: index.find_first(nama, kondisi))
+
+    def put(self, key, values):
+        values = [[_as_cell(v) for v in row] for row in values]
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.values == values:
+                # Unchanged: keep the list, its row index and its version
+                entry.fetched_at = entry.loaded_at = now
+                return
+            self._entries[key] = _Entry(values, now)
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def invalidate(self, key=None):
+        """Drop one worksheet (or everything when ``key`` is None)."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        self._notify(key)
+
+    # --- write-through helpers, called right after the matching API call ---
+
+    def _patch(self, key, fn, reindex=None):
+        self._notify(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            try:
+                # Copy-on-write so readers holding the old list are unaffected
+                values = [list(r) for r in entry.values]
+                fn(values)
+            except IndexError:
+                # Our copy no longer matches the sheet; reload it next time
+                self._entries.pop(key, None)
+                return
+            entry.values = values
+            self._versions[key] += 1
+            if entry.index is not None and reindex is not None:
+                reindex(entry.index, values)
+
+    def update_cell(self, key, row, col, value):
+        """Mirror ``ws.update_cell(row, col, value)`` (1-based)."""
+        def fn(values):
+            cells = values[row - 1]
+            if len(cells) < col:
+                cells.extend([""] * (col - len(cells)))
+            cells[col - 1] = _as_cell(value)
+
+        def reindex(index, values):
+            if row > 1 and col - 1 in index.watched:
+                index.update(row, values[row - 1])
+        self._patch(key, fn, reindex)
+
+    def set_row(self, key, row, cells):
+        """Mirror writing a full row (1-based)."""
+        def fn(values):
+            values[row - 1] = [_as_cell(v) for v in cells]
+
+        def reindex(index, values):
+            if row == 1:
+                # Header changed, so the key columns may have moved
+                self._entries[key].index = None
+            else:
+                index.update(row, values[row - 1])
+        self._patch(key, fn, reindex)
+
+    def append_rows(self, key, rows):
+        """Mirror ``ws.append_row``/``append_rows``."""
+        start = []
+
+        def fn(values):
+            start.append(len(values) + 1)
+            values.extend([_as_cell(v) for v in r] for r in rows)
+
+        def reindex(index, values):
+            for number in range(start[0], len(values) + 1):
+                index.add(number, values[number - 1])
+        self._patch(key, fn, reindex)
+
+    def delete_row(self, key, row):
+        """Mirror ``ws.delete_rows(row)`` (1-based)."""
+        def fn(values):
+            del values[row - 1]
+        self._patch(key, fn, lambda index, values: index.delete(row))
+
+
+def _as_cell(value):
+    return "" if value is None else str(value)
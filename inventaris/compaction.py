@@ -0,0 +1,71 @@
+"""Off-hours removal of tombstone rows.
+
+Transfers never delete rows; they leave tombstones (see inventaris.index)
+so row numbers stay stable while people work. Once a day, inside a quiet
+hour, ``CompactionScheduler`` runs a job that calls ``compact`` on each
+stock tab: every tombstone is deleted in one SheetBatch, bottom-up, i.e.
+a single batchUpdate (or local transaction) per tab.
+"""
+import atexit
+import threading
+from datetime import datetime
+
+from inventaris.batch import SheetBatch
+from inventaris.index import is_tombstone, status_columns
+
+
+def tombstone_rows(values):
+    """1-based row numbers of the tombstones in ``values``."""
+    cols = status_columns(values[0]) if values else None
+    return [n for n, row in enumerate(values[1:], start=2) if is_tombstone(row, cols)]
+
+
+def compact(ws, snapshots):
+    """Delete every tombstone of ``ws``; returns the number of rows removed."""
+    rows = tombstone_rows(snapshots.get_values(ws))
+    if not rows:
+        return 0
+    batch = SheetBatch(cache=snapshots)
+    # Bottom-up, so each delete leaves the rows still to delete in place
+    for row in reversed(rows):
+        batch.delete_row(ws, row)
+    batch.commit()
+    return len(rows)
+
+
+class CompactionScheduler:
+    """Daemon thread running ``job()`` once a day during ``hour`` (local time)."""
+
+    def __init__(self, job, hour=2, interval=600.0):
+        self._job = job
+        self.hour = hour
+        self.interval = interval
+        self._last_run = None  # date of the last successful run
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sheets-compaction", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def due(self, now=None):
+        now = now or datetime.now()
+        return now.hour == self.hour and self._last_run != now.date()
+
+    def run_once(self, now=None):
+        """Run the job if it is due; returns its result, else None."""
+        now = now or datetime.now()
+        if not self.due(now):
+            return None
+        result = self._job()
+        self._last_run = now.date()
+        return result
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"❌ Compaction error: {e}")
+
+    def close(self, timeout=5):
+        self._stop.set()
+        self._thread.join(timeout)
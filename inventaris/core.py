@@ -0,0 +1,315 @@
+"""Inventory operations shared by the Streamlit app and the benchmarks.
+
+``Inventory`` holds no Streamlit state: worksheets, the snapshot cache, the
+"No" counters and the GAS notifier are handed in, so the same code runs
+against Google Sheets in the app and against in-memory fakes offline.
+"""
+from datetime import datetime
+
+from .batch import SheetBatch
+from .cache import record_at, records_from_values
+from .index import drop_tombstones, item_key
+from .sequence import make_kode
+
+HEADERS = ["No", "Kode Inventaris", "Nama Barang", "Tanggal Masuk",
+           "Tahun Pembuatan", "Tempat Penyimpanan", "Jumlah",
+           "Kondisi", "Petugas", "keterangan"]
+
+# Destination (Used) Headers - 9 Columns (Removed 'Tempat Penyimpanan')
+HEADERS_USED = ["No", "Kode Inventaris", "Nama", "Tanggal Digunakan",
+                "Tahun Pembuatan", "Jumlah", "Kondisi", "Petugas", "Keterangan"]
+
+# Updated Log Headers to match your 10-column structure
+LOG_HEADERS = [
+    "No", "Kode Inventaris", "Nama Barang", "Tanggal Masuk",
+    "Tahun Pembuatan", "Tempat Penyimpanan", "Jumlah",
+    "Kondisi", "Petugas", "Keterangan"
+]
+
+USED_SHEET = "Data Barang yang Dikirim atau Digunakan"
+# Tempat Penyimpanan of log rows for stock taken out of use (action "USE")
+USED_LOCATION = "--- DIGUNAKAN ---"
+
+# Methods reported as "phase" events when a metrics.Recorder is given
+TIMED = ("ensure_header", "list_records", "upsert_item", "transfer_items", "write_log")
+
+
+def log_sheet_name(when=None):
+    """Log tab name for the month of ``when`` (default: now)."""
+    month_tag = (when or datetime.now()).strftime("%Y_%m")
+    return f"Log_{month_tag}"
+
+
+class Inventory:
+    """Stock tabs plus the monthly log, written through SheetBatch.
+
+    ``floors`` maps display names to tab names, ``worksheet(name)`` returns
+    a tab handle, ``log_worksheet(name)`` returns (creating if needed) a
+    monthly log tab, and ``notify(payload)`` hands a log event to the Apps
+    Script outbox once its row is committed.
+    """
+
+    def __init__(self, snapshots, sequences, floors, worksheet, log_worksheet,
+                 notify=None, recorder=None):
+        self.snapshots = snapshots
+        self.sequences = sequences
+        self.floors = floors
+        self.worksheet = worksheet
+        self.log_worksheet = log_worksheet
+        self.notify = notify
+        if recorder is not None:
+            for name in TIMED:
+                setattr(self, name, recorder.timed("phase", name)(getattr(self, name)))
+
+    def floor_ws(self, floor_display_name):
+        try:
+            sheet_name = self.floors[floor_display_name]
+        except KeyError:
+            raise ValueError(f"Key '{floor_display_name}' tidak ada di FLOOR_TO_SHEET.") from None
+        return self.worksheet(sheet_name)
+
+    def ensure_header(self, ws):
+        """Force the header row to be exactly HEADERS to avoid duplicates error.
+
+        Errors propagate to the caller: a failed read (e.g. quota exhausted
+        after retries) must not be answered with yet another write.
+        """
+        # We check the first row from the cached snapshot (no extra read)
+        values = self.snapshots.get_values(ws)
+        current_first_row = list(values[0]) if values else []
+        # Snapshots are padded like get_all_values(); ignore the padding
+        while current_first_row and current_first_row[-1] == "":
+            current_first_row.pop()
+
+        # If the length is different or the values don't match exactly
+        if current_first_row != HEADERS:
+            # Write the correct headers, blanking any extra old header cells
+            extra = max(0, len(current_first_row) - len(HEADERS))
+            batch = SheetBatch(cache=self.snapshots)
+            batch.update_cells(ws, 1, 1, HEADERS + [""] * extra)
+            batch.commit()
+
+    def list_records(self, ws):
+        """Return live rows (tombstones dropped) as list[dict] with forced headers."""
+        self.ensure_header(ws)
+        return records_from_values(drop_tombstones(self.snapshots.get_values(ws)), HEADERS)
+
+    def upsert_item(self, ws, nama_barang: str, tanggal_masuk: str,
+                    tahun_pembuatan: str, tempat_penyimpanan: str, jumlah: int,
+                    kondisi: str, petugas: str, keterangan: str, batch=None):
+        """Add stock to a matching row or append a new one.
+
+        Pass ``batch`` to queue the writes into a caller's SheetBatch instead
+        of sending them right away.
+        """
+        own_batch = batch is None
+        if own_batch:
+            batch = SheetBatch(cache=self.snapshots)
+
+        self.ensure_header(ws)
+        # Index lookup on the cached snapshot instead of scanning every row
+        values, idx = self.snapshots.find_row(ws, nama_barang, tanggal_masuk, kondisi)
+
+        # 1. Match Check: Nama Barang + Tanggal Masuk + KONDISI
+        # If all three match, we just add the quantity.
+        if idx is not None:
+            row = record_at(values, idx, HEADERS)
+
+            # Match found: add to Jumlah (Column 7) as it is when committed
+            key = item_key(row)
+            batch.adjust(ws, idx, 7, int(jumlah), row["Jumlah"] or 0, key=key)
+
+            # Optional: Update Keterangan if you want the latest note to show up
+            batch.update_cell(ws, idx, 10, keterangan, key=key)
+            if own_batch:
+                batch.commit()
+            return
+
+        # 2. Append New Row (If it's a new item OR a different condition)
+        # Automatic ID Logic: numbers come from the shared counter
+        next_no = self.sequences.next_no(ws)
+        auto_kode = make_kode(tanggal_masuk, next_no)
+
+        new_row = [
+            next_no,            # Col 1: No
+            auto_kode,          # Col 2: Kode Inventaris
+            nama_barang,        # Col 3: Nama Barang
+            tanggal_masuk,      # Col 4: Tanggal Masuk
+            tahun_pembuatan,    # Col 5: Tahun Pembuatan
+            tempat_penyimpanan, # Col 6: Tempat Penyimpanan
+            int(jumlah),        # Col 7: Jumlah
+            kondisi,            # Col 8: Kondisi (Status)
+            petugas,            # Col 9: Petugas
+            keterangan          # Col 10: keterangan
+        ]
+
+        batch.append_row(ws, new_row)
+        if own_batch:
+            batch.commit()
+
+    def transfer_items(self, source_floor: str, target_sheet_name: str, lines, petugas: str):
+        """Move several items out of ``source_floor`` in one operation.
+
+        ``lines`` is a list of dicts with item_name, kondisi, jumlah and an
+        optional keterangan. All lines are checked against one snapshot of
+        the source before anything is written; then every decrement,
+        every destination row and every log row is sent in a single batch.
+
+        Stock sent to ``USED_SHEET`` leaves the inventory, so its log rows
+        use the USE action (Tempat Penyimpanan ``USED_LOCATION``, as
+        write_log has always written for it); moves between warehouses are
+        logged as TRANSFER with the item's own location. Usage analytics
+        tells stock-outs apart by that location.
+        """
+        ws_src = self.floor_ws(source_floor)
+
+        # 1. Identify Target Worksheet
+        if target_sheet_name == USED_SHEET:
+            ws_tgt = self.worksheet(target_sheet_name)
+            is_used_sheet = True
+        else:
+            ws_tgt = self.floor_ws(target_sheet_name)
+            is_used_sheet = False
+
+        # 2. Find every item in the same source snapshot (index lookups)
+        self.ensure_header(ws_src)
+        values, rows = self.snapshots.lookup(ws_src, lambda index: [
+            index.find_first(line["item_name"], line["kondisi"]) for line in lines
+        ])
+
+        errors = []
+        taken = {}  # sheet row -> total jumlah requested from it
+        for line, row in zip(lines, rows):
+            if row is None:
+                errors.append(f"Item {line['item_name']} ({line['kondisi']}) tidak ada di {source_floor}")
+                continue
+            taken[row] = taken.get(row, 0) + int(line["jumlah"])
+        for row, jumlah in taken.items():
+            current_qty = int(record_at(values, row, HEADERS)["Jumlah"])
+            if current_qty < jumlah:
+                nama = record_at(values, row, HEADERS)["Nama Barang"]
+                errors.append(f"Stok {nama} tidak cukup. Sisa: {current_qty}, diminta: {jumlah}")
+        if errors:
+            raise ValueError("; ".join(errors))
+
+        # All writes below go out together: one call per spreadsheet
+        batch = SheetBatch(cache=self.snapshots)
+
+        # 3. Update Source (Subtract, or leave a tombstone when it runs out).
+        # No row is deleted here, so every row number stays valid for other
+        # sessions; compaction removes tombstones off-hours. The check above
+        # is only against the snapshot: with a local store, adjust re-checks
+        # and subtracts inside the commit transaction, so two sessions taking
+        # the same stock cannot both succeed.
+        for row in sorted(taken):
+            match = record_at(values, row, HEADERS)
+            # Col 7 is 'Jumlah'; col 10 'keterangan' gets the marker at 0
+            batch.adjust(ws_src, row, 7, -taken[row], match["Jumlah"],
+                         note_col=10, note=match["keterangan"], key=item_key(match))
+
+        # 4. Build the New Rows for Destination
+        numbers = self.sequences.allocate(ws_tgt, len(lines))
+        new_rows = []
+        for next_no, line, row in zip(numbers, lines, rows):
+            match = record_at(values, row, HEADERS)
+            item_name, kondisi = line["item_name"], line["kondisi"]
+            jumlah, keterangan = int(line["jumlah"]), line.get("keterangan", "")
+
+            if is_used_sheet:
+                new_rows.append([
+                    next_no,
+                    match["Kode Inventaris"],
+                    item_name,
+                    match["Tanggal Masuk"],
+                    match["Tahun Pembuatan"],
+                    jumlah,
+                    kondisi,
+                    petugas,
+                    keterangan or f"Bekas dari {source_floor}"
+                ])
+            else:
+                new_rows.append([
+                    next_no,
+                    match["Kode Inventaris"],
+                    item_name,
+                    match["Tanggal Masuk"],
+                    match["Tahun Pembuatan"],
+                    target_sheet_name,
+                    jumlah,
+                    kondisi,
+                    petugas,
+                    keterangan
+                ])
+
+            # 5. LOGGING
+            # Call write_log here to ensure history is recorded
+            action = "USE" if is_used_sheet else "TRANSFER"
+            self.write_log(match, action, jumlah, petugas, keterangan, batch=batch)
+
+        batch.append_rows(ws_tgt, new_rows)
+        batch.commit()
+
+    def transfer_item(self, source_floor: str, target_sheet_name: str, item_name: str,
+                      kondisi: str, jumlah: int, petugas: str, keterangan: str = ""):
+        """Single-item form of transfer_items."""
+        self.transfer_items(source_floor, target_sheet_name, [{
+            "item_name": item_name,
+            "kondisi": kondisi,
+            "jumlah": jumlah,
+            "keterangan": keterangan,
+        }], petugas)
+
+    def write_log(self, item_data, action, qty_used, petugas, keterangan="", batch=None):
+        """
+        item_data: a dictionary or row object containing the original item details.
+        action: 'ADD', 'TRANSFER', or 'USE'
+        batch: optional SheetBatch; the log row is then committed together
+        with the caller's inventory writes (same local transaction).
+        """
+        now = datetime.now()
+        ws = self.log_worksheet(log_sheet_name(now))
+
+        # --- 1. Calculate next_no (shared counter, no sheet download) ---
+        next_no = self.sequences.next_no(ws)
+
+        # --- 2. Logic for "Tempat Penyimpanan" ---
+        if action.upper() in ["USE", "DIGUNAKAN", "USED"]:
+            display_location = USED_LOCATION
+        else:
+            # Get location from item_data, fallback to 'Inventory'
+            display_location = item_data.get("Tempat Penyimpanan", "Inventory")
+
+        # --- 3. Build the 10-Column Row ---
+        timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
+
+        log_row = [
+            next_no,                                            # Col 1: No
+            item_data.get("Kode Inventaris", "AUTO"),           # Col 2
+            item_data.get("Nama Barang", "Unknown"),            # Col 3
+            timestamp,                                          # Col 4: Tanggal (Waktu Log)
+            item_data.get("Tahun Pembuatan", "-"),              # Col 5
+            display_location,                                   # Col 6: Tempat
+            qty_used,                                           # Col 7: Jumlah
+            item_data.get("Kondisi", "Baik"),                   # Col 8
+            petugas,                                            # Col 9
+            keterangan                                          # Col 10: Keterangan
+        ]
+
+        # --- 4. Write and Notify ---
+        own_batch = batch is None
+        if own_batch:
+            batch = SheetBatch(cache=self.snapshots)
+        batch.append_row(ws, log_row)
+
+        # Trigger the Google Doc creation once the row is committed
+        if self.notify is not None:
+            payload = {
+                "nama": item_data.get("Nama Barang", "Unknown"),
+                "jumlah": qty_used,
+                "kondisi": item_data.get("Kondisi", "Baik"),
+                "tempat": display_location,
+                "timestamp": timestamp,
+            }
+            batch.after_commit(lambda: self.notify(payload))
+        if own_batch:
+            batch.commit()
@@ -0,0 +1,130 @@
+"""Chunked CSV / Parquet export of sheet rows and reports.
+
+Rows come from any iterable (snapshot values, a filtered frame's
+``itertuples``, report dicts) and are taken ``chunk_size`` at a time,
+coerced to the column types of ``schema(headers)`` and written before the
+next chunk is read, so only one chunk is held besides the output itself.
+
+Parquet needs pyarrow, which is optional: ``PARQUET`` says whether it is
+installed. Each chunk becomes one Parquet row group.
+"""
+import csv
+import io
+from itertools import islice
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
+
+PARQUET = pq is not None
+CHUNK_SIZE = 5000
+
+# Everything else in HEADERS / HEADERS_USED / LOG_HEADERS is text
+INT_COLUMNS = {"No", "Jumlah", "Entri"}
+
+# format -> (file extension, MIME type)
+FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def available_formats():
+    return [fmt for fmt in FORMATS if fmt != "Parquet" or PARQUET]
+
+
+def schema(headers):
+    """[(column, int | str)] for ``headers``."""
+    return [(h, int if h in INT_COLUMNS else str) for h in headers]
+
+
+def _as_int(value):
+    """Cell -> int, or None when blank/not a number (an empty cell, not 0)."""
+    text = str(value).strip().replace(",", ".")
+    if not text:
+        return None
+    try:
+        return int(float(text))
+    except ValueError:
+        return None
+
+
+def typed_rows(rows, headers):
+    """Rows padded/cut to ``headers`` with each cell coerced to its type."""
+    width = len(headers)
+    int_cols = [i for i, (_, kind) in enumerate(schema(headers)) if kind is int]
+    for row in rows:
+        row = list(row[:width])
+        if len(row) < width:
+            row += [""] * (width - len(row))
+        for i, value in enumerate(row):
+            if value is None:
+                row[i] = ""
+            elif not isinstance(value, str):
+                row[i] = str(value)
+        for i in int_cols:
+            row[i] = _as_int(row[i])
+        yield row
+
+
+def chunks(rows, headers, chunk_size=CHUNK_SIZE):
+    """Lists of at most ``chunk_size`` typed rows."""
+    rows = typed_rows(rows, headers)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_csv(rows, headers, out, chunk_size=CHUNK_SIZE):
+    """Write a header line plus ``rows`` as UTF-8 CSV to the binary ``out``.
+
+    Returns the number of data rows written.
+    """
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(headers)
+    count = 0
+    for chunk in chunks(rows, headers, chunk_size):
+        writer.writerows(chunk)
+        count += len(chunk)
+    text.flush()
+    text.detach()  # leave ``out`` open for the caller
+    return count
+
+
+def write_parquet(rows, headers, out, chunk_size=CHUNK_SIZE):
+    """Write ``rows`` as Parquet to ``out``, one row group per chunk.
+
+    Returns the number of rows written. Raises RuntimeError without pyarrow.
+    """
+    if not PARQUET:
+        raise RuntimeError("Ekspor Parquet membutuhkan paket pyarrow.")
+    arrow_schema = pa.schema([
+        (name, pa.int64() if kind is int else pa.string()) for name, kind in schema(headers)
+    ])
+    count = 0
+    with pq.ParquetWriter(out, arrow_schema) as writer:
+        for chunk in chunks(rows, headers, chunk_size):
+            columns = zip(*chunk)
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, arrow_schema)],
+                schema=arrow_schema,
+            ))
+            count += len(chunk)
+    return count
+
+
+def write(fmt, rows, headers, out, chunk_size=CHUNK_SIZE):
+    """Dispatch to write_csv / write_parquet by ``FORMATS`` key."""
+    if fmt == "Parquet":
+        return write_parquet(rows, headers, out, chunk_size)
+    return write_csv(rows, headers, out, chunk_size)
+
+
+def records_rows(records, headers):
+    """Rows of list[dict] reports (e.g. LogAnalytics.by_item) in ``headers`` order."""
+    return ([r.get(h, "") for h in headers] for r in records)
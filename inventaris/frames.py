@@ -0,0 +1,69 @@
+"""DataFrame loading for the "Lihat Data" view.
+
+The frame is built straight from the ``get_all_values()`` rows as one 2-D
+block, low-cardinality columns become categoricals, and the lower-cased
+name/petugas columns used by the filters are computed once per snapshot.
+"""
+import threading
+
+import pandas as pd
+
+from inventaris.index import drop_tombstones
+
+CATEGORICAL_COLUMNS = ["Kondisi", "Tahun Pembuatan", "Petugas"]
+NAMA_NORM = "_nama"
+PETUGAS_NORM = "_petugas"
+HELPER_COLUMNS = [NAMA_NORM, PETUGAS_NORM]
+
+
+def name_column(headers):
+    return "Nama Barang" if "Nama Barang" in headers else "Nama"
+
+
+def frame_from_values(values, headers, tombstones=False):
+    """Build the view frame for ``headers`` from raw sheet rows.
+
+    The sheet's own header row is skipped, as are tombstones of depleted
+    items unless ``tombstones`` is set; rows are padded or cut to
+    ``len(headers)`` columns.
+    """
+    if not tombstones:
+        values = drop_tombstones(values)
+    width = len(headers)
+    if len(values) > 1:
+        df = pd.DataFrame(values[1:], dtype=object)
+        df = df.reindex(columns=range(width)).fillna("")
+        df.columns = list(headers)
+    else:
+        df = pd.DataFrame(columns=list(headers), dtype=object)
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(str).astype("category")
+
+    df[NAMA_NORM] = df[name_column(headers)].astype(str).str.lower()
+    if "Petugas" in df.columns:
+        # Normalize each distinct name once, then map it onto the rows
+        cats = df["Petugas"].cat.categories
+        mapping = dict(zip(cats, cats.astype(str).str.strip().str.lower()))
+        df[PETUGAS_NORM] = df["Petugas"].map(mapping).astype("category")
+    return df
+
+
+class FrameCache:
+    """Keeps the last frame built per worksheet, reused while its snapshot is unchanged."""
+
+    def __init__(self):
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def get(self, title, values, headers):
+        key = (title, tuple(headers))
+        with self._lock:
+            cached = self._frames.get(key)
+        if cached is not None and cached[0] is values:
+            return cached[1]
+        df = frame_from_values(values, headers)
+        with self._lock:
+            self._frames[key] = (values, df)
+        return df
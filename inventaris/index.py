@@ -0,0 +1,153 @@
+"""Hash index from item keys to sheet row numbers.
+
+Inventory rows are identified by (Nama Barang, Tanggal Masuk, Kondisi).
+The index answers "which row holds this item" in O(1) and is patched in
+place when rows are appended, edited or deleted.
+
+A depleted row is not deleted but left as a tombstone (Jumlah 0 and a
+keterangan starting with ``TOMBSTONE``) so no other row moves; readers drop
+tombstones with ``drop_tombstones`` and compaction removes them off-hours.
+The row's own note is kept after the marker (``tombstone_note``) and comes
+back with ``restore_note`` when the item is restocked.
+"""
+from collections import defaultdict
+
+KEY_HEADERS = ("Nama Barang", "Tanggal Masuk", "Kondisi")
+TOMBSTONE = "HABIS"
+TOMBSTONE_SEP = " · "  # between the marker and the note it keeps
+STATUS_HEADERS = ("keterangan", "Keterangan")
+
+
+def normalize_name(nama):
+    return str(nama).strip().lower()
+
+
+def item_key(record):
+    """The KEY_HEADERS values of a row record, as SheetBatch writes expect them."""
+    return tuple(record[h] for h in KEY_HEADERS)
+
+
+def status_columns(header):
+    """(Jumlah, keterangan) column positions, or None if the tab has no such columns."""
+    header = [str(h).strip() for h in header]
+    if "Jumlah" not in header:
+        return None
+    status = next((header.index(h) for h in STATUS_HEADERS if h in header), None)
+    return None if status is None else (header.index("Jumlah"), status)
+
+
+def _marked(status):
+    return status == TOMBSTONE or status.startswith(TOMBSTONE + TOMBSTONE_SEP)
+
+
+def restore_note(status):
+    """The user's note inside a tombstone keterangan (other values unchanged)."""
+    status = "" if status is None else str(status)
+    if status == TOMBSTONE:
+        return ""
+    if status.startswith(TOMBSTONE + TOMBSTONE_SEP):
+        return status[len(TOMBSTONE + TOMBSTONE_SEP):]
+    return status
+
+
+def tombstone_note(note):
+    """keterangan for a depleted row: the marker, then the note it had."""
+    note = restore_note(note).strip()
+    return f"{TOMBSTONE}{TOMBSTONE_SEP}{note}" if note else TOMBSTONE
+
+
+def is_tombstone(row, cols):
+    if cols is None:
+        return False
+    jumlah, status = (str(row[c]).strip() if c < len(row) else "" for c in cols)
+    return jumlah == "0" and _marked(status)
+
+
+def drop_tombstones(values):
+    """``values`` without tombstone rows (the header row is kept)."""
+    cols = status_columns(values[0]) if len(values) > 1 else None
+    if cols is None:
+        return values
+    return [values[0]] + [r for r in values[1:] if not is_tombstone(r, cols)]
+
+
+class RowIndex:
+    """Maps normalized item keys to 1-based row numbers (row 1 = header)."""
+
+    def __init__(self, values, key_headers=KEY_HEADERS):
+        header = values[0] if values else []
+        # ValueError here means the sheet does not have the key columns
+        self.cols = [header.index(h) for h in key_headers]
+        self.status = status_columns(header)
+        # Columns whose edits change what the index answers
+        self.watched = set(self.cols) | set(self.status or ())
+        self._dead = set()  # tombstone rows
+        self._rows = {}
+        self._by_key = defaultdict(set)
+        self._by_nama = defaultdict(set)
+        for number, row in enumerate(values[1:], start=2):
+            self.add(number, row)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _key(self, row):
+        nama, tanggal, kondisi = (row[c] if c < len(row) else "" for c in self.cols)
+        return (normalize_name(nama), str(tanggal), str(kondisi))
+
+    def add(self, number, row):
+        key = self._key(row)
+        self._rows[number] = key
+        self._by_key[key].add(number)
+        self._by_nama[(key[0], key[2])].add(number)
+        if is_tombstone(row, self.status):
+            self._dead.add(number)
+
+    def remove(self, number):
+        key = self._rows.pop(number, None)
+        self._dead.discard(number)
+        if key is None:
+            return
+        self._discard(self._by_key, key, number)
+        self._discard(self._by_nama, (key[0], key[2]), number)
+
+    def update(self, number, row):
+        self.remove(number)
+        self.add(number, row)
+
+    def delete(self, number):
+        """Row ``number`` was deleted; every row below it moves up by one."""
+        self.remove(number)
+        shifted = {(n - 1 if n > number else n): k for n, k in self._rows.items()}
+        self._dead = {n - 1 if n > number else n for n in self._dead}
+        self._rows = {}
+        self._by_key.clear()
+        self._by_nama.clear()
+        for n, key in shifted.items():
+            self._rows[n] = key
+            self._by_key[key].add(n)
+            self._by_nama[(key[0], key[2])].add(n)
+
+    def find(self, nama, tanggal, kondisi):
+        """Row of an exact (nama, tanggal, kondisi) match, or None.
+
+        A tombstone is returned only when no live row matches, so a restock
+        of a depleted item revives its old row.
+        """
+        rows = self._by_key.get((normalize_name(nama), str(tanggal), str(kondisi)))
+        if not rows:
+            return None
+        return min(rows - self._dead or rows)
+
+    def find_first(self, nama, kondisi):
+        """First live row holding ``nama`` in ``kondisi`` regardless of date, or None."""
+        rows = self._by_nama.get((normalize_name(nama), str(kondisi)), set()) - self._dead
+        return min(rows) if rows else None
+
+    @staticmethod
+    def _discard(mapping, key, number):
+        rows = mapping.get(key)
+        if rows is not None:
+            rows.discard(number)
+            if not rows:
+                del mapping[key]
@@ -0,0 +1,47 @@
+"""Image and QR preparation for the "Simpan" flow.
+
+Phone photos are downscaled and recompressed locally before upload, and
+the Cloudinary public_id is chosen up front so the final image URL is known
+before the upload finishes. That lets the QR code be rendered right away
+and both uploads run in parallel with the sheet write.
+"""
+import re
+from io import BytesIO
+
+import qrcode
+from PIL import Image, ImageOps
+
+MAX_SIDE = 1600
+JPEG_QUALITY = 82
+
+
+def downscale_image(data, max_side=MAX_SIDE, quality=JPEG_QUALITY):
+    """Return (bytes, ext) for an image no larger than ``max_side`` px.
+
+    Photos are re-encoded as progressive JPEG; images with transparency stay
+    PNG so the alpha channel survives.
+    """
+    img = Image.open(BytesIO(data))
+    # Phone cameras store rotation in EXIF; bake it in before resizing
+    img = ImageOps.exif_transpose(img)
+    img.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    out = BytesIO()
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img.save(out, format="PNG", optimize=True)
+        return out.getvalue(), "png"
+    img.convert("RGB").save(out, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return out.getvalue(), "jpg"
+
+
+def make_qr_png(text):
+    """PNG bytes of a QR code for ``text``."""
+    buffer = BytesIO()
+    qrcode.make(text).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def public_id(folder, name, when):
+    """Cloudinary public_id like ``folder/kabel_hdmi_20240102153000``."""
+    slug = re.sub(r"[^a-z0-9]+", "_", str(name).lower()).strip("_") or "item"
+    return f"{folder}/{slug}_{when.strftime('%Y%m%d%H%M%S')}"
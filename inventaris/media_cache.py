@@ -0,0 +1,47 @@
+"""Content-addressed cache of Cloudinary upload results.
+
+Images are keyed by the SHA-256 of the uploaded bytes and QR codes by the
+SHA-256 of the URL they encode, so resubmitting the same photo (e.g. for a
+restock) reuses the earlier URLs instead of uploading again. Entries are
+kept in a small SQLite file so they survive restarts.
+"""
+import hashlib
+import sqlite3
+import time
+
+
+def image_key(data):
+    return "img:" + hashlib.sha256(data).hexdigest()
+
+
+def qr_key(url):
+    return "qr:" + hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class MediaCache:
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS media ("
+                " key TEXT PRIMARY KEY,"
+                " url TEXT NOT NULL,"
+                " created REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        # One short-lived connection per operation keeps this thread-safe
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key):
+        """Stored URL for ``key``, or None."""
+        with self._connect() as db:
+            row = db.execute("SELECT url FROM media WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key, url):
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO media (key, url, created) VALUES (?, ?, ?)",
+                (key, url, time.time()),
+            )
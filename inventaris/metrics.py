@@ -0,0 +1,137 @@
+"""Timing of external calls and rerun phases, attributed to user actions.
+
+Each event records what ran (``kind`` such as "sheets", "cloudinary", "gas"
+or "phase", plus a ``name``), how long it took, roughly how many bytes it
+moved, whether it succeeded, and which user action triggered it. The action
+and user live in context variables, so they follow the code through nested
+calls; use ``bind`` when handing work to a thread pool. Threads started
+without a bound context (replicator, outbox) report as "background".
+"""
+import contextvars
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+_action = contextvars.ContextVar("inventaris_action", default="background")
+_user = contextvars.ContextVar("inventaris_user", default=None)
+
+
+def payload_size(obj):
+    """Approximate size in bytes of cell values, rows and request bodies."""
+    if obj is None:
+        return 0
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if isinstance(obj, str):
+        return len(obj.encode("utf-8"))
+    if isinstance(obj, (list, tuple)):
+        return sum(payload_size(item) for item in obj)
+    if isinstance(obj, dict):
+        return sum(payload_size(k) + payload_size(v) for k, v in obj.items())
+    return len(str(obj))
+
+
+class Recorder:
+    def __init__(self, maxlen=5000):
+        self._events = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    # --- attribution ------------------------------------------------------
+    def set_action(self, name, user=None):
+        """Attribute everything that follows in this context to ``name``."""
+        _action.set(name)
+        if user is not None:
+            _user.set(user)
+
+    @contextmanager
+    def action(self, name):
+        """Nested action: ``"<outer> › <name>"`` while the block runs."""
+        outer = _action.get()
+        token = _action.set(name if outer == "background" else f"{outer} › {name}")
+        try:
+            yield
+        finally:
+            _action.reset(token)
+
+    def bind(self, fn):
+        """Wrap ``fn`` so it runs with the caller's action/user (for pools)."""
+        ctx = contextvars.copy_context()
+
+        @wraps(fn)
+        def bound(*args, **kwargs):
+            return ctx.run(fn, *args, **kwargs)
+        return bound
+
+    # --- recording --------------------------------------------------------
+    def record(self, kind, name, seconds, size=None, ok=True):
+        event = {
+            "ts": round(time.time(), 3),
+            "user": _user.get(),
+            "action": _action.get(),
+            "kind": kind,
+            "name": name,
+            "ms": round(seconds * 1000, 2),
+            "bytes": size,
+            "ok": ok,
+        }
+        with self._lock:
+            self._events.append(event)
+
+    @contextmanager
+    def span(self, kind, name, size=None):
+        """Time the block; the yielded dict's "size" may be set inside it."""
+        info = {"size": size}
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield info
+            ok = True
+        finally:
+            self.record(kind, name, time.perf_counter() - started, info["size"], ok)
+
+    def timed(self, kind, name=None):
+        """Decorator form of ``span``."""
+        def decorate(fn):
+            label = name or fn.__name__
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(kind, label):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    # --- reporting --------------------------------------------------------
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+
+    def summary(self):
+        """Per (action, kind, name): count, total/mean/max ms, bytes, errors."""
+        groups = {}
+        for e in self.events():
+            key = (e["action"], e["kind"], e["name"])
+            g = groups.setdefault(key, {
+                "action": key[0], "kind": key[1], "name": key[2],
+                "count": 0, "total_ms": 0.0, "max_ms": 0.0, "bytes": 0, "errors": 0,
+            })
+            g["count"] += 1
+            g["total_ms"] += e["ms"]
+            g["max_ms"] = max(g["max_ms"], e["ms"])
+            g["bytes"] += e["bytes"] or 0
+            g["errors"] += not e["ok"]
+        rows = sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)
+        for g in rows:
+            g["total_ms"] = round(g["total_ms"], 2)
+            g["mean_ms"] = round(g["total_ms"] / g["count"], 2)
+        return rows
+
+    def to_jsonl(self):
+        return "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in self.events())
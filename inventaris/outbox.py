@@ -0,0 +1,116 @@
+"""Durable outbox for Apps Script (GAS) notifications.
+
+Each notification is first stored in a local SQLite file, then a daemon
+thread delivers due entries in batches. A failed batch stays on disk and is
+retried with exponential backoff plus jitter, so a slow or rate-limited
+endpoint never blocks a user action and a restart never loses an event.
+"""
+import atexit
+import json
+import random
+import sqlite3
+import threading
+import time
+
+
+class Outbox:
+    """SQLite-backed queue drained by ``send(payloads)``.
+
+    ``send`` receives a list of payload dicts and must raise on failure.
+    """
+
+    def __init__(self, path, send, batch_size=20, interval=5.0,
+                 base_delay=5.0, max_delay=900.0):
+        self.path = path
+        self._send = send
+        self.batch_size = batch_size
+        self.interval = interval
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " payload TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " next_attempt REAL NOT NULL,"
+                " last_error TEXT)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (next_attempt)")
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="gas-outbox", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _connect(self):
+        # One short-lived connection per operation keeps this thread-safe
+        return sqlite3.connect(self.path, timeout=30)
+
+    def put(self, payload):
+        """Record a notification; it is sent by the dispatcher thread."""
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO outbox (payload, next_attempt) VALUES (?, ?)",
+                (json.dumps(payload), time.time()),
+            )
+        self._wake.set()
+
+    def pending(self):
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def _backoff(self, attempts):
+        delay = min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+        return delay * random.uniform(0.5, 1.0)
+
+    def dispatch_due(self):
+        """Send every entry that is due, batch by batch; returns the count sent."""
+        sent = 0
+        while True:
+            now = time.time()
+            with self._connect() as db:
+                rows = db.execute(
+                    "SELECT id, payload, attempts FROM outbox"
+                    " WHERE next_attempt <= ? ORDER BY id LIMIT ?",
+                    (now, self.batch_size),
+                ).fetchall()
+            if not rows:
+                return sent
+            ids = [r[0] for r in rows]
+            try:
+                self._send([json.loads(r[1]) for r in rows])
+            except Exception as e:
+                print(f"❌ GAS Error: {e}")
+                with self._connect() as db:
+                    db.executemany(
+                        "UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ?"
+                        " WHERE id = ?",
+                        [(r[2] + 1, now + self._backoff(r[2] + 1), str(e), r[0]) for r in rows],
+                    )
+                return sent
+            with self._connect() as db:
+                db.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+            sent += len(ids)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            if self._stop.is_set():
+                break
+            # Short pause so events from the same action share one request
+            time.sleep(0.5)
+            self._wake.clear()
+            try:
+                self.dispatch_due()
+            except Exception as e:
+                print(f"❌ GAS outbox error: {e}")
+
+    def close(self, timeout=5):
+        """Stop the dispatcher; anything undelivered stays on disk."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
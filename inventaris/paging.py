@@ -0,0 +1,107 @@
+"""Paged reads of a worksheet for the "Lihat Data" browser.
+
+Only the rows of the requested page are fetched (one ``A{start}:{end}``
+range read), together with a row count taken from column A. Both are
+cached per sheet and dropped whenever the snapshot cache reports a write,
+so browsing a large tab costs memory and time proportional to the page
+size, not the sheet size.
+"""
+import threading
+import time
+
+import pandas as pd
+
+from inventaris.sync import col_letter
+
+HIGHLIGHT = {
+    "Rusak": "background-color: #ffcccc",
+    "Perlu Perbaikan": "background-color: #fff4cc",
+}
+
+
+def page_range(page, page_size):
+    """First and last sheet row (1-based, header = row 1) of ``page``."""
+    start = 2 + (page - 1) * page_size
+    return start, start + page_size - 1
+
+
+def page_count(total_rows, page_size):
+    return max(1, -(-total_rows // page_size))
+
+
+def highlight_kondisi(df):
+    """Per-cell styles for a whole page at once (use with Styler.apply(axis=None))."""
+    colors = df["Kondisi"].astype(str).map(HIGHLIGHT).fillna("")
+    return pd.DataFrame({col: colors for col in df.columns}, index=df.index)
+
+
+class PageReader:
+    """TTL cache of row counts and page ranges, keyed by worksheet title.
+
+    ``peek(title)`` may return the full cached snapshot of a sheet; when it
+    does, pages are cut from it instead of being read again. Otherwise a
+    LocalStore that holds the tab answers with a COUNT(*) and a position
+    range, and only tabs known to neither are read from Sheets.
+    """
+
+    def __init__(self, ttl=60, peek=None, store=None):
+        self.ttl = ttl
+        self._peek = peek
+        self._local = store
+        self._counts = {}
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self, title=None):
+        with self._lock:
+            if title is None:
+                self._counts.clear()
+                self._pages.clear()
+                return
+            self._counts.pop(title, None)
+            for key in [k for k in self._pages if k[0] == title]:
+                del self._pages[key]
+
+    def _cached(self, store, key):
+        with self._lock:
+            hit = store.get(key)
+        if hit is not None and time.monotonic() - hit[0] < self.ttl:
+            return hit[1]
+        return None
+
+    def _store(self, store, key, value):
+        with self._lock:
+            store[key] = (time.monotonic(), value)
+
+    def row_count(self, ws):
+        """Number of data rows (header excluded)."""
+        values = self._peek(ws.title) if self._peek else None
+        if values is not None:
+            return max(0, len(values) - 1)
+        if self._local is not None:
+            count = self._local.row_count(ws.title)
+            if count is not None:
+                return max(0, count - 1)
+        count = self._cached(self._counts, ws.title)
+        if count is None:
+            count = max(0, len(ws.col_values(1)) - 1)
+            self._store(self._counts, ws.title, count)
+        return count
+
+    def read_page(self, ws, page, page_size, width):
+        """Rows of ``page`` as lists (no header), at most ``page_size`` long."""
+        start, end = page_range(page, page_size)
+        values = self._peek(ws.title) if self._peek else None
+        if values is not None:
+            return values[start - 1:end]
+        if self._local is not None:
+            rows = self._local.rows(ws.title, start, end)
+            if rows is not None:
+                return rows
+        key = (ws.title, start, end, width)
+        rows = self._cached(self._pages, key)
+        if rows is None:
+            rows = ws.get(f"A{start}:{col_letter(width)}{end}")
+            rows = [list(r) for r in rows]
+            self._store(self._pages, key, rows)
+        return rows
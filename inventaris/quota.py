@@ -0,0 +1,198 @@
+"""Quota-aware wrapper around gspread spreadsheets and worksheets.
+
+Google Sheets allows a fixed number of read and write requests per minute.
+Every call made through the wrappers here:
+
+* waits for a free slot in a sliding one-minute budget (per read/write),
+  so bursts queue up instead of tripping HTTP 429;
+* shares the result of an identical read that is already in flight, so
+  concurrent sessions asking for the same range cost one request;
+* retries with jittered exponential backoff: reads on 429/5xx and
+  connection errors, writes only on 429. A write that timed out or got a
+  5xx may still have been applied, and appends or deletes are not safe to
+  repeat; the store's Replicator resends its own (idempotent) batches.
+
+``headroom()`` reports how many requests are left in the current window.
+Pass a ``metrics.Recorder`` to time every call as a "sheets" event.
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from .metrics import payload_size
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+READ_METHODS = {
+    "get", "get_all_values", "get_all_records", "get_values", "col_values",
+    "row_values", "acell", "cell", "values_get", "values_batch_get",
+    "worksheet", "worksheets", "fetch_sheet_metadata",
+}
+WRITE_METHODS = {
+    "update", "update_cell", "update_cells", "append_row", "append_rows",
+    "delete_rows", "insert_row", "insert_rows", "batch_update",
+    "values_update", "values_append", "add_worksheet", "clear",
+}
+
+
+def _status(error):
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def is_retryable(error):
+    return _status(error) in RETRY_STATUS or isinstance(error, OSError)
+
+
+def is_permanent(error):
+    """True for a request Sheets rejected as such (4xx other than 429)."""
+    status = _status(error)
+    return status is not None and 400 <= status < 500 and status != 429
+
+
+class _Window:
+    """Sliding 60-second request budget."""
+
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now):
+        while self._calls and now - self._calls[0] >= 60:
+            self._calls.popleft()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._trim(now)
+                if len(self._calls) < self.per_minute:
+                    self._calls.append(now)
+                    return
+                wait = 60 - (now - self._calls[0])
+            time.sleep(max(wait, 0.05))
+
+    def remaining(self):
+        with self._lock:
+            self._trim(time.monotonic())
+            return self.per_minute - len(self._calls)
+
+
+class QuotaClient:
+    def __init__(self, reads_per_minute=60, writes_per_minute=60,
+                 max_retries=5, base_delay=1.0, max_delay=32.0, recorder=None):
+        self._windows = {"read": _Window(reads_per_minute), "write": _Window(writes_per_minute)}
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.throttled = 0  # 429 responses seen so far
+        self.recorder = recorder
+
+    def headroom(self):
+        """{'read': n, 'write': n} requests left in the current minute."""
+        return {kind: w.remaining() for kind, w in self._windows.items()}
+
+    def _run(self, kind, fn, args, kwargs):
+        for attempt in range(self.max_retries + 1):
+            self._windows[kind].acquire()
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if _status(e) == 429:
+                    self.throttled += 1
+                # 429 means the request was refused, so even a write can go again
+                retry = is_retryable(e) if kind == "read" else _status(e) == 429
+                if attempt == self.max_retries or not retry:
+                    raise
+                delay = min(self.base_delay * 2 ** attempt, self.max_delay)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+
+    def call(self, kind, fn, *args, coalesce_key=None, **kwargs):
+        """Run ``fn`` under the ``kind`` ('read'/'write') budget with retries."""
+        if self.recorder is None:
+            return self._call(kind, fn, args, kwargs, coalesce_key)
+        name = f"{kind}:{getattr(fn, '__name__', 'call')}"
+        with self.recorder.span("sheets", name) as span:
+            result = self._call(kind, fn, args, kwargs, coalesce_key)
+            span["size"] = payload_size(result if kind == "read" else (args, kwargs))
+            return result
+
+    def _call(self, kind, fn, args, kwargs, coalesce_key):
+        if kind != "read" or coalesce_key is None:
+            return self._run(kind, fn, args, kwargs)
+
+        with self._lock:
+            future = self._inflight.get(coalesce_key)
+            owner = future is None
+            if owner:
+                future = self._inflight[coalesce_key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            result = self._run(kind, fn, args, kwargs)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(coalesce_key, None)
+
+    def wrap_spreadsheet(self, spreadsheet):
+        return QuotaSpreadsheet(spreadsheet, self)
+
+
+class _Proxy:
+    def __init__(self, target, quota):
+        self._target = target
+        self._quota = quota
+
+    def _key(self, name, args, kwargs):
+        return (self._scope(), name, repr(args), repr(sorted(kwargs.items())))
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr) or name not in READ_METHODS | WRITE_METHODS:
+            return attr
+        kind = "read" if name in READ_METHODS else "write"
+
+        def wrapped(*args, **kwargs):
+            key = self._key(name, args, kwargs) if kind == "read" else None
+            result = self._quota.call(kind, attr, *args, coalesce_key=key, **kwargs)
+            return self._wrap_result(result)
+        return wrapped
+
+    def _wrap_result(self, result):
+        return result
+
+
+class QuotaSpreadsheet(_Proxy):
+    def _scope(self):
+        return self._target.id
+
+    def _wrap_result(self, result):
+        # worksheet()/add_worksheet() hand back worksheets; wrap those too
+        if hasattr(result, "row_values") and hasattr(result, "spreadsheet"):
+            return QuotaWorksheet(result, self._quota, self)
+        if isinstance(result, list) and result and hasattr(result[0], "row_values"):
+            return [QuotaWorksheet(ws, self._quota, self) for ws in result]
+        return result
+
+
+class QuotaWorksheet(_Proxy):
+    def __init__(self, target, quota, parent):
+        super().__init__(target, quota)
+        self._parent = parent
+
+    def _scope(self):
+        return (self._parent.id, self._target.id)
+
+    @property
+    def spreadsheet(self):
+        return self._parent
@@ -0,0 +1,177 @@
+"""Item-name search for autocomplete, built from a cached tab snapshot.
+
+Names are normalized like the row index (``normalize_name``). A query is
+answered from a sorted name table (prefix matches, via bisect) and then,
+if that leaves room, from a trigram index (fuzzy matches ranked by
+trigram similarity), so typos still find the item. Stock per Kondisi is
+summed while building, from live rows only.
+
+The name table and trigram postings only depend on the set of names, so a
+rebuild after a write that just changed quantities reuses them and only
+sums the stock again.
+"""
+import bisect
+import heapq
+import threading
+from collections import Counter, defaultdict
+from itertools import chain
+
+from inventaris.index import drop_tombstones, normalize_name
+
+# Below this many names no trigram is treated as common (see NameIndex._absent)
+COMMON_MIN_NAMES = 1000
+
+# Probe a posting list per candidate (bisect) when it is this many times
+# longer than the candidate set; otherwise intersect with all of it
+BISECT_RATIO = 12
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _as_int(value):
+    try:
+        return int(float(str(value).replace(",", ".")))
+    except ValueError:
+        return 0
+
+
+class NameIndex:
+    def __init__(self, values, name_header="Nama Barang", previous=None):
+        values = drop_tombstones(values)
+        header = [str(h).strip() for h in values[0]] if values else []
+        i_nama = header.index(name_header) if name_header in header else None
+        i_jumlah = header.index("Jumlah") if "Jumlah" in header else None
+        i_kondisi = header.index("Kondisi") if "Kondisi" in header else None
+
+        self.display = {}  # normalized -> first spelling seen
+        self.stock = defaultdict(lambda: defaultdict(int))  # normalized -> {kondisi: qty}
+        for row in values[1:] if i_nama is not None else ():
+            nama = str(row[i_nama]).strip() if i_nama < len(row) else ""
+            if not nama:
+                continue
+            key = normalize_name(nama)
+            self.display.setdefault(key, nama)
+            kondisi = str(row[i_kondisi]) if i_kondisi is not None and i_kondisi < len(row) else ""
+            qty = _as_int(row[i_jumlah]) if i_jumlah is not None and i_jumlah < len(row) else 0
+            self.stock[key][kondisi] += qty
+
+        if previous is not None and previous.display.keys() == self.display.keys():
+            self._sorted = previous._sorted
+            self._gram_count = previous._gram_count
+            self._grams = previous._grams
+            self._absent = previous._absent
+            return
+        # Names are referred to by their position in the sorted table
+        self._sorted = sorted(self.display)
+        self._gram_count = []
+        self._grams = defaultdict(list)
+        for i, key in enumerate(self._sorted):
+            grams = trigrams(key)
+            self._gram_count.append(len(grams))
+            for gram in grams:
+                self._grams[gram].append(i)
+        # Names *without* each trigram more than half the names have:
+        # probing those is cheaper than probing the posting of most names.
+        # Small tabs are cheap to search exhaustively, so they have none.
+        self._absent = {}
+        everyone = range(len(self._sorted))
+        for gram, posting in self._grams.items():
+            if len(everyone) >= COMMON_MIN_NAMES and len(posting) * 2 > len(everyone):
+                self._absent[gram] = set(everyone).difference(posting)
+
+    def __len__(self):
+        return len(self._sorted)
+
+    def search(self, query, limit=20):
+        """Display names matching ``query``: prefix hits first, then fuzzy."""
+        q = normalize_name(query)
+        if not q:
+            return [self.display[k] for k in self._sorted[:limit]]
+
+        start = bisect.bisect_left(self._sorted, q)
+        hits = []
+        for key in self._sorted[start:]:
+            if not key.startswith(q) or len(hits) >= limit:
+                break
+            hits.append(key)
+
+        if len(hits) < limit:
+            hits.extend(self._sorted[i] for i in self._fuzzy(q, limit - len(hits), start, len(hits)))
+        return [self.display[k] for k in hits]
+
+    def _fuzzy(self, q, limit, start, skip):
+        """Positions of the ``limit`` names most similar to ``q``, best first.
+
+        A name needs at least half of the query's trigrams, so it must have
+        one of the ``size - floor + 1`` rarest ones: only those posting
+        lists are counted to find candidates, and the other trigrams are
+        probed for the candidates alone (see ``_probe``). Positions
+        ``start`` to ``start + skip`` are prefix hits already returned.
+        """
+        grams = sorted(trigrams(q), key=lambda g: len(self._grams.get(g, ())))
+        size = len(grams)
+        floor = max(1, size // 2)
+        split = size - floor + 1
+        # Trigrams most names have (the "barang" in "Barang 12") only add to
+        # the score: a name sharing nothing else is no match worth ranking,
+        # and counting their postings would visit every name
+        counted = [g for g in grams[:split] if g not in self._absent] or grams[:1]
+        shared = Counter(chain.from_iterable(self._grams.get(g, ()) for g in counted))
+        self._probe([g for g in grams if g not in counted], shared)
+        matches = (i for i, n in shared.items()
+                   if n >= floor and not start <= i < start + skip)
+        # Rank by Jaccard similarity of the trigram sets
+        return heapq.nlargest(
+            limit, matches,
+            key=lambda i: shared[i] / (size + self._gram_count[i] - shared[i]),
+        )
+
+    def _probe(self, grams, shared):
+        """Add to ``shared`` (position -> count) the ``grams`` each name has.
+
+        Per trigram, whichever is cheapest: the names lacking it (for
+        trigrams most names have), a bisect per name when its posting is
+        much longer than ``shared``, or a set intersection in C.
+        """
+        names = set(shared)
+        for gram in grams:
+            posting = self._grams.get(gram, ())
+            if gram in self._absent:
+                shared.update(names.difference(self._absent[gram]))
+            elif len(names) * BISECT_RATIO < len(posting):
+                end = len(posting)
+                shared.update([i for i in names
+                               if (j := bisect.bisect_left(posting, i)) < end and posting[j] == i])
+            else:
+                shared.update(names.intersection(posting))
+
+    def stock_of(self, nama):
+        """{Kondisi: Jumlah} for one item (live rows only)."""
+        return dict(self.stock.get(normalize_name(nama), {}))
+
+
+class NameIndexCache:
+    """Last NameIndex per tab, rebuilt only when the tab's version changes.
+
+    ``version`` comes from SnapshotCache.versioned and only moves when the
+    values do, so a TTL reload of an unchanged tab keeps the index; None
+    means unknown and builds an index that is not kept.
+    """
+
+    def __init__(self):
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def get(self, title, values, version):
+        with self._lock:
+            cached = self._indexes.get(title)
+        if cached is not None and version is not None and cached[0] == version:
+            return cached[1]
+        index = NameIndex(values, previous=cached[1] if cached is not None else None)
+        if version is not None:
+            with self._lock:
+                self._indexes[title] = (version, index)
+        return index
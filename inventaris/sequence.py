@@ -0,0 +1,87 @@
+"""Per-sheet counters for the "No" column and "Kode Inventaris" codes.
+
+Instead of downloading a whole sheet to read the last "No", each sheet gets
+a high-water mark that is seeded once (from the cached snapshot when there
+is one, otherwise from a read of column A only) and then advanced locally.
+Allocation happens under a per-sheet lock, so two sessions writing to the
+same sheet never receive the same number, while a slow seed of one sheet
+does not hold up allocations on the others.
+"""
+import threading
+import time
+
+
+def make_kode(tanggal_masuk, no):
+    """Kode Inventaris in the INV-<YYYYMMDD>-NNN format."""
+    date_slug = str(tanggal_masuk).replace("-", "").replace("/", "")
+    return f"INV-{date_slug}-{int(no):03d}"
+
+
+def last_number(column):
+    """Last numeric "No" in column-A cells (header excluded).
+
+    Falls back to the number of data rows when no cell is numeric, which is
+    what the sheet code did before.
+    """
+    for cell in reversed(column):
+        try:
+            return int(str(cell).strip())
+        except ValueError:
+            continue
+    return len(column)
+
+
+class SequenceAllocator:
+    """Hands out increasing "No" values per worksheet title.
+
+    ``peek`` is an optional callable returning the cached values of a sheet
+    (or None); it lets the seed reuse a snapshot that is already in memory.
+    The mark is re-seeded after ``ttl`` seconds to pick up rows added by hand
+    in Google Sheets, but it never moves backwards.
+    """
+
+    def __init__(self, ttl=300, peek=None):
+        self.ttl = ttl
+        self._peek = peek
+        self._marks = {}
+        self._locks = {}
+        self._lock = threading.Lock()  # guards _locks and _marks only
+
+    def _seed(self, ws):
+        values = self._peek(ws.title) if self._peek else None
+        if values is not None:
+            return last_number([row[0] if row else "" for row in values[1:]])
+        return last_number(ws.col_values(1)[1:])
+
+    def _title_lock(self, title):
+        with self._lock:
+            return self._locks.setdefault(title, threading.Lock())
+
+    def allocate(self, ws, count=1):
+        """Reserve ``count`` consecutive numbers for ``ws``; returns a range."""
+        with self._title_lock(ws.title):
+            with self._lock:
+                mark = self._marks.get(ws.title)
+            now = time.monotonic()
+            if mark is None or now - mark[1] >= self.ttl:
+                # Network read: only this sheet's allocations wait for it
+                seeded = self._seed(ws)
+                current = max(seeded, mark[0]) if mark else seeded
+                seeded_at = now
+            else:
+                current, seeded_at = mark
+            with self._lock:
+                self._marks[ws.title] = (current + count, seeded_at)
+            return range(current + 1, current + count + 1)
+
+    def next_no(self, ws):
+        return self.allocate(ws)[0]
+
+    def reset(self, title=None):
+        """Forget the mark for one sheet (or all), forcing a re-seed."""
+        if title is None:
+            with self._lock:
+                self._marks.clear()
+            return
+        with self._title_lock(title), self._lock:
+            self._marks.pop(title, None)
@@ -0,0 +1,864 @@
+"""Local SQLite mirror of the spreadsheets, used as the system of record.
+
+Every tab the app touches (inventory, usage and the monthly logs) is kept
+as ordered rows in ``sheet_rows``. A SheetBatch commit applies its
+operations to those rows and queues the matching Sheets API requests in
+``replication`` inside one transaction, so a user action is durable as
+soon as it returns. A Replicator thread then pushes queued requests to
+Google Sheets in order, one batchUpdate per spreadsheet, retrying with
+backoff. Reads and writes keep working while Sheets is down or throttled.
+
+Delivery is at least once, so every queued request is idempotent: appends
+become updateCells at the rows the store assigned, and a delete becomes a
+rewrite of the rows it shifted. A batch Sheets rejects outright (HTTP 4xx
+other than 429) is moved to ``replication_dead`` instead of blocking the
+queue.
+
+The spreadsheets stay the human-facing view, so people may still add or
+edit rows there. Each tab keeps a remote cursor (see inventaris.sync): the
+row count and tail checksum Sheets has once every delivered batch is in.
+Before pushing, and every ``pull_interval`` otherwise, the Replicator
+re-reads that tail. Rows added below it are merged into the store, with
+the local rows not yet in Sheets moved down under them; a tail that no
+longer matches rebases the tab on a full read (``reseed``). Either way
+the queued writes of the tab are rebuilt for the new positions, so a row
+added by hand is never overwritten.
+"""
+import atexit
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+
+from inventaris.batch import update_cells_request
+from inventaris.index import normalize_name, tombstone_note
+from inventaris.quota import is_permanent
+from inventaris.sync import TAIL_ROWS, cursor, split_delta, tail_checksum, tail_range
+
+# Header names whose values are copied into indexed columns
+NAMA_HEADERS = ("Nama Barang", "Nama")
+TANGGAL_HEADERS = ("Tanggal Masuk", "Tanggal Digunakan")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sheets (
+    title TEXT PRIMARY KEY,
+    spreadsheet_id TEXT NOT NULL,
+    sheet_id INTEGER NOT NULL,
+    seeded_at REAL NOT NULL,
+    remote_count INTEGER,
+    remote_tail TEXT
+);
+CREATE TABLE IF NOT EXISTS sheet_rows (
+    title TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    cells TEXT NOT NULL,
+    nama_norm TEXT,
+    tanggal TEXT,
+    kondisi TEXT,
+    PRIMARY KEY (title, position)
+);
+CREATE INDEX IF NOT EXISTS sheet_rows_item
+    ON sheet_rows (title, nama_norm, kondisi, tanggal);
+CREATE TABLE IF NOT EXISTS replication (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    spreadsheet_id TEXT NOT NULL,
+    requests TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created REAL NOT NULL,
+    cursors TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS replication_dead (
+    id INTEGER PRIMARY KEY,
+    spreadsheet_id TEXT NOT NULL,
+    requests TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    last_error TEXT,
+    created REAL NOT NULL,
+    failed_at REAL NOT NULL
+);
+"""
+
+# Columns added to stores created before them: (table, column, definition)
+MIGRATIONS = [
+    ("sheets", "remote_count", "INTEGER"),
+    ("sheets", "remote_tail", "TEXT"),
+    ("replication", "cursors", "TEXT NOT NULL DEFAULT '{}'"),
+]
+
+# Grid rows added beyond what a push needs, so most appends need no resize
+GRID_SLACK = 500
+
+_INT = re.compile(r"-?(0|[1-9][0-9]*)")
+
+
+def _as_cell(value):
+    return "" if value is None else str(value)
+
+
+def _typed(cell):
+    # Stored cells are text; numbers go back to Sheets as numbers
+    return int(cell) if _INT.fullmatch(cell) else cell
+
+
+def _trimmed(row):
+    row = [_as_cell(c) for c in row]
+    while row and row[-1] == "":
+        row.pop()
+    return tuple(row)
+
+
+def _first_index(header, names):
+    for name in names:
+        if name in header:
+            return header.index(name)
+    return None
+
+
+class LocalStore:
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+            for table, column, definition in MIGRATIONS:
+                if column not in {r[1] for r in db.execute(f"PRAGMA table_info({table})")}:
+                    db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def _connect(self):
+        # One short-lived connection per operation keeps this thread-safe
+        return sqlite3.connect(self.path, timeout=30)
+
+    # --- reads ---
+
+    def has(self, title):
+        with self._connect() as db:
+            return db.execute("SELECT 1 FROM sheets WHERE title = ?", (title,)).fetchone() is not None
+
+    def values(self, title):
+        """Rows of ``title`` in sheet order, padded like get_all_values(); None if unknown."""
+        with self._connect() as db:
+            if db.execute("SELECT 1 FROM sheets WHERE title = ?", (title,)).fetchone() is None:
+                return None
+            rows = [json.loads(r[0]) for r in db.execute(
+                "SELECT cells FROM sheet_rows WHERE title = ? ORDER BY position", (title,)
+            )]
+        width = max((len(r) for r in rows), default=0)
+        return [r + [""] * (width - len(r)) for r in rows]
+
+    def row_count(self, title):
+        """Number of rows of ``title``, header included; None if unknown."""
+        with self._connect() as db:
+            if db.execute("SELECT 1 FROM sheets WHERE title = ?", (title,)).fetchone() is None:
+                return None
+            return db.execute(
+                "SELECT COUNT(*) FROM sheet_rows WHERE title = ?", (title,)
+            ).fetchone()[0]
+
+    def rows(self, title, start, end):
+        """Rows ``start``..``end`` (1-based, inclusive) of ``title``; None if unknown.
+
+        A range read on the primary key, so a page costs the same whatever
+        the size of the tab.
+        """
+        with self._connect() as db:
+            if db.execute("SELECT 1 FROM sheets WHERE title = ?", (title,)).fetchone() is None:
+                return None
+            return [json.loads(r[0]) for r in db.execute(
+                "SELECT cells FROM sheet_rows WHERE title = ? AND position BETWEEN ? AND ?"
+                " ORDER BY position", (title, start, end)
+            )]
+
+    def pending(self):
+        """Number of queued replication batches."""
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM replication").fetchone()[0]
+
+    # --- seeding from Google Sheets ---
+
+    def seed(self, ws, values):
+        """Start the local copy of ``ws`` from ``values`` fetched from Sheets.
+
+        A tab is seeded once. If it is already known (e.g. another session
+        seeded it first) nothing is replaced, so local rows still waiting
+        for replication are never dropped. Returns True if this call seeded.
+        """
+        values = [list(r) for r in values]
+        while values and not _trimmed(values[-1]):
+            values.pop()
+        with self._connect() as db:
+            added = db.execute(
+                "INSERT OR IGNORE INTO sheets"
+                " (title, spreadsheet_id, sheet_id, seeded_at, remote_count, remote_tail)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (ws.title, ws.spreadsheet.id, ws.id, time.time()) + cursor(values),
+            ).rowcount
+            if not added:
+                return False
+            db.execute("DELETE FROM sheet_rows WHERE title = ?", (ws.title,))
+            header = [_as_cell(c) for c in values[0]] if values else []
+            db.executemany(
+                "INSERT INTO sheet_rows (title, position, cells, nama_norm, tanggal, kondisi)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(ws.title, n) + self._row_fields(header, row, n)
+                 for n, row in enumerate(values, start=1)],
+            )
+            return True
+
+    # --- local writes ---
+
+    @staticmethod
+    def _row_fields(header, row, position):
+        cells = [_as_cell(c) for c in row]
+        if position == 1:
+            return json.dumps(cells), None, None, None
+        def pick(names):
+            i = _first_index(header, names)
+            return cells[i] if i is not None and i < len(cells) else ""
+        return (
+            json.dumps(cells),
+            normalize_name(pick(NAMA_HEADERS)),
+            pick(TANGGAL_HEADERS),
+            pick(("Kondisi",)),
+        )
+
+    def _header(self, db, title):
+        row = db.execute(
+            "SELECT cells FROM sheet_rows WHERE title = ? AND position = 1", (title,)
+        ).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def _write_row(self, db, title, position, cells, header=None):
+        if position == 1:
+            header = cells
+        elif header is None:
+            header = self._header(db, title)
+        db.execute(
+            "INSERT OR REPLACE INTO sheet_rows (title, position, cells, nama_norm, tanggal, kondisi)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (title, position) + self._row_fields(header, cells, position),
+        )
+
+    def _row_count(self, db, title):
+        return db.execute(
+            "SELECT COALESCE(MAX(position), 0) FROM sheet_rows WHERE title = ?", (title,)
+        ).fetchone()[0]
+
+    def _cursor(self, db, title):
+        """sync.cursor of the local copy of ``title``."""
+        count = self._row_count(db, title)
+        tail = [json.loads(r[0]) for r in db.execute(
+            "SELECT cells FROM sheet_rows WHERE title = ? AND position > ? ORDER BY position",
+            (title, count - TAIL_ROWS),
+        )]
+        return count, tail_checksum(tail)
+
+    @staticmethod
+    def _shift(db, title, after, by):
+        """Move every row below ``after`` by ``by`` positions (negative: up)."""
+        # Two steps so the primary key never collides while shifting
+        db.execute(
+            "UPDATE sheet_rows SET position = -(position + ?)"
+            " WHERE title = ? AND position > ?", (by, title, after))
+        db.execute(
+            "UPDATE sheet_rows SET position = -position"
+            " WHERE title = ? AND position < 0", (title,))
+
+    @staticmethod
+    def _require(db, title):
+        # Positions only mean something relative to a seeded copy of the tab
+        row = db.execute("SELECT sheet_id FROM sheets WHERE title = ?", (title,)).fetchone()
+        if row is None:
+            raise ValueError(f"Tab '{title}' belum ada di penyimpanan lokal; seed dulu.")
+        return row[0]
+
+    @staticmethod
+    def _check_key(db, title, row, key):
+        """ValueError unless ``row`` still holds the item ``key``.
+
+        ``key`` is the (Nama Barang, Tanggal Masuk, Kondisi) the caller saw
+        at that row; a compaction or a delete since then moved another item
+        there. None skips the check.
+        """
+        if key is None:
+            return
+        nama, tanggal, kondisi = key
+        found = db.execute(
+            "SELECT nama_norm, tanggal, kondisi FROM sheet_rows WHERE title = ? AND position = ?",
+            (title, row),
+        ).fetchone()
+        if found != (normalize_name(nama), _as_cell(tanggal), _as_cell(kondisi)):
+            raise ValueError(
+                f"Baris {row} di '{title}' sudah berubah (bukan lagi {nama}); muat ulang lalu coba lagi."
+            )
+
+    def _adjust(self, db, title, row, col, delta, note_col, key):
+        """Add ``delta`` to the number at (row, col) as stored; returns the row.
+
+        Raises ValueError if the row no longer holds ``key`` or the result
+        would be negative. A row taken down to 0 gets the tombstone marker
+        in ``note_col``.
+        """
+        found = db.execute(
+            "SELECT cells FROM sheet_rows WHERE title = ? AND position = ?", (title, row)
+        ).fetchone()
+        if found is None:
+            raise ValueError(f"Baris {row} tidak ada di '{title}'.")
+        self._check_key(db, title, row, key)
+        cells = json.loads(found[0])
+        cells.extend([""] * (max(col, note_col or 0) - len(cells)))
+        current = int(float(cells[col - 1] or 0))
+        if current + delta < 0:
+            i_nama = _first_index(self._header(db, title), NAMA_HEADERS)
+            nama = cells[i_nama] if i_nama is not None else f"baris {row}"
+            raise ValueError(f"Stok {nama} tidak cukup. Sisa: {current}, diminta: {-delta}")
+        cells[col - 1] = str(current + delta)
+        if note_col and delta < 0 and current + delta == 0:
+            cells[note_col - 1] = tombstone_note(cells[note_col - 1])
+        self._write_row(db, title, row, cells)
+        return cells
+
+    def _apply(self, db, op, shifted, results):
+        """Apply one op; returns its (idempotent) Sheets requests.
+
+        Deletes return nothing but record in ``shifted`` (title -> (first
+        row, old row count)) the range to rewrite once the commit is done.
+        Adjusted rows are recorded in ``results`` as (title, row) -> cells.
+        """
+        kind, title = op[0], op[1]
+        sheet_id = self._require(db, title)
+        if kind == "adjust":
+            _, _, row, col, delta, note_col, key = op
+            cells = self._adjust(db, title, row, col, delta, note_col, key)
+            results[(title, row)] = cells
+            return [update_cells_request(sheet_id, row, 1, [[_typed(c) for c in cells]])]
+        if kind == "update":
+            _, _, row, col, cells, key = op
+            self._check_key(db, title, row, key)
+            current = db.execute(
+                "SELECT cells FROM sheet_rows WHERE title = ? AND position = ?", (title, row)
+            ).fetchone()
+            # Keep positions contiguous if the update lands below the last row
+            for gap in range(self._row_count(db, title) + 1, row):
+                self._write_row(db, title, gap, [])
+            values = json.loads(current[0]) if current else []
+            end = col - 1 + len(cells)
+            if len(values) < end:
+                values.extend([""] * (end - len(values)))
+            values[col - 1:end] = [_as_cell(c) for c in cells]
+            self._write_row(db, title, row, values)
+            return [update_cells_request(sheet_id, row, col, [cells])]
+        if kind == "append":
+            _, _, rows = op
+            start = self._row_count(db, title) + 1
+            header = self._header(db, title)
+            for n, cells in enumerate(rows, start=start):
+                self._write_row(db, title, n, cells, header)
+            return [update_cells_request(sheet_id, start, 1, rows)]
+        if kind == "delete":
+            _, _, row = op
+            first, old_count = shifted.get(title, (row, 0))
+            shifted[title] = (min(first, row), max(old_count, self._row_count(db, title)))
+            db.execute("DELETE FROM sheet_rows WHERE title = ? AND position = ?", (title, row))
+            self._shift(db, title, row, -1)
+            return []
+        raise ValueError(f"Unknown store operation: {kind}")
+
+    def _rewrite(self, db, title, first, old_count):
+        """updateCells restoring rows first..old_count to their local state.
+
+        Rows that moved up are written at their new position and the rows
+        freed at the bottom are cleared, so replaying it is harmless.
+        """
+        sheet_id = self._require(db, title)
+        by_position = dict(db.execute(
+            "SELECT position, cells FROM sheet_rows WHERE title = ? AND position BETWEEN ? AND ?",
+            (title, first, old_count),
+        ))
+        rows = [json.loads(by_position[n]) if n in by_position else []
+                for n in range(first, old_count + 1)]
+        width = max([len(self._header(db, title))] + [len(r) for r in rows])
+        rows = [[_typed(c) for c in r] + [None] * (width - len(r)) for r in rows]
+        return update_cells_request(sheet_id, first, 1, rows)
+
+    def commit(self, groups):
+        """Apply local ops and queue their API requests in one transaction.
+
+        Every tab written must have been seeded; otherwise ValueError is
+        raised and nothing is committed. ``groups`` is a list of
+        (spreadsheet_id, ops) as built by SheetBatch; ops are ("update",
+        title, row, col, cells, key), ("append", title, rows), ("delete",
+        title, row) or ("adjust", title, row, col, delta, note_col, key).
+        A ``key`` other than None must still match the row (``_check_key``).
+
+        The whole commit holds SQLite's write lock from the start, so an
+        adjust reads and writes its quantity with no other writer in
+        between, across sessions and processes. Each queued batch records
+        the cursor its tabs will have in Sheets once it is delivered.
+        Returns {(title, row): cells} for the adjusted rows.
+        """
+        results = {}
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            for spreadsheet_id, ops in groups:
+                requests, shifted = [], {}
+                for op in ops:
+                    requests.extend(self._apply(db, op, shifted, results))
+                for title, (first, old_count) in shifted.items():
+                    requests.append(self._rewrite(db, title, first, old_count))
+                self._queue(db, spreadsheet_id, requests, {op[1] for op in ops})
+        return results
+
+    def _queue(self, db, spreadsheet_id, requests, titles):
+        db.execute(
+            "INSERT INTO replication (spreadsheet_id, requests, created, cursors)"
+            " VALUES (?, ?, ?, ?)",
+            (spreadsheet_id, json.dumps(requests), time.time(),
+             json.dumps({title: self._cursor(db, title) for title in titles})),
+        )
+
+    # --- rows changed in Sheets by hand ---
+
+    def spreadsheets(self):
+        with self._connect() as db:
+            return {sid for (sid,) in db.execute("SELECT DISTINCT spreadsheet_id FROM sheets")}
+
+    def remote_tabs(self, spreadsheet_id):
+        """(title, sheet_id, remote count, remote tail checksum, width) per tab.
+
+        The count is None for tabs seeded before cursors were kept; their
+        state in Sheets is unknown until the next full read.
+        """
+        with self._connect() as db:
+            tabs = db.execute(
+                "SELECT title, sheet_id, remote_count, remote_tail FROM sheets"
+                " WHERE spreadsheet_id = ? ORDER BY title", (spreadsheet_id,)
+            ).fetchall()
+            return [(title, sheet_id, count, checksum, max(len(self._header(db, title)), 1))
+                    for title, sheet_id, count, checksum in tabs]
+
+    def _remote(self, db, title, expected):
+        """(spreadsheet_id, sheet_id) if the remote cursor of ``title`` is still ``expected``."""
+        row = db.execute(
+            "SELECT spreadsheet_id, sheet_id, remote_count, remote_tail FROM sheets WHERE title = ?",
+            (title,),
+        ).fetchone()
+        if row is None or tuple(row[2:]) != tuple(expected):
+            return None
+        return row[:2]
+
+    def _strip(self, db, spreadsheet_id, sheet_id, title):
+        """Take the queued writes of one tab out of the queue.
+
+        Returns the (first, last) rows they covered, 1-based and in queue
+        order; batches left empty are dropped.
+        """
+        ranges = []
+        for entry_id, requests, cursors in db.execute(
+            "SELECT id, requests, cursors FROM replication WHERE spreadsheet_id = ? ORDER BY id",
+            (spreadsheet_id,),
+        ).fetchall():
+            requests, cursors = json.loads(requests), json.loads(cursors)
+            kept = []
+            for request in requests:
+                rng = request.get("updateCells", {}).get("range", {})
+                if rng.get("sheetId") == sheet_id:
+                    ranges.append((rng["startRowIndex"] + 1, rng["endRowIndex"]))
+                else:
+                    kept.append(request)
+            cursors.pop(title, None)
+            if not kept:
+                db.execute("DELETE FROM replication WHERE id = ?", (entry_id,))
+            elif len(kept) < len(requests):
+                db.execute(
+                    "UPDATE replication SET requests = ?, cursors = ? WHERE id = ?",
+                    (json.dumps(kept), json.dumps(cursors), entry_id),
+                )
+        return ranges
+
+    def _requeue(self, db, spreadsheet_id, title, ranges):
+        """Queue rewrites of ``ranges`` of ``title`` from its local rows."""
+        if ranges:
+            requests = [self._rewrite(db, title, first, last) for first, last in ranges]
+            self._queue(db, spreadsheet_id, requests, [title])
+
+    def merge_remote(self, title, expected, rows, remote):
+        """Fold ``rows``, added by hand below the replicated part of ``title``.
+
+        ``expected`` is the remote cursor they were read against and
+        ``remote`` the sheet's cursor with them. Local rows not yet in
+        Sheets move down under the new rows, and the queued writes of the
+        tab are replaced by rewrites at the new positions. Returns False,
+        changing nothing, if there is nothing to merge or the remote cursor
+        moved meanwhile.
+        """
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            ids = self._remote(db, title, expected)
+            if ids is None:
+                return False
+            ours = [json.loads(r[0]) for r in db.execute(
+                "SELECT cells FROM sheet_rows WHERE title = ? AND position > ? ORDER BY position",
+                (title, expected[0]),
+            )]
+            # Rows of a batch delivered but not marked sent yet are our own
+            skip = 0
+            while skip < min(len(rows), len(ours)) and _trimmed(rows[skip]) == _trimmed(ours[skip]):
+                skip += 1
+            count, rows = expected[0] + skip, rows[skip:]
+            if not rows:
+                return False
+            added = len(rows)
+            self._shift(db, title, count, added)
+            header = self._header(db, title)
+            for n, cells in enumerate(rows, start=count + 1):
+                self._write_row(db, title, n, cells, header)
+            ranges = [(first + added if first > count else first, last + added if last > count else last)
+                      for first, last in self._strip(db, *ids, title)]
+            self._requeue(db, ids[0], title, ranges)
+            db.execute(
+                "UPDATE sheets SET remote_count = ?, remote_tail = ? WHERE title = ?",
+                tuple(remote) + (title,),
+            )
+            return True
+
+    def reseed(self, title, values, expected):
+        """Rebase ``title`` on ``values``, a full read of the sheet.
+
+        For a tab whose replicated tail no longer matches (rows edited or
+        deleted by hand). Sheets wins for every row the app has no queued
+        write for. A row the app changed in place replaces the sheet row
+        with the same item key; rows the sheet lacks go to the bottom.
+        The queued writes become one rewrite from the first row that
+        differs. Returns False if the remote cursor moved meanwhile.
+        """
+        values = [list(r) for r in values]
+        while values and not _trimmed(values[-1]):
+            values.pop()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            ids = self._remote(db, title, expected)
+            if ids is None:
+                return False
+            count = expected[0]
+            local = [json.loads(r[0]) for r in db.execute(
+                "SELECT cells FROM sheet_rows WHERE title = ? ORDER BY position", (title,))]
+            dirty = {n for first, last in self._strip(db, *ids, title)
+                     for n in range(first, last + 1)}
+            if count is not None:
+                dirty.update(range(count + 1, len(local) + 1))
+
+            merged = [list(r) for r in values] or local[:1]
+            header = [_as_cell(c) for c in merged[0]] if merged else []
+            present = {}
+            for row in merged[1:]:
+                present[_trimmed(row)] = present.get(_trimmed(row), 0) + 1
+            by_key = {}
+            for n, row in enumerate(merged[1:], start=1):
+                by_key.setdefault(self._row_fields(header, row, n + 1)[1:], n)
+            for n, cells in enumerate(local[1:], start=2):
+                if n not in dirty:
+                    continue
+                if present.get(_trimmed(cells)):
+                    present[_trimmed(cells)] -= 1
+                    continue
+                # In place over the same item only for rows Sheets already had
+                i = by_key.get(self._row_fields(header, cells, n)[1:]) if count is None or n <= count else None
+                if i is None:
+                    merged.append(cells)
+                else:
+                    merged[i] = cells
+
+            db.execute("DELETE FROM sheet_rows WHERE title = ?", (title,))
+            for n, cells in enumerate(merged, start=1):
+                self._write_row(db, title, n, cells, header)
+            first = next((n for n, (a, b) in enumerate(zip(merged, values), start=1)
+                          if _trimmed(a) != _trimmed(b)), min(len(merged), len(values)) + 1)
+            last = max(len(merged), len(values))
+            self._requeue(db, ids[0], title, [(first, last)] if first <= last else [])
+            db.execute(
+                "UPDATE sheets SET remote_count = ?, remote_tail = ? WHERE title = ?",
+                cursor(values) + (title,),
+            )
+            return True
+
+    # --- replication queue ---
+
+    def queued(self, limit=500):
+        with self._connect() as db:
+            return db.execute(
+                "SELECT id, spreadsheet_id, requests, attempts FROM replication"
+                " ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+
+    def mark_sent(self, ids):
+        """Drop delivered batches, moving their tabs' remote cursors past them."""
+        with self._connect() as db:
+            for i in sorted(ids):
+                row = db.execute("SELECT cursors FROM replication WHERE id = ?", (i,)).fetchone()
+                if row is None:
+                    continue
+                db.executemany(
+                    "UPDATE sheets SET remote_count = ?, remote_tail = ? WHERE title = ?",
+                    [(count, checksum, title)
+                     for title, (count, checksum) in json.loads(row[0]).items()],
+                )
+                db.execute("DELETE FROM replication WHERE id = ?", (i,))
+
+    def mark_failed(self, ids, error):
+        with self._connect() as db:
+            db.executemany(
+                "UPDATE replication SET attempts = attempts + 1, last_error = ? WHERE id = ?",
+                [(str(error), i) for i in ids],
+            )
+
+    def dead_letter(self, ids, error):
+        """Move batches Sheets will never accept out of the queue."""
+        with self._connect() as db:
+            for i in ids:
+                db.execute(
+                    "INSERT INTO replication_dead"
+                    " (id, spreadsheet_id, requests, attempts, last_error, created, failed_at)"
+                    " SELECT id, spreadsheet_id, requests, attempts + 1, ?, created, ?"
+                    " FROM replication WHERE id = ?",
+                    (str(error), time.time(), i),
+                )
+                db.execute("DELETE FROM replication WHERE id = ?", (i,))
+
+    def dead(self):
+        """Number of dead-lettered batches (local rows missing from Sheets)."""
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM replication_dead").fetchone()[0]
+
+    def failing(self, min_attempts=5):
+        """(count, last error) of queued batches that failed ``min_attempts`` times."""
+        with self._connect() as db:
+            count, last_error = db.execute(
+                "SELECT COUNT(*), MAX(last_error) FROM replication WHERE attempts >= ?",
+                (min_attempts,),
+            ).fetchone()
+        return count, last_error
+
+
+class Replicator:
+    """Daemon thread pushing the replication queue to Google Sheets.
+
+    Queued batches of the same spreadsheet are merged (in order) into one
+    batchUpdate. A spreadsheet whose push fails is paused with jittered
+    exponential backoff while the others keep replicating. When Sheets
+    rejects a merged push outright, its batches are resent one at a time
+    and the one that is rejected again is dead-lettered.
+    ``resolve(spreadsheet_id)`` returns the gspread Spreadsheet.
+
+    The tabs a push writes to are reconciled with Sheets first, and every
+    tab is every ``pull_interval`` seconds, so rows added there by hand
+    reach the store (and the app) instead of being overwritten.
+    """
+
+    def __init__(self, store, resolve, interval=2.0, max_requests=500,
+                 base_delay=5.0, max_delay=600.0, pull_interval=60.0):
+        self.store = store
+        self._resolve = resolve
+        self.interval = interval
+        self.max_requests = max_requests
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.pull_interval = pull_interval
+        self._pulled_at = None
+        self._backoff = {}  # spreadsheet_id -> (failures, retry_at)
+        self._grid = {}  # spreadsheet_id -> {sheet_id: row count}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sheets-replicator", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _grow(self, spreadsheet_id, spreadsheet, requests):
+        """appendDimension requests so every updateCells fits its sheet's grid.
+
+        Grid sizes are read once (one metadata call) and then tracked; an
+        appendDimension that is replayed only adds empty rows at the bottom.
+        """
+        need = {}
+        for request in requests:
+            rng = request.get("updateCells", {}).get("range")
+            if rng is not None:
+                need[rng["sheetId"]] = max(need.get(rng["sheetId"], 0), rng["endRowIndex"])
+        grid = self._grid.get(spreadsheet_id, {})
+        if any(rows > grid.get(sheet_id, 0) for sheet_id, rows in need.items()):
+            metadata = spreadsheet.fetch_sheet_metadata()
+            grid = {
+                sheet["properties"]["sheetId"]: sheet["properties"]["gridProperties"]["rowCount"]
+                for sheet in metadata.get("sheets", [])
+            }
+            self._grid[spreadsheet_id] = grid
+        grow = []
+        for sheet_id, rows in need.items():
+            # A sheet missing from the metadata (deleted tab) is left to fail
+            if sheet_id in grid and rows > grid[sheet_id]:
+                length = rows - grid[sheet_id] + GRID_SLACK
+                grow.append({"appendDimension": {
+                    "sheetId": sheet_id, "dimension": "ROWS", "length": length,
+                }})
+        return grow
+
+    def _reconcile(self, spreadsheet, tabs):
+        """Bring rows changed by hand in Sheets into the store.
+
+        ``tabs`` are LocalStore.remote_tabs entries. Their replicated tails
+        (and whatever is below them) are read in one batchGet; new rows at
+        the bottom are merged, and tabs whose tail no longer matches are
+        read in full (one more batchGet) and reseeded. A tab Sheets refuses
+        to read (e.g. deleted) is skipped, leaving its writes to fail.
+        """
+        if not tabs:
+            return
+        names = ["'" + tab[0].replace("'", "''") + "'" for tab in tabs]
+        ranges = [name if count is None else f"{name}!{tail_range(count, width)}"
+                  for name, (_, _, count, _, width) in zip(names, tabs)]
+        try:
+            value_ranges = spreadsheet.values_batch_get(ranges).get("valueRanges", [])
+        except Exception as e:
+            if not is_permanent(e) or len(tabs) == 1:
+                raise
+            for tab in tabs:
+                try:
+                    self._reconcile(spreadsheet, [tab])
+                except Exception as tab_error:
+                    if not is_permanent(tab_error):
+                        raise
+                    print(f"❌ Cannot read '{tab[0]}' to reconcile it: {tab_error}")
+            return
+
+        full = []
+        for tab, value_range in zip(tabs, value_ranges):
+            title, _, count, checksum, _ = tab
+            fetched = value_range.get("values", [])
+            if count is None:
+                self.store.reseed(title, fetched, (count, checksum))
+                continue
+            rows = split_delta(fetched, count, checksum)
+            if rows is None:
+                full.append(tab)
+            elif rows:
+                seen = fetched[:min(TAIL_ROWS, count)] + rows
+                remote = (count + len(rows), tail_checksum(seen[-TAIL_ROWS:]))
+                self.store.merge_remote(title, (count, checksum), rows, remote)
+        if full:
+            names = ["'" + tab[0].replace("'", "''") + "'" for tab in full]
+            response = spreadsheet.values_batch_get(names)
+            for (title, _, count, checksum, _), value_range in zip(full, response.get("valueRanges", [])):
+                self.store.reseed(title, value_range.get("values", []), (count, checksum))
+
+    def _send(self, spreadsheet_id, requests):
+        spreadsheet = self._resolve(spreadsheet_id)
+        grow = self._grow(spreadsheet_id, spreadsheet, requests)
+        spreadsheet.batch_update({"requests": grow + requests})
+        grid = self._grid.setdefault(spreadsheet_id, {})
+        for request in grow:
+            spec = request["appendDimension"]
+            grid[spec["sheetId"]] = grid.get(spec["sheetId"], 0) + spec["length"]
+
+    def _fail(self, spreadsheet_id, ids, error, now):
+        print(f"❌ Replication error ({spreadsheet_id}): {error}")
+        self.store.mark_failed(ids, error)
+        failures, _ = self._backoff.get(spreadsheet_id, (0, 0))
+        delay = min(self.base_delay * 2 ** failures, self.max_delay)
+        self._backoff[spreadsheet_id] = (failures + 1, now + delay * random.uniform(0.5, 1.0))
+        # Grid sizes may be what went wrong; read them again next time
+        self._grid.pop(spreadsheet_id, None)
+
+    def _due(self, spreadsheet_id, now):
+        _, retry_at = self._backoff.get(spreadsheet_id, (0, 0))
+        return now >= retry_at
+
+    def replicate(self):
+        """Reconcile, then push what is queued; returns the number of batchUpdates."""
+        now = time.monotonic()
+        written = {}  # spreadsheet_id -> sheet ids the queued requests write to
+        for _, spreadsheet_id, requests, _ in self.store.queued():
+            sheet_ids = written.setdefault(spreadsheet_id, set())
+            for request in json.loads(requests):
+                sheet_ids.add(request.get("updateCells", {}).get("range", {}).get("sheetId"))
+        pull = self._pulled_at is None or now - self._pulled_at >= self.pull_interval
+        targets = set(written) | (self.store.spreadsheets() if pull else set())
+        for spreadsheet_id in targets:
+            if not self._due(spreadsheet_id, now):
+                continue
+            tabs = self.store.remote_tabs(spreadsheet_id)
+            if not pull:
+                tabs = [tab for tab in tabs if tab[1] in written[spreadsheet_id]]
+            try:
+                self._reconcile(self._resolve(spreadsheet_id), tabs)
+            except Exception as e:
+                if is_permanent(e):
+                    # Its writes will be refused too, and dead-lettered below
+                    print(f"❌ Cannot reconcile {spreadsheet_id}: {e}")
+                    continue
+                # Not knowing what Sheets holds, nothing is written blind
+                ids = [i for i, sid, _, _ in self.store.queued() if sid == spreadsheet_id]
+                self._fail(spreadsheet_id, ids, e, now)
+        if pull:
+            self._pulled_at = now
+
+        groups = {}
+        for entry_id, spreadsheet_id, requests, _ in self.store.queued():
+            entries = groups.setdefault(spreadsheet_id, [])
+            if entries and sum(len(r) for _, r in entries) >= self.max_requests:
+                continue
+            entries.append((entry_id, json.loads(requests)))
+
+        calls = 0
+        for spreadsheet_id, entries in groups.items():
+            if not self._due(spreadsheet_id, now):
+                continue
+            ids = [entry_id for entry_id, _ in entries]
+            try:
+                self._send(spreadsheet_id, [r for _, requests in entries for r in requests])
+            except Exception as e:
+                if not is_permanent(e):
+                    self._fail(spreadsheet_id, ids, e, now)
+                    continue
+                calls += self._isolate(spreadsheet_id, entries, now)
+                continue
+            calls += 1
+            self.store.mark_sent(ids)
+            self._backoff.pop(spreadsheet_id, None)
+        return calls
+
+    def _isolate(self, spreadsheet_id, entries, now):
+        """Resend ``entries`` one by one, dead-lettering the rejected ones."""
+        calls = 0
+        for n, (entry_id, requests) in enumerate(entries):
+            try:
+                self._send(spreadsheet_id, requests)
+            except Exception as e:
+                if not is_permanent(e):
+                    self._fail(spreadsheet_id, [i for i, _ in entries[n:]], e, now)
+                    return calls
+                print(f"❌ Replication batch {entry_id} rejected, moved to replication_dead: {e}")
+                self.store.dead_letter([entry_id], e)
+                continue
+            calls += 1
+            self.store.mark_sent([entry_id])
+        self._backoff.pop(spreadsheet_id, None)
+        return calls
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.replicate()
+            except Exception as e:
+                print(f"❌ Replicator error: {e}")
+
+    def close(self, timeout=15):
+        """Stop the thread after one last push; the rest stays queued on disk."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        try:
+            self.replicate()
+        except Exception as e:
+            print(f"❌ Replicator error: {e}")
@@ -0,0 +1,79 @@
+"""Cross-warehouse stock summary built from the cached tab snapshots.
+
+Stock tabs ("Penambahan ...") are summed per item and Kondisi into one
+column per tab plus a total; usage tabs ("Penggunaan ...") add the amounts
+already used or sent. The result is cached and rebuilt only when one of
+the underlying snapshots changes.
+"""
+import threading
+
+import pandas as pd
+
+from inventaris.frames import NAMA_NORM, frame_from_values, name_column
+
+TOTAL_STOCK = "Total Stok"
+TOTAL_USED = "Total Digunakan"
+
+
+def _tab_frame(label, values, headers):
+    df = frame_from_values(values, headers)
+    return pd.DataFrame({
+        NAMA_NORM: df[NAMA_NORM].str.strip(),
+        "Nama Barang": df[name_column(headers)].astype(str).str.strip(),
+        "Kondisi": df["Kondisi"].astype(str),
+        "Gudang": label,
+        "Jumlah": pd.to_numeric(df["Jumlah"], errors="coerce").fillna(0).astype(int),
+    })
+
+
+def stock_summary(stock_tabs, usage_tabs):
+    """Aggregate tabs given as lists of (label, values, headers).
+
+    Returns one row per (Nama Barang, Kondisi) with a column per tab,
+    ``Total Stok`` (sum of stock tabs) and ``Total Digunakan``.
+    """
+    parts = [_tab_frame(*tab) for tab in list(stock_tabs) + list(usage_tabs)]
+    stock_labels = [tab[0] for tab in stock_tabs]
+    usage_labels = [tab[0] for tab in usage_tabs]
+    columns = ["Nama Barang", "Kondisi"] + stock_labels + [TOTAL_STOCK] + usage_labels + [TOTAL_USED]
+
+    rows = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+    rows = rows[rows[NAMA_NORM] != ""] if not rows.empty else rows
+    if rows.empty:
+        return pd.DataFrame(columns=columns)
+
+    pivot = rows.pivot_table(
+        index=[NAMA_NORM, "Kondisi"], columns="Gudang", values="Jumlah",
+        aggfunc="sum", fill_value=0, observed=True,
+    )
+    pivot = pivot.reindex(columns=stock_labels + usage_labels, fill_value=0)
+    pivot[TOTAL_STOCK] = pivot[stock_labels].sum(axis=1)
+    pivot[TOTAL_USED] = pivot[usage_labels].sum(axis=1)
+
+    # Show each item under the first spelling we saw for it
+    names = rows.groupby(NAMA_NORM, sort=False)["Nama Barang"].first()
+    pivot = pivot.reset_index()
+    pivot["Nama Barang"] = pivot[NAMA_NORM].map(names)
+    return pivot[columns].sort_values(["Nama Barang", "Kondisi"], ignore_index=True)
+
+
+class SummaryCache:
+    """Remembers the last summary and the snapshots it was computed from."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sources = None
+        self._summary = None
+
+    def get(self, stock_tabs, usage_tabs):
+        # Keep the value lists themselves: identity changes on every write
+        sources = [tab[1] for tab in list(stock_tabs) + list(usage_tabs)]
+        with self._lock:
+            if self._sources is not None and len(sources) == len(self._sources) and all(
+                a is b for a, b in zip(sources, self._sources)
+            ):
+                return self._summary
+        summary = stock_summary(stock_tabs, usage_tabs)
+        with self._lock:
+            self._sources, self._summary = sources, summary
+        return summary
@@ -0,0 +1,80 @@
+"""Incremental (delta) refresh of cached worksheet values.
+
+Our sheets are mostly append-only, so a stale snapshot is refreshed by
+reading just its last few rows plus whatever comes after them in one open
+range (``A{n-k+1}:J``). The cursor is (row count, checksum of the tail
+rows): if the re-read tail still matches, only the new rows are appended
+to the snapshot; if it does not (an in-place edit or a ``delete_rows``
+shift), the caller falls back to a full reload.
+"""
+import hashlib
+import json
+
+TAIL_ROWS = 3
+
+
+def col_letter(n):
+    """1 -> A, 10 -> J, 27 -> AA."""
+    letters = ""
+    while n:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _trim(row):
+    # The API drops trailing empty cells, get_all_values() pads them back
+    row = [str(c) for c in row]
+    while row and row[-1] == "":
+        row.pop()
+    return row
+
+
+def tail_checksum(rows):
+    digest = hashlib.blake2b(digest_size=16)
+    for row in rows:
+        digest.update(json.dumps(_trim(row)).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def cursor(values, tail=TAIL_ROWS):
+    """(row count, tail checksum) describing a snapshot."""
+    return len(values), tail_checksum(values[-tail:])
+
+
+def tail_range(count, width, tail=TAIL_ROWS):
+    """A1 range of the last ``tail`` of ``count`` rows and every row after them."""
+    return f"A{count - min(tail, count) + 1}:{col_letter(max(width, 1))}"
+
+
+def split_delta(fetched, count, checksum, tail=TAIL_ROWS):
+    """Rows past the cursor (``count``, ``checksum``) in a ``tail_range`` read.
+
+    None if the re-read tail no longer hashes to ``checksum``. Blank rows
+    at the bottom (cleared, not added) are not counted as new.
+    """
+    fetched = [list(r) for r in fetched]
+    while fetched and not _trim(fetched[-1]):
+        fetched.pop()
+    overlap = min(tail, count)
+    head, new_rows = fetched[:overlap], fetched[overlap:]
+    if len(head) < overlap or tail_checksum(head) != checksum:
+        return None
+    return new_rows
+
+
+def fetch_delta(ws, values, tail=TAIL_ROWS):
+    """Rows appended to ``ws`` since ``values`` was taken, or None.
+
+    None means the tail no longer matches and the snapshot must be reloaded
+    in full. Costs a single range read of ``tail`` + new rows.
+    """
+    count = len(values)
+    if count < 2:
+        return None
+    width = max(len(r) for r in [values[0]] + values[-tail:]) or 1
+    new_rows = split_delta(ws.get(tail_range(count, width, tail)), *cursor(values, tail), tail=tail)
+    if new_rows is None:
+        return None
+    return [r + [""] * (width - len(r)) for r in new_rows]
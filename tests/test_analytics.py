@@ -0,0 +1,93 @@
+"""LogAnalytics usage cube: stock-out rows, incremental months, frozen months."""
+from datetime import datetime
+
+import pytest
+
+from benchmarks.fakes import FakeAPI, FakeSpreadsheet
+from benchmarks.run import SOURCE_FLOOR, Fixture
+from inventaris.analytics import LogAnalytics, usage_cells
+from inventaris.batch import SheetBatch
+from inventaris.cache import SnapshotCache
+from inventaris.core import LOG_HEADERS, USED_LOCATION, USED_SHEET, log_sheet_name
+from inventaris.store import LocalStore
+
+NOW = datetime(2025, 3, 15)
+
+
+def _log(*entries):
+    """Log tab values from (nama, tempat, jumlah, petugas) entries."""
+    return [LOG_HEADERS] + [
+        [str(n), "K", nama, "2025-01-01 10:00:00", "2023", tempat, str(jumlah), "Baik", petugas, ""]
+        for n, (nama, tempat, jumlah, petugas) in enumerate(entries, start=1)
+    ]
+
+
+def _totals(analytics):
+    return {r["Nama Barang"]: r["Jumlah"] for r in analytics.by_item()}
+
+
+@pytest.fixture
+def analytics(tmp_path):
+    return LogAnalytics(str(tmp_path / "analytics.sqlite3"))
+
+
+def test_usage_cells_counts_stock_outs_only():
+    values = _log(("Kabel", USED_LOCATION, 3, " ani "), ("Kabel", "Gudang A", 9, "ani"),
+                  ("", USED_LOCATION, 1, "ani"))
+    assert usage_cells(values) == [("kabel", "Kabel", "Ani", 3)]
+
+
+def test_sync_current_adds_only_new_rows(analytics):
+    values = _log(("Kabel", USED_LOCATION, 3, "ani"))
+    analytics.sync_current("2025_03", values)
+    values = values + _log(("Pompa", USED_LOCATION, 2, "budi"))[1:]
+    analytics.sync_current("2025_03", values)
+    assert _totals(analytics) == {"Kabel": 3, "Pompa": 2}
+
+    # A shorter tab (rows deleted by hand) rebuilds the month
+    analytics.sync_current("2025_03", values[:1] + values[2:])
+    assert _totals(analytics) == {"Pompa": 2}
+
+
+def test_closed_months_are_frozen_once(tmp_path):
+    spreadsheet = FakeSpreadsheet(FakeAPI(), "log")
+    spreadsheet.add_worksheet("Log_2025_01", values=_log(("Kabel", USED_LOCATION, 3, "ani")))
+    spreadsheet.add_worksheet("Log_2025_03", values=_log())
+    analytics = LogAnalytics(str(tmp_path / "analytics.sqlite3"))
+
+    analytics.sync(spreadsheet, _log(), now=NOW)
+    analytics.sync(spreadsheet, _log(), now=NOW)
+
+    assert spreadsheet.api.calls["values_batch_get"] == 1
+    assert analytics.frozen_months() == {"2025_01"}
+    assert _totals(analytics) == {"Kabel": 3}
+
+
+def test_closed_month_is_read_from_the_store(tmp_path):
+    spreadsheet = FakeSpreadsheet(FakeAPI(), "log")
+    closed = spreadsheet.add_worksheet("Log_2025_02", values=_log(("Kabel", USED_LOCATION, 3, "ani")))
+    store = LocalStore(str(tmp_path / "store.sqlite3"))
+    store.seed(closed, closed.get_all_values())
+    # Written at rollover while Sheets was unreachable: only the store has it
+    batch = SheetBatch(cache=SnapshotCache(ttl=3600, store=store))
+    batch.append_row(closed, ["2", "K", "Pompa", "2025-02-28 23:59:00", "2023",
+                              USED_LOCATION, 4, "Baik", "ani", ""])
+    batch.commit()
+    analytics = LogAnalytics(str(tmp_path / "analytics.sqlite3"), store=store)
+
+    analytics.sync(spreadsheet, _log(), now=NOW)
+
+    assert spreadsheet.api.calls["values_batch_get"] == 0
+    assert _totals(analytics) == {"Kabel": 3, "Pompa": 4}
+
+
+def test_only_transfers_to_the_used_sheet_count_as_usage(tmp_path):
+    fx = Fixture(5, store_dir=str(tmp_path))
+    fx.warm()
+    kondisi = fx.source.rows[2][7]
+    fx.inventory.write_log(dict(zip(fx.source.rows[0], fx.source.rows[2])), "TAMBAH", 4, "ani")
+    fx.inventory.transfer_item(SOURCE_FLOOR, USED_SHEET, "Barang 2", kondisi, 3, "ani")
+
+    values = fx.snapshots.get_values(fx.log_spreadsheet.worksheet(log_sheet_name()))
+    assert [r[6] for r in values[1:]] == ["0", "4", "3"]
+    assert usage_cells(values) == [("barang 2", "Barang 2", "Ani", 3)]
@@ -0,0 +1,80 @@
+"""Bulk import: validating uploaded rows and merging them into existing keys."""
+from datetime import datetime
+
+from inventaris import bulk
+from inventaris.core import HEADERS
+
+KONDISI = ["Baik", "Rusak", "Perlu Perbaikan"]
+
+
+def _record(**overrides):
+    record = {"nama barang": "Kursi", "Tanggal Masuk": "2025-01-02", "JUMLAH": "3",
+              "kondisi": "baik", "Petugas": "ani", "Catatan": "ignored"}
+    record.update(overrides)
+    return record
+
+
+def test_validate_maps_columns_and_normalises_values():
+    items, errors = bulk.validate([
+        _record(),
+        _record(**{"Tanggal Masuk": "05/02/2025", "JUMLAH": "2.0", "kondisi": "PERLU PERBAIKAN"}),
+        _record(**{"Tanggal Masuk": datetime(2025, 3, 4, 10, 30)}),
+    ], HEADERS, KONDISI)
+    assert errors == []
+    assert [(i["Tanggal Masuk"], i["Jumlah"], i["Kondisi"], i["line"]) for i in items] == [
+        ("2025-01-02", 3, "Baik", 2),
+        ("2025-02-05", 2, "Perlu Perbaikan", 3),
+        ("2025-03-04", 3, "Baik", 4),
+    ]
+    assert items[0]["Tempat Penyimpanan"] == ""
+    assert "No" not in items[0] and "Catatan" not in items[0]
+
+
+def test_validate_reports_each_bad_line():
+    items, errors = bulk.validate([
+        _record(),
+        _record(**{"Petugas": " ", "JUMLAH": "nan"}),
+        _record(**{"Tanggal Masuk": "2 Januari"}),
+        _record(**{"JUMLAH": "1.5"}),
+        _record(**{"JUMLAH": "0"}),
+        _record(**{"kondisi": "Hilang"}),
+    ], HEADERS, KONDISI)
+    assert [i["line"] for i in items] == [2]
+    assert [line for line, _ in errors] == [3, 4, 5, 6, 7]
+    assert errors[0][1] == "Jumlah kosong; Petugas kosong"
+    assert "format tanggal" in errors[1][1]
+    assert "Kondisi tidak valid" in errors[4][1]
+
+
+def test_validate_rejects_a_file_without_required_columns():
+    record = _record()
+    del record["Petugas"]
+    assert bulk.validate([record], HEADERS, KONDISI) == ([], [(0, "Kolom wajib tidak ada: Petugas")])
+    assert bulk.validate([], HEADERS, KONDISI) == ([], [])
+
+
+def _item(nama, jumlah, kondisi="Baik", tanggal="2025-01-02"):
+    return {"Nama Barang": nama, "Tanggal Masuk": tanggal, "Jumlah": jumlah, "Kondisi": kondisi}
+
+
+def test_merge_folds_duplicates_into_existing_rows_and_new_appends():
+    existing = {("kursi", "2025-01-02", "Baik"): 7}
+    quantities = {7: 10}
+    updates, appends = bulk.merge([
+        _item("Kursi", 2),
+        _item("Meja", 1),
+        _item("KURSI", 3),
+        _item("Meja", 4),
+        _item("Meja", 5, kondisi="Rusak"),
+    ], lambda *key: existing.get(key), quantities.__getitem__)
+    assert {row: qty for row, (qty, _) in updates.items()} == {7: 15}
+    assert [(a["Nama Barang"], a["Kondisi"], a["Jumlah"]) for a in appends] == [
+        ("Meja", "Baik", 5),
+        ("Meja", "Rusak", 5),
+    ]
+
+
+def test_merge_does_not_modify_the_validated_items():
+    items = [_item("Meja", 1), _item("Meja", 2)]
+    bulk.merge(items, lambda *key: None, None)
+    assert [i["Jumlah"] for i in items] == [1, 2]
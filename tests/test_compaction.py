@@ -0,0 +1,82 @@
+"""Tombstones: lookups that skip them, compaction, and writes that looked up their row before it."""
+from datetime import datetime
+
+import pytest
+
+from benchmarks.run import SOURCE_FLOOR, SOURCE_SHEET, Fixture, stock_rows
+from inventaris.cache import SnapshotCache
+from inventaris.compaction import CompactionScheduler, compact, tombstone_rows
+from inventaris.core import USED_SHEET, Inventory
+from inventaris.index import RowIndex
+from inventaris.sequence import SequenceAllocator
+
+
+@pytest.fixture
+def fx(tmp_path):
+    fx = Fixture(10, store_dir=str(tmp_path))
+    fx.source.rows[1][6] = "5"  # Barang 1: runs out below
+    fx.warm()
+    return fx
+
+
+def _take(inventory, nama, jumlah, fx):
+    kondisi = next(r[7] for r in fx.snapshots.store.values(SOURCE_SHEET) if r[2] == nama)
+    inventory.transfer_item(SOURCE_FLOOR, USED_SHEET, nama, kondisi, jumlah, "ani")
+
+
+def _stock(fx):
+    return {r[2]: r[6] for r in fx.snapshots.store.values(SOURCE_SHEET)[1:]}
+
+
+def test_find_prefers_live_rows():
+    header = stock_rows(0)[0]
+    live = ["2", "K", "Pena", "2024-01-01", "2024", "G", "3", "Baik", "ani", ""]
+    dead = ["1", "K", "Pena", "2024-01-01", "2024", "G", "0", "Baik", "ani", "HABIS"]
+    index = RowIndex([header, dead, live])
+    assert index.find("pena", "2024-01-01", "Baik") == 3
+    assert index.find_first("Pena", "Baik") == 3
+
+    index = RowIndex([header, dead])
+    assert index.find("Pena", "2024-01-01", "Baik") == 2  # revived on restock
+    assert index.find_first("Pena", "Baik") is None
+
+
+def test_compact_removes_only_tombstones(fx):
+    _take(fx.inventory, "Barang 1", 5, fx)
+    values = fx.snapshots.get_values(fx.source)
+    assert tombstone_rows(values) == [2]
+
+    assert compact(fx.source, fx.snapshots) == 1
+    assert compact(fx.source, fx.snapshots) == 0
+    names = [r[2] for r in fx.snapshots.get_values(fx.source)[1:]]
+    assert names == [f"Barang {n}" for n in range(2, 11)]
+
+
+def test_adjust_looked_up_before_compaction_is_refused(fx):
+    _take(fx.inventory, "Barang 1", 5, fx)
+    # Another session finds Barang 3 at row 4, then compaction moves it to row 3
+    snapshots = SnapshotCache(ttl=3600, store=fx.snapshots.store)
+    other = Inventory(snapshots, SequenceAllocator(ttl=3600, peek=snapshots.peek),
+                      {SOURCE_FLOOR: SOURCE_SHEET}, worksheet=fx.inventory.worksheet,
+                      log_worksheet=fx.inventory.log_worksheet)
+    assert snapshots.find_row(fx.source, "Barang 3", fx.source.rows[3][3], fx.source.rows[3][7])[1] == 4
+    compact(fx.source, fx.snapshots)
+    before = _stock(fx)
+
+    with pytest.raises(ValueError, match="sudah berubah"):
+        _take(other, "Barang 3", 1, fx)
+    assert _stock(fx) == before
+
+    # The refused session dropped its snapshot: trying again hits the right row
+    _take(other, "Barang 3", 1, fx)
+    assert _stock(fx) == dict(before, **{"Barang 3": str(10 ** 6 - 1)})
+
+
+def test_scheduler_runs_once_a_day_in_its_hour():
+    runs = []
+    scheduler = CompactionScheduler(lambda: runs.append(1) or len(runs), hour=2, interval=3600)
+    scheduler.close()
+    assert scheduler.run_once(datetime(2025, 3, 1, 1, 59)) is None
+    assert scheduler.run_once(datetime(2025, 3, 1, 2, 5)) == 1
+    assert scheduler.run_once(datetime(2025, 3, 1, 2, 40)) is None
+    assert scheduler.run_once(datetime(2025, 3, 2, 2, 0)) == 2
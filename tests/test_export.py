@@ -0,0 +1,65 @@
+"""Chunked CSV / Parquet export."""
+import csv
+import io
+
+import pytest
+
+from inventaris import export
+
+HEADERS = ["No", "Nama Barang", "Jumlah", "Kondisi"]
+ROWS = [
+    ["1", "Kursi", "3", "Baik"],
+    [2, "Meja", 4.0, None],
+    ["3", "Lemari", "", "Rusak", "extra cell"],
+    ["", "Rak", "2,0"],
+    ["x", "Papan", "n/a", "Baik"],
+]
+
+
+def test_typed_rows_fit_headers_and_coerce_int_columns():
+    assert list(export.typed_rows(ROWS, HEADERS)) == [
+        [1, "Kursi", 3, "Baik"],
+        [2, "Meja", 4, ""],
+        [3, "Lemari", None, "Rusak"],
+        [None, "Rak", 2, ""],
+        [None, "Papan", None, "Baik"],
+    ]
+
+
+def test_chunks_are_at_most_chunk_size():
+    assert [len(c) for c in export.chunks(iter(ROWS), HEADERS, chunk_size=2)] == [2, 2, 1]
+    assert list(export.chunks([], HEADERS)) == []
+
+
+def test_write_csv_streams_every_chunk():
+    out = io.BytesIO()
+    assert export.write_csv(iter(ROWS), HEADERS, out, chunk_size=2) == 5
+    assert not out.closed
+    lines = list(csv.reader(io.StringIO(out.getvalue().decode("utf-8"))))
+    assert lines[0] == HEADERS
+    assert lines[3] == ["3", "Lemari", "", "Rusak"]
+    assert len(lines) == 6
+
+
+def test_write_parquet_keeps_types_and_one_row_group_per_chunk():
+    pq = pytest.importorskip("pyarrow.parquet")
+    out = io.BytesIO()
+    assert export.write("Parquet", iter(ROWS), HEADERS, out, chunk_size=2) == 5
+    parquet = pq.ParquetFile(io.BytesIO(out.getvalue()))
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert [str(field.type) for field in table.schema] == ["int64", "string", "int64", "string"]
+    assert table.column("Jumlah").to_pylist() == [3, 4, None, 2, None]
+    assert table.column("Nama Barang").to_pylist() == ["Kursi", "Meja", "Lemari", "Rak", "Papan"]
+
+
+def test_parquet_is_offered_only_with_pyarrow(monkeypatch):
+    monkeypatch.setattr(export, "PARQUET", False)
+    assert export.available_formats() == ["CSV"]
+    with pytest.raises(RuntimeError):
+        export.write_parquet(ROWS, HEADERS, io.BytesIO())
+
+
+def test_records_rows_follow_header_order():
+    records = [{"Kondisi": "Baik", "Nama Barang": "Kursi"}]
+    assert list(export.records_rows(records, HEADERS)) == [["", "Kursi", "", "Baik"]]
@@ -0,0 +1,79 @@
+"""RowIndex kept up to date by SnapshotCache patches vs. one built from scratch."""
+import pytest
+
+from benchmarks.fakes import FakeAPI, FakeSpreadsheet
+from benchmarks.run import stock_rows
+from inventaris.batch import SheetBatch
+from inventaris.cache import SnapshotCache
+from inventaris.index import RowIndex, restore_note, tombstone_note
+
+
+def _state(index):
+    return index._rows, index._dead
+
+
+def _patched_index(cache, ws):
+    return cache.lookup(ws, lambda index: index)[1]
+
+
+def _assert_consistent(cache, ws):
+    values = ws.get_all_values()
+    assert cache.get_values(ws) == values
+    patched, fresh = _patched_index(cache, ws), RowIndex(values)
+    assert _state(patched) == _state(fresh)
+    for row in values[1:]:
+        nama, tanggal, kondisi = row[2], row[3], row[7]
+        assert patched.find(nama, tanggal, kondisi) == fresh.find(nama, tanggal, kondisi)
+        assert patched.find_first(nama, kondisi) == fresh.find_first(nama, kondisi)
+
+
+@pytest.fixture
+def setup():
+    spreadsheet = FakeSpreadsheet(FakeAPI(), "stock")
+    ws = spreadsheet.add_worksheet("Gudang", values=stock_rows(30))
+    cache = SnapshotCache(ttl=3600)
+    _patched_index(cache, ws)  # build the index before any write
+    return cache, ws
+
+
+def _commit(cache, fill):
+    batch = SheetBatch(cache=cache)
+    fill(batch)
+    batch.commit()
+
+
+def test_append(setup):
+    cache, ws = setup
+    row = ws.rows[4]
+    _commit(cache, lambda b: b.append_rows(ws, [
+        ["31", "K", "Barang Baru", "2025-01-01", "2024", "G", "1", "Baik", "ani", ""],
+        # Same key as an existing row: find keeps answering the first one
+        ["32", "K", row[2], row[3], "2024", "G", "1", row[7], "ani", ""],
+    ]))
+    _assert_consistent(cache, ws)
+
+
+def test_update_key_and_status_columns(setup):
+    cache, ws = setup
+    _commit(cache, lambda b: (
+        b.update_cell(ws, 5, 3, "Barang Ganti Nama"),
+        b.update_cell(ws, 6, 8, "Rusak"),
+        b.update_cells(ws, 7, 7, [0, "Baik", "ani", tombstone_note("catatan")]),
+    ))
+    _assert_consistent(cache, ws)
+    assert 7 in _patched_index(cache, ws)._dead
+
+    # Restocking the tombstone brings it back to life
+    _commit(cache, lambda b: b.update_cells(ws, 7, 7, [3, "Baik", "ani", restore_note(ws.rows[6][9])]))
+    _assert_consistent(cache, ws)
+    assert ws.rows[6][9] == "catatan"
+
+
+def test_delete_shifts_rows(setup):
+    cache, ws = setup
+    _commit(cache, lambda b: (b.update_cell(ws, 20, 7, 0), b.update_cell(ws, 20, 10, tombstone_note(""))))
+    _commit(cache, lambda b: b.delete_row(ws, 10))
+    _assert_consistent(cache, ws)
+    _commit(cache, lambda b: b.delete_row(ws, 2))
+    _assert_consistent(cache, ws)
+    assert _patched_index(cache, ws)._dead == {18}
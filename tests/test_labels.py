@@ -0,0 +1,72 @@
+"""QR label sheets: tile layout, text wrapping and page output."""
+import zipfile
+from io import BytesIO
+
+from PIL import Image
+
+from inventaris import labels
+
+# A small page keeps the rendering quick: 2 x 3 tiles of 200 x 100 px
+LAYOUT = dict(page_size=(420, 320), columns=2, rows_per_page=3, margin=10)
+
+
+def _rows(count):
+    return [(f"INV-2025-{n:04d}", f"Barang nomor {n}") for n in range(1, count + 1)]
+
+
+def test_tile_size_fills_the_page_inside_the_margins():
+    assert labels.tile_size((420, 320), columns=2, rows=3, margin=10) == (200, 100)
+    width, height = labels.tile_size()
+    assert width * labels.COLUMNS + 2 * labels.MARGIN <= labels.PAGE_SIZE[0]
+    assert height * labels.ROWS + 2 * labels.MARGIN <= labels.PAGE_SIZE[1]
+
+
+def test_wrap_keeps_lines_inside_the_width():
+    text = "Kursi lipat besi dengan sandaran dan bantalan busa warna hitam untuk ruang rapat"
+    lines = labels.wrap(text, 20, 150, max_lines=3)
+    assert len(lines) == 3
+    assert lines[-1].endswith("…")
+    assert all(labels.text_length(line, 20) <= 150 for line in lines)
+    assert labels.wrap("Meja", 20, 150, max_lines=3) == ["Meja"]
+    # A single word wider than the tile is cut, not left to overflow
+    assert labels.text_length(labels.wrap("X" * 80, 20, 150, max_lines=3)[0], 20) <= 150
+
+
+def test_qr_bitmap_is_square_and_one_bit():
+    image = labels.qr_bitmap("INV-2025-0001", 90)
+    assert image.mode == "1" and image.size == (90, 90)
+
+
+def test_pool_renders_the_same_tiles_in_order():
+    rows = _rows(labels.POOL_MIN)
+    size = (200, 100)
+    serial = [labels.render_tile(kode, nama, size) for kode, nama in rows]
+    assert list(labels.render_tiles(rows, size, workers=2)) == serial
+
+
+def test_pages_hold_columns_times_rows_tiles():
+    pages = list(labels.pages(_rows(7), **LAYOUT))
+    assert len(pages) == 2
+    assert all(page.mode == "1" and page.size == LAYOUT["page_size"] for page in pages)
+    # The second page has one tile in its top-left slot and nothing else
+    second = pages[1].convert("L")
+    assert second.crop((10, 10, 210, 110)).getextrema() == (0, 255)
+    assert second.crop((210, 0, 420, 320)).getextrema() == (255, 255)
+    assert second.crop((0, 110, 420, 320)).getextrema() == (255, 255)
+
+
+def test_write_pdf_and_png_zip():
+    out = BytesIO()
+    assert labels.write_pdf(_rows(7), out, **LAYOUT) == 2
+    assert out.getvalue().startswith(b"%PDF")
+
+    empty = BytesIO()
+    assert labels.write_pdf([], empty, **LAYOUT) == 0
+    assert empty.getvalue() == b""
+
+    out = BytesIO()
+    assert labels.write_png_zip(_rows(7), out, **LAYOUT) == 2
+    with zipfile.ZipFile(out) as archive:
+        assert archive.namelist() == ["label_001.png", "label_002.png"]
+        page = Image.open(BytesIO(archive.read("label_002.png")))
+        assert page.size == LAYOUT["page_size"]
@@ -0,0 +1,115 @@
+"""Outbox delivery and backoff against a local HTTP stub of the Apps Script."""
+import json
+import sqlite3
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from inventaris.outbox import Outbox
+
+
+class _Stub(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        if server.failures:
+            server.failures -= 1
+            self.send_response(503)
+        else:
+            server.received.append(body)
+            self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = HTTPServer(("127.0.0.1", 0), _Stub)
+    server.failures = 0
+    server.received = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def outbox(tmp_path, server):
+    url = f"http://127.0.0.1:{server.server_port}/exec"
+
+    def send(payloads):
+        # Same body shapes as app.core.send_gas_batch
+        body = payloads[0] if len(payloads) == 1 else {"events": payloads}
+        request = urllib.request.Request(url, data=json.dumps(body).encode())
+        urllib.request.urlopen(request, timeout=5).close()
+
+    outbox = Outbox(str(tmp_path / "outbox.sqlite3"), send, batch_size=2,
+                    interval=3600, base_delay=0.2, max_delay=1.0)
+    # Dispatch by hand below, not from the background thread
+    outbox.close()
+    return outbox
+
+
+def _attempts(outbox):
+    with sqlite3.connect(outbox.path) as db:
+        return db.execute("SELECT attempts, next_attempt FROM outbox ORDER BY id").fetchall()
+
+
+def test_delivers_in_batches(outbox, server):
+    for n in range(3):
+        outbox.put({"nama": f"Barang {n}"})
+
+    assert outbox.dispatch_due() == 3
+    assert outbox.pending() == 0
+    assert server.received == [
+        {"events": [{"nama": "Barang 0"}, {"nama": "Barang 1"}]},
+        {"nama": "Barang 2"},
+    ]
+
+
+def test_failed_batch_backs_off_then_retries(outbox, server):
+    server.failures = 1
+    outbox.put({"nama": "Barang"})
+
+    started = time.time()
+    assert outbox.dispatch_due() == 0
+    [(attempts, next_attempt)] = _attempts(outbox)
+    assert attempts == 1
+    # Jittered between half and all of base_delay
+    assert started + 0.1 <= next_attempt <= time.time() + 0.2
+
+    assert outbox.dispatch_due() == 0  # not due yet: the stub is not asked
+    assert server.received == [] and server.failures == 0
+
+    time.sleep(max(0.0, next_attempt - time.time()) + 0.01)
+    assert outbox.dispatch_due() == 1
+    assert outbox.pending() == 0
+    assert server.received == [{"nama": "Barang"}]
+
+
+def test_backoff_grows_and_is_capped(outbox):
+    delays = [[outbox._backoff(attempts) for _ in range(50)] for attempts in (1, 2, 3, 10)]
+    assert all(0.1 <= d <= 0.2 for d in delays[0])
+    assert all(0.2 <= d <= 0.4 for d in delays[1])
+    assert all(0.4 <= d <= 0.8 for d in delays[2])
+    assert all(0.5 <= d <= 1.0 for d in delays[3])
+
+
+def test_undelivered_entries_survive_a_restart(outbox, server):
+    server.failures = 1
+    outbox.put({"nama": "Barang"})
+    outbox.dispatch_due()
+
+    reopened = Outbox(outbox.path, outbox._send, interval=3600, base_delay=0.0)
+    reopened.close()
+    with sqlite3.connect(outbox.path) as db:
+        db.execute("UPDATE outbox SET next_attempt = 0")
+    assert reopened.pending() == 1
+    assert reopened.dispatch_due() == 1
+    assert server.received == [{"nama": "Barang"}]
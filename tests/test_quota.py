@@ -0,0 +1,56 @@
+"""QuotaClient retry policy: reads retry transient errors, writes only 429."""
+import pytest
+
+from benchmarks.fakes import FakeAPIError
+from inventaris.quota import QuotaClient
+
+
+def _flaky(*errors):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+    return fn, calls
+
+
+@pytest.fixture
+def quota():
+    return QuotaClient(base_delay=0.0, max_retries=3)
+
+
+def test_read_retries_transient_errors(quota):
+    fn, calls = _flaky(FakeAPIError(503), FakeAPIError(429))
+    assert quota.call("read", fn) == "ok"
+    assert len(calls) == 3
+    assert quota.throttled == 1
+
+
+@pytest.mark.parametrize("error", [FakeAPIError(500), FakeAPIError(503), TimeoutError()])
+def test_write_is_not_retried_when_it_may_have_landed(quota, error):
+    fn, calls = _flaky(error)
+    with pytest.raises(type(error)):
+        quota.call("write", fn)
+    assert len(calls) == 1
+
+
+def test_write_is_retried_after_429(quota):
+    fn, calls = _flaky(FakeAPIError(429), FakeAPIError(429))
+    assert quota.call("write", fn) == "ok"
+    assert len(calls) == 3
+
+
+def test_permanent_errors_are_not_retried(quota):
+    fn, calls = _flaky(FakeAPIError(400))
+    with pytest.raises(FakeAPIError):
+        quota.call("read", fn)
+    assert len(calls) == 1
+
+
+def test_gives_up_after_max_retries(quota):
+    fn, calls = _flaky(*[FakeAPIError(429)] * 10)
+    with pytest.raises(FakeAPIError):
+        quota.call("write", fn)
+    assert len(calls) == quota.max_retries + 1
@@ -0,0 +1,107 @@
+"""NameIndex search results and the version-keyed NameIndexCache."""
+import random
+
+import pytest
+
+from benchmarks.fakes import FakeAPI, FakeSpreadsheet
+from benchmarks.run import stock_rows
+from inventaris.batch import SheetBatch
+from inventaris.cache import SnapshotCache
+from inventaris.core import HEADERS
+from inventaris.search import NameIndex, NameIndexCache, trigrams
+
+WORDS = ["kabel", "sensor", "filter", "pompa", "baterai", "monitor", "udara", "printer",
+         "tinta", "lampu", "saklar", "selang", "obeng", "kunci", "panel", "surya"]
+
+
+def _rows(names, qty=1, kondisi="Baik"):
+    return [HEADERS] + [
+        [str(n), "K", nama, "2024-01-01", "2023", "G", str(qty), kondisi, "ani", ""]
+        for n, nama in enumerate(names, start=1)
+    ]
+
+
+def _score(query, key):
+    grams, other = trigrams(query), trigrams(key)
+    shared = len(grams & other)
+    return round(shared / (len(grams) + len(other) - shared), 9)
+
+
+def _brute_force(keys, query, limit):
+    """Best scores over every name sharing at least half the query's trigrams."""
+    floor = max(1, len(trigrams(query)) // 2)
+    scores = [_score(query, k) for k in keys if len(trigrams(query) & trigrams(k)) >= floor]
+    return sorted(scores, reverse=True)[:limit]
+
+
+def test_prefix_hits_come_first():
+    index = NameIndex(_rows(["Kabel LAN", "Kabel Power", "Label Kabel", "Pompa"]))
+    assert index.search("kabel") == ["Kabel LAN", "Kabel Power", "Label Kabel"]
+    assert index.search("pmpa") == ["Pompa"]
+    assert index.search("xyz") == []
+
+
+def test_fuzzy_ranking_matches_brute_force():
+    rng = random.Random(7)
+    names = {" ".join(rng.sample(WORDS, 2)) + f" {rng.randint(1, 500)}" for _ in range(3000)}
+    index = NameIndex(_rows(sorted(names)))
+    keys = index._sorted
+    for _ in range(100):
+        key = rng.choice(keys)
+        cut = rng.randrange(len(key))
+        query = (key[:cut] + key[cut + 1:])[:rng.randint(4, len(key))].strip()
+        found = [keys[i] for i in index._fuzzy(query, 10, 0, 0)]
+        assert [_score(query, k) for k in found] == _brute_force(keys, query, 10)
+
+
+def test_common_trigrams_do_not_slow_or_break_search():
+    # "barang" is in every name, so its trigrams have complement lists
+    index = NameIndex(_rows([f"Barang {n}" for n in range(3000)]))
+    assert index._absent
+    assert index.search("barng 1234")[0] == "Barang 1234"
+    assert index.search("brang 77")[0] == "Barang 77"
+
+
+def test_tombstones_are_not_offered():
+    rows = _rows(["Pena", "Pensil"])
+    rows[1][6], rows[1][9] = "0", "HABIS"
+    index = NameIndex(rows)
+    assert index.search("pen") == ["Pensil"]
+    assert index.stock_of("Pena") == {}
+
+
+def test_stock_only_change_reuses_the_name_table():
+    first = NameIndex(_rows(["Pena", "Pensil"], qty=3))
+    second = NameIndex(_rows(["Pena", "Pensil"], qty=5), previous=first)
+    assert second._grams is first._grams
+    assert second.stock_of("pena") == {"Baik": 5}
+    third = NameIndex(_rows(["Pena", "Pensil", "Penggaris"]), previous=second)
+    assert third._grams is not second._grams
+    assert third.search("pengga")[0] == "Penggaris"
+
+
+@pytest.fixture
+def tab():
+    ws = FakeSpreadsheet(FakeAPI(), "stock").add_worksheet("Gudang", values=stock_rows(50))
+    return SnapshotCache(ttl=3600), ws
+
+
+def test_cache_keeps_index_across_identical_reloads(tab):
+    snapshots, ws = tab
+    names = NameIndexCache()
+    index = names.get(ws.title, *snapshots.versioned(ws))
+
+    snapshots.put(ws.title, ws.get_all_values())  # TTL reload, nothing changed
+    assert names.get(ws.title, *snapshots.versioned(ws)) is index
+
+    batch = SheetBatch(cache=snapshots)
+    batch.update_cell(ws, 2, 7, 7)
+    batch.commit()
+    rebuilt = names.get(ws.title, *snapshots.versioned(ws))
+    assert rebuilt is not index
+    assert rebuilt._grams is index._grams  # same names: only the stock is summed again
+    assert sum(rebuilt.stock_of(ws.rows[1][2]).values()) == 7
+
+    ws.rows[2][6] = "1"  # changed in Sheets: a reload brings new values
+    snapshots.put(ws.title, ws.get_all_values())
+    assert names.get(ws.title, *snapshots.versioned(ws)) is not rebuilt
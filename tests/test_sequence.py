@@ -0,0 +1,59 @@
+"""SequenceAllocator numbering and locking."""
+import threading
+
+from benchmarks.fakes import FakeAPI, FakeSpreadsheet
+from inventaris.sequence import SequenceAllocator
+
+
+def _tab(spreadsheet, title, last):
+    return spreadsheet.add_worksheet(title, values=[["No"]] + [[str(n)] for n in range(1, last + 1)])
+
+
+def test_numbers_never_repeat_across_threads():
+    ws = _tab(FakeSpreadsheet(FakeAPI(), "stock"), "Gudang", 5)
+    sequences = SequenceAllocator(ttl=3600)
+    taken = []
+
+    def take():
+        for _ in range(50):
+            taken.extend(sequences.allocate(ws, 2))
+
+    threads = [threading.Thread(target=take) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(taken) == list(range(6, 406))
+
+
+def test_slow_seed_does_not_block_other_sheets():
+    spreadsheet = FakeSpreadsheet(FakeAPI(), "stock")
+    slow, fast = _tab(spreadsheet, "Lambat", 3), _tab(spreadsheet, "Cepat", 7)
+    reading, release = threading.Event(), threading.Event()
+    col_values = slow.col_values
+
+    def blocked(col):
+        reading.set()
+        release.wait(5)
+        return col_values(col)
+    slow.col_values = blocked
+
+    sequences = SequenceAllocator(ttl=3600)
+    result = []
+    thread = threading.Thread(target=lambda: result.extend(sequences.allocate(slow)))
+    thread.start()
+    assert reading.wait(5)
+    assert sequences.next_no(fast) == 8  # answered while "Lambat" is still seeding
+    release.set()
+    thread.join()
+    assert result == [4]
+
+
+def test_mark_survives_a_stale_reseed():
+    ws = _tab(FakeSpreadsheet(FakeAPI(), "stock"), "Gudang", 5)
+    sequences = SequenceAllocator(ttl=0)
+    assert list(sequences.allocate(ws, 3)) == [6, 7, 8]
+    # Rows not yet in Sheets: the re-seed reads 5 but the mark does not go back
+    assert sequences.next_no(ws) == 9
+    sequences.reset("Gudang")
+    assert sequences.next_no(ws) == 6
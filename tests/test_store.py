@@ -0,0 +1,230 @@
+"""LocalStore + Replicator against the in-memory Sheets fakes."""
+import json
+import threading
+
+import pytest
+
+from benchmarks.fakes import _trim
+from benchmarks.run import SOURCE_FLOOR, SOURCE_SHEET, Fixture
+from inventaris.batch import SheetBatch
+from inventaris.cache import SnapshotCache
+from inventaris.core import USED_SHEET, Inventory, log_sheet_name
+from inventaris.sequence import SequenceAllocator
+from inventaris.store import Replicator
+
+
+def _sheet(ws):
+    """Sheet rows with trailing blank cells and rows dropped."""
+    rows = [_trim(r) for r in ws.rows]
+    while rows and not rows[-1]:
+        rows.pop()
+    return rows
+
+
+def _local(store, title):
+    return [_trim(r) for r in store.values(title)]
+
+
+@pytest.fixture
+def fx(tmp_path):
+    fx = Fixture(20, store_dir=str(tmp_path))
+    fx.source.rows[3][6] = "5"  # Barang 3: a small stock to run out of
+    fx.warm()
+    return fx
+
+
+@pytest.fixture
+def replicator(fx):
+    by_id = {s.id: s for s in (fx.spreadsheet, fx.log_spreadsheet)}
+    replicator = Replicator(fx.snapshots.store, by_id.__getitem__, interval=3600)
+    yield replicator
+    replicator.close()
+
+
+def _second_session(fx):
+    """Another Streamlit session: own snapshot cache, same store and sheets."""
+    snapshots = SnapshotCache(ttl=3600, store=fx.snapshots.store)
+    return Inventory(
+        snapshots, SequenceAllocator(ttl=3600, peek=snapshots.peek), {SOURCE_FLOOR: SOURCE_SHEET},
+        worksheet=fx.inventory.worksheet, log_worksheet=fx.inventory.log_worksheet,
+    )
+
+
+def test_store_and_sheets_converge(fx, replicator):
+    store = fx.snapshots.store
+    fx.inventory.upsert_item(fx.source, "Barang 1", fx.source.rows[1][3], "2023",
+                             SOURCE_FLOOR, 4, fx.source.rows[1][7], "ani", "tambah")
+    fx.inventory.upsert_item(fx.source, "Barang Baru", "2025-01-01", "2024",
+                             SOURCE_FLOOR, 2, "Baik", "ani", "")
+    fx.inventory.transfer_item(SOURCE_FLOOR, USED_SHEET, "Barang 3", fx.source.rows[3][7], 5, "ani")
+    batch = SheetBatch(cache=fx.snapshots)
+    batch.delete_row(fx.source, 5)
+    batch.commit()
+    assert store.pending()
+
+    replicator.replicate()
+
+    assert store.pending() == 0
+    for ws in (fx.source, fx.spreadsheet.worksheet(USED_SHEET),
+               fx.log_spreadsheet.worksheet(log_sheet_name())):
+        assert _local(store, ws.title) == _sheet(ws)
+    assert _sheet(fx.source)[3][6] == "0"
+    assert _sheet(fx.source)[3][9] == "HABIS"
+
+
+def test_replayed_batches_change_nothing(fx, replicator):
+    store = fx.snapshots.store
+    fx.inventory.upsert_item(fx.source, "Barang Baru", "2025-01-01", "2024",
+                             SOURCE_FLOOR, 2, "Baik", "ani", "")
+    fx.inventory.transfer_item(SOURCE_FLOOR, USED_SHEET, "Barang 3", fx.source.rows[3][7], 2, "ani")
+    queued = [(spreadsheet_id, requests) for _, spreadsheet_id, requests, _ in store.queued()]
+    replicator.replicate()
+    before = _sheet(fx.source)
+
+    # Delivery is at least once: the same batches may reach Sheets again
+    for spreadsheet_id, requests in queued:
+        replicator._send(spreadsheet_id, json.loads(requests))
+
+    assert _sheet(fx.source) == before == _local(store, SOURCE_SHEET)
+
+
+def test_first_write_seeds_an_existing_tab(fx, replicator):
+    # A tab with rows nobody has loaded yet: the append must land after them
+    ws = fx.spreadsheet.add_worksheet("Lama", values=[["No", "Nama"], ["1", "a"], ["2", "b"]])
+    batch = SheetBatch(cache=fx.snapshots)
+    batch.append_row(ws, ["3", "c"])
+    batch.commit()
+
+    replicator.replicate()
+
+    assert _sheet(ws) == [["No", "Nama"], ["1", "a"], ["2", "b"], ["3", "c"]]
+    assert _local(fx.snapshots.store, "Lama") == _sheet(ws)
+
+
+def test_rejected_batch_is_dead_lettered(fx, replicator):
+    store = fx.snapshots.store
+    doomed = fx.spreadsheet.add_worksheet("Sementara", values=[["No", "Nama"]])
+    batch = SheetBatch(cache=fx.snapshots)
+    batch.append_row(doomed, ["1", "x"])
+    batch.commit()
+    del fx.spreadsheet._sheets["Sementara"]  # tab deleted in Sheets meanwhile
+    fx.inventory.write_log({"Nama Barang": "Baru"}, "TAMBAH", 1, "ani")
+    fx.inventory.upsert_item(fx.source, "Barang Baru", "2025-01-01", "2024",
+                             SOURCE_FLOOR, 2, "Baik", "ani", "")
+
+    replicator.replicate()
+
+    assert store.pending() == 0
+    assert store.dead() == 1
+    assert _local(store, SOURCE_SHEET) == _sheet(fx.source)
+
+
+def test_failed_push_is_retried_later(fx, replicator):
+    store = fx.snapshots.store
+    replicator.replicate()
+    fx.inventory.write_log({"Nama Barang": "Baru"}, "TAMBAH", 1, "ani")
+    send = fx.log_spreadsheet.batch_update
+
+    def timeout(body):
+        raise TimeoutError("timeout")
+    fx.log_spreadsheet.batch_update = timeout
+
+    assert replicator.replicate() == 0
+    assert store.failing(min_attempts=1)[0] == 1
+    assert replicator.replicate() == 0  # backing off: not even tried
+
+    fx.log_spreadsheet.batch_update = send
+    replicator._backoff.clear()
+    assert replicator.replicate() == 1
+    assert store.pending() == 0
+
+
+def test_concurrent_transfers_cannot_overdraw(fx, replicator):
+    kondisi = fx.source.rows[3][7]
+    sessions = [fx.inventory, _second_session(fx)]
+    for inventory in sessions:
+        inventory.snapshots.get_values(fx.source)  # both validate against 5
+    results = []
+
+    def take(inventory):
+        try:
+            inventory.transfer_item(SOURCE_FLOOR, USED_SHEET, "Barang 3", kondisi, 5, "ani")
+            results.append("ok")
+        except ValueError as e:
+            results.append(str(e))
+
+    threads = [threading.Thread(target=take, args=(inv,)) for inv in sessions]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results.count("ok") == 1
+    assert any("tidak cukup" in r for r in results)
+    row = _local(fx.snapshots.store, SOURCE_SHEET)[3]
+    assert row[6] == "0" and row[9] == "HABIS"
+    # The refused session's snapshot was dropped, so it now sees the 0
+    for inventory in sessions:
+        assert inventory.snapshots.get_values(fx.source)[3][6] == "0"
+    replicator.replicate()
+    assert _local(fx.snapshots.store, SOURCE_SHEET) == _sheet(fx.source)
+
+
+def _manual_row(ws, nama, no):
+    ws.rows.append([str(no), "K", nama, "2025-02-01", "2024", SOURCE_FLOOR, "7", "Baik", "budi", ""])
+
+
+def test_rows_added_in_sheets_are_not_overwritten(fx, replicator):
+    store = fx.snapshots.store
+    replicator.replicate()
+    _manual_row(fx.source, "Manual Row", 100)
+    fx.inventory.upsert_item(fx.source, "Barang Baru", "2025-01-01", "2024",
+                             SOURCE_FLOOR, 2, "Baik", "ani", "")
+
+    replicator.replicate()
+
+    names = [r[2] for r in _sheet(fx.source)[-2:]]
+    assert names == ["Manual Row", "Barang Baru"]
+    assert _local(store, SOURCE_SHEET) == _sheet(fx.source)
+    assert store.pending() == 0
+
+
+def test_rows_added_in_sheets_reach_the_store_without_local_writes(fx, replicator):
+    replicator.replicate()
+    _manual_row(fx.source, "Manual Row", 100)
+    replicator._pulled_at = None  # pull now instead of after pull_interval
+
+    replicator.replicate()
+
+    assert _local(fx.snapshots.store, SOURCE_SHEET) == _sheet(fx.source)
+
+
+def test_tail_edited_in_sheets_is_rebased_keeping_both_changes(fx, replicator):
+    store = fx.snapshots.store
+    replicator.replicate()
+    fx.source.rows[-1][9] = "dicek budi"  # edited by hand in Sheets
+    del fx.source.rows[-2]  # and a row deleted there
+    fx.inventory.transfer_item(SOURCE_FLOOR, USED_SHEET, "Barang 3", fx.source.rows[3][7], 2, "ani")
+
+    replicator.replicate()
+
+    sheet = _sheet(fx.source)
+    assert _local(store, SOURCE_SHEET) == sheet
+    assert sheet[-1][9] == "dicek budi" and len(sheet) == 20
+    assert sheet[3][6] == "3"  # Barang 3: 5 - 2
+    assert store.pending() == 0
+
+
+def test_delivered_but_unmarked_batch_is_not_taken_for_manual_rows(fx, replicator):
+    store = fx.snapshots.store
+    replicator.replicate()
+    fx.inventory.upsert_item(fx.source, "Barang Baru", "2025-01-01", "2024",
+                             SOURCE_FLOOR, 2, "Baik", "ani", "")
+    # Sent, then the process died before mark_sent
+    for _, spreadsheet_id, requests, _ in store.queued():
+        replicator._send(spreadsheet_id, json.loads(requests))
+
+    replicator.replicate()
+
+    assert [r[2] for r in _sheet(fx.source)].count("Barang Baru") == 1
+    assert _local(store, SOURCE_SHEET) == _sheet(fx.source)
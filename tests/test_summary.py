@@ -0,0 +1,57 @@
+"""Cross-warehouse stock summary over the tab snapshots."""
+import pytest
+
+pytest.importorskip("pandas")
+
+from inventaris.core import HEADERS, HEADERS_USED  # noqa: E402
+from inventaris.index import tombstone_note  # noqa: E402
+from inventaris.summary import SummaryCache, stock_summary  # noqa: E402
+
+
+def _stock(*items):
+    return [HEADERS] + [
+        ["1", "K", nama, "2025-01-01", "2024", "G", jumlah, kondisi, "ani", note]
+        for nama, jumlah, kondisi, note in items
+    ]
+
+
+def _tabs():
+    stock = [
+        ("Gudang A", _stock(("Kursi", "3", "Baik", ""), ("Meja", "2", "Rusak", ""),
+                            ("Lemari", "0", "Baik", tombstone_note(""))), HEADERS),
+        ("Gudang B", _stock(("kursi ", "4", "Baik", ""), ("Kursi", "1", "Rusak", "")), HEADERS),
+    ]
+    usage = [
+        ("Dipakai", [HEADERS_USED, ["1", "K", "KURSI", "2025-02-01", "2024", "5", "Baik", "ani", ""]],
+         HEADERS_USED),
+    ]
+    return stock, usage
+
+
+def test_items_are_summed_per_name_and_kondisi_across_tabs():
+    summary = stock_summary(*_tabs())
+    assert list(summary.columns) == [
+        "Nama Barang", "Kondisi", "Gudang A", "Gudang B", "Total Stok", "Dipakai", "Total Digunakan",
+    ]
+    # Spellings of one name are merged under the first one seen; tombstones are left out
+    assert summary.values.tolist() == [
+        ["Kursi", "Baik", 3, 4, 7, 5, 5],
+        ["Kursi", "Rusak", 0, 1, 1, 0, 0],
+        ["Meja", "Rusak", 2, 0, 2, 0, 0],
+    ]
+
+
+def test_empty_tabs_give_an_empty_summary_with_every_column():
+    summary = stock_summary([("Gudang A", [HEADERS], HEADERS)], [])
+    assert summary.empty
+    assert list(summary.columns) == ["Nama Barang", "Kondisi", "Gudang A", "Total Stok", "Total Digunakan"]
+
+
+def test_cache_is_rebuilt_only_when_a_snapshot_changes():
+    stock, usage = _tabs()
+    cache = SummaryCache()
+    first = cache.get(stock, usage)
+    assert cache.get(list(stock), list(usage)) is first
+
+    stock[0] = ("Gudang A", _stock(("Kursi", "9", "Baik", "")), HEADERS)
+    assert cache.get(stock, usage) is not first
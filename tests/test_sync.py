@@ -0,0 +1,62 @@
+"""Delta refresh of worksheet snapshots through the row-count cursor."""
+from benchmarks.fakes import FakeAPI, FakeSpreadsheet
+from benchmarks.run import stock_rows
+from inventaris.sync import col_letter, cursor, fetch_delta, split_delta, tail_range
+
+
+def _tab(rows=10):
+    api = FakeAPI()
+    ws = FakeSpreadsheet(api, "stock").add_worksheet("Gudang", values=stock_rows(rows))
+    return api, ws
+
+
+def test_col_letter_and_tail_range():
+    assert [col_letter(n) for n in (1, 10, 26, 27, 52)] == ["A", "J", "Z", "AA", "AZ"]
+    assert tail_range(11, 10) == "A9:J"
+    # Fewer rows than the tail: read from the top
+    assert tail_range(2, 10) == "A1:J"
+
+
+def test_appended_rows_are_fetched_in_one_read():
+    api, ws = _tab()
+    values = ws.get_all_values()
+    # Rows changed by hand in Sheets go straight to the fake's rows
+    ws.rows.append(["11", "K-11", "Barang Baru", "2025-01-01", "", "", "4", "Baik", "ani"])
+    calls = api.total
+    new_rows = fetch_delta(ws, values)
+    assert api.total - calls == 1
+    # Padded back to the snapshot width, like get_all_values()
+    assert new_rows == [["11", "K-11", "Barang Baru", "2025-01-01", "", "", "4", "Baik", "ani", ""]]
+    assert values + new_rows == ws.get_all_values()
+
+
+def test_unchanged_tab_has_no_delta():
+    _, ws = _tab()
+    assert fetch_delta(ws, ws.get_all_values()) == []
+
+
+def test_edited_or_shifted_tail_needs_a_full_reload():
+    _, ws = _tab()
+    values = ws.get_all_values()
+    ws.rows[-1][6] = "99"
+    assert fetch_delta(ws, values) is None
+
+    values = ws.get_all_values()
+    del ws.rows[2]
+    assert fetch_delta(ws, values) is None
+
+
+def test_edits_above_the_tail_go_unnoticed():
+    # The documented limit of the cursor: only the tail is re-read
+    _, ws = _tab()
+    values = ws.get_all_values()
+    ws.rows[1][6] = "99"
+    assert fetch_delta(ws, values) == []
+
+
+def test_split_delta_ignores_cleared_rows_at_the_bottom():
+    values = [["h"], ["a"], ["b"], ["c"]]
+    count, checksum = cursor(values)
+    assert split_delta([["a"], ["b"], ["c"], ["d"], [""], []], count, checksum) == [["d"]]
+    assert split_delta([["a"], ["b"]], count, checksum) is None
+    assert split_delta([["a"], ["x"], ["c"]], count, checksum) is None